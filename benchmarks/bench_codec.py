@@ -0,0 +1,92 @@
+"""
+Compares the JSON backends of termii.codec on the payloads the SDK spends most of its
+decoding time on: large message history and phonebook contact responses, and a full
+bulk sms request body. Run it from the root of the repository:
+
+    python benchmarks/bench_codec.py [--records 20000] [--repeat 5]
+
+The 'json (str)' row decodes response.text the way code that is not codec aware would,
+paying for the extra bytes to str copy before parsing.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from termii.codec import BACKENDS, _backend
+
+def history_body(records):
+    data = [{
+        "sender": "Termii",
+        "receiver": f"23480{index:08d}",
+        "message": f"Your verification code is {index % 1000000:06d}. It expires in 10 minutes.",
+        "amount": 1,
+        "reroute": 0,
+        "status": "DELIVERED" if index % 7 else "Message Failed",
+        "sms_type": "plain",
+        "send_by": "api",
+        "media_url": None,
+        "message_id": f"30{index:016d}",
+        "notify_url": None,
+        "notify_id": None,
+        "created_at": "2024-01-23 14:24:50",
+    } for index in range(records)]
+    return {"current_page": 1, "data": data, "last_page": 1, "per_page": records, "total": records}
+
+def contacts_body(records):
+    data = [{
+        "id": index,
+        "pid": 3,
+        "phone_number": f"23480{index:08d}",
+        "email_address": f"customer{index}@example.com",
+        "message": None,
+        "company": "Acme Ltd",
+        "first_name": "Ada",
+        "last_name": f"Customer {index}",
+        "create_at": "2024-01-23 14:24:50",
+        "updated_at": "2024-01-23 14:24:50",
+    } for index in range(records)]
+    return {"current_page": 1, "data": data, "last_page": 1, "per_page": records, "total": records}
+
+def bulk_payload(records):
+    return {"to": [f"23480{index:08d}" for index in range(records)], "from": "Acme", "sms": "Hello from Acme",
+        "type": "plain", "channel": "generic", "api_key": "key"}
+
+def best_of(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20000, help="number of records in every response")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement, the best one is reported")
+    args = parser.parse_args()
+
+    codecs = [codec for codec in map(_backend, BACKENDS) if codec is not None]
+    bodies = {
+        "history": json.dumps(history_body(args.records)).encode(),
+        "contacts": json.dumps(contacts_body(args.records)).encode(),
+    }
+    payload = bulk_payload(min(args.records, 10000))
+
+    print(f"{'case':<20}{'backend':<14}{'ms':>10}{'MB/s':>10}{'speedup':>10}")
+    for name, body in bodies.items():
+        baseline = best_of(lambda: json.loads(body.decode("utf-8")), args.repeat)
+        rows = [("json (str)", baseline)] + [(codec.name, best_of(lambda: codec.loads(body), args.repeat)) for codec in codecs]
+        for backend, seconds in rows:
+            print(f"{'decode ' + name:<20}{backend:<14}{seconds * 1000:>10.2f}{len(body) / seconds / 1e6:>10.1f}{baseline / seconds:>9.2f}x")
+
+    baseline = best_of(lambda: json.dumps(payload).encode("utf-8"), args.repeat)
+    for codec in codecs:
+        seconds = best_of(lambda: codec.dumps(payload), args.repeat)
+        print(f"{'encode bulk':<20}{codec.name:<14}{seconds * 1000:>10.2f}{len(codec.dumps(payload)) / seconds / 1e6:>10.1f}{baseline / seconds:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Benchmarks the hot paths of the SDK against a local mock of the termii API running in a
+child process (see mock_server.py). For every scenario, pool size and concurrency it
+reports the throughput, the p50 and p99 latency and the memory of the client process:
+
+    send_message      one sms per request
+    send_bulk_sms     one bulk request per --bulk-size recipients
+    token             send_token followed by verify_token
+    search_number     DND lookups of distinct numbers
+    history_export    a full iter_history export of --history messages, concurrency is the prefetch depth
+
+Run it from the root of the repository:
+
+    python benchmarks/bench_endpoints.py [--requests 1000] [--pool-sizes 1,10] [--concurrency 1,8,32]
+
+The results are written to benchmarks/results/<label>.json. Pass --compare with the results of
+an earlier release to print the change of every row; the run fails when the throughput drops
+or the p99 latency grows by more than --threshold.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+from mock_server import start_process
+from termii import Client, AsyncClient
+from termii.retry import RetryPolicy
+
+SCENARIOS = ("send_message", "send_bulk_sms", "token", "search_number", "history_export")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+def number(index):
+    return f"23480{index % 100000000:08d}"
+
+def make_operations(client, url, args):
+    # Every operation takes the index of the call and returns the number of items it handled.
+    pins = requests.Session()
+
+    def send_message(index):
+        client.send_message(number(index), "Acme", "Your order has shipped", "plain", "generic", {})
+        return 1
+
+    def send_bulk_sms(index):
+        client.send_bulk_sms([number(index * args.bulk_size + offset) for offset in range(args.bulk_size)],
+            "Acme", "Our store opens at 9", "plain", "generic")
+        return args.bulk_size
+
+    def token(index):
+        response = client.send_token("NUMERIC", number(index), "Acme", "generic", 3, 5, 6, "< 1234 >", "Your pin is < 1234 >")
+        pin = pins.get(f"{url}/_mock/pin", params={"pin_id": response["pinId"]}).json()["pin"]
+        client.verify_token(response["pinId"], pin)
+        return 1
+
+    def search_number(index):
+        client.search_number(number(index))
+        return 1
+
+    return {"send_message": send_message, "send_bulk_sms": send_bulk_sms, "token": token, "search_number": search_number}
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_threads(operation, count, concurrency):
+    latencies = []
+    errors = 0
+    items = 0
+
+    def timed(index):
+        start = time.perf_counter()
+        handled = operation(index)
+        latencies.append(time.perf_counter() - start)
+        return handled
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(timed, index) for index in range(count)]:
+            try:
+                items += future.result()
+            except Exception:
+                errors += 1
+    return time.perf_counter() - start, latencies, errors, items
+
+def run_async(url, scenario, count, pool_size, concurrency, args):
+    async def main():
+        async with AsyncClient("benchmark", pool_size=pool_size, base_url=url, retry_policy=RetryPolicy(max_retries=0)) as client:
+            operations = {
+                "send_message": lambda index: client.send_message(number(index), "Acme", "Your order has shipped", "plain", "generic", {}),
+                "send_bulk_sms": lambda index: client.send_bulk_sms([number(index * args.bulk_size + offset) for offset in range(args.bulk_size)],
+                    "Acme", "Our store opens at 9", "plain", "generic"),
+                "search_number": lambda index: client.search_number(number(index)),
+            }
+            operation = operations[scenario]
+            items_per_call = args.bulk_size if scenario == "send_bulk_sms" else 1
+            latencies = []
+            errors = 0
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def timed(index):
+                nonlocal errors
+                async with semaphore:
+                    start = time.perf_counter()
+                    try:
+                        await operation(index)
+                    except Exception:
+                        errors += 1
+                        return
+                    latencies.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(timed(index) for index in range(count)))
+            return time.perf_counter() - start, latencies, errors, len(latencies) * items_per_call
+
+    return asyncio.run(main())
+
+def run_history(client, rounds, prefetch, page_size):
+    latencies = []
+    items = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        export_start = time.perf_counter()
+        items += sum(1 for _ in client.iter_history(page_size=page_size, prefetch=prefetch))
+        latencies.append(time.perf_counter() - export_start)
+    return time.perf_counter() - start, latencies, 0, items
+
+def run_case(url, scenario, mode, pool_size, concurrency, args):
+    gc.collect()
+    if args.trace_memory:
+        tracemalloc.start()
+    rss_before = rss_mb()
+
+    if mode == "async":
+        calls = args.requests // 10 if scenario == "send_bulk_sms" else args.requests
+        elapsed, latencies, errors, items = run_async(url, scenario, calls, pool_size, concurrency, args)
+    else:
+        with Client("benchmark", pool_size=pool_size, base_url=url, retry_policy=RetryPolicy(max_retries=0)) as client:
+            if scenario == "history_export":
+                calls = args.history_rounds
+                elapsed, latencies, errors, items = run_history(client, calls, concurrency - 1, args.page_size)
+            else:
+                calls = args.requests // 10 if scenario == "send_bulk_sms" else args.requests
+                elapsed, latencies, errors, items = run_threads(make_operations(client, url, args)[scenario], calls, concurrency)
+
+    traced_peak = None
+    if args.trace_memory:
+        traced_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    return {
+        "scenario": scenario,
+        "mode": mode,
+        "pool_size": pool_size,
+        "concurrency": concurrency,
+        "calls": calls,
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "calls_per_s": round(calls / elapsed, 1),
+        "items_per_s": round(items / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 3) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else None,
+        "peak_rss_mb": round(rss_mb(), 1),
+        "rss_growth_mb": round(rss_mb() - rss_before, 1),
+        "traced_peak_mb": round(traced_peak, 2) if traced_peak is not None else None,
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def row_key(row):
+    return (row["scenario"], row["mode"], row["pool_size"], row["concurrency"])
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as file:
+        baseline = {row_key(row): row for row in json.load(file)["results"]}
+
+    regressions = []
+    print(f"\nCompared with {baseline_path}")
+    print(f"{'scenario':<16}{'mode':<7}{'pool':>5}{'conc':>6}{'calls/s':>12}{'p99':>12}")
+    for row in results:
+        before = baseline.get(row_key(row))
+        if before is None:
+            continue
+        throughput = row["calls_per_s"] / before["calls_per_s"] - 1
+        p99 = row["p99_ms"] / before["p99_ms"] - 1 if row["p99_ms"] and before["p99_ms"] else 0
+        print(f"{row['scenario']:<16}{row['mode']:<7}{row['pool_size']:>5}{row['concurrency']:>6}{throughput:>+11.1%}{p99:>+11.1%} ")
+        if throughput < -threshold or p99 > threshold:
+            regressions.append(row_key(row))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated scenarios to run")
+    parser.add_argument("--modes", default="sync", help="comma separated clients to run: sync, async")
+    parser.add_argument("--requests", type=int, default=1000, help="calls per case, a tenth of them for send_bulk_sms")
+    parser.add_argument("--pool-sizes", default="1,10", help="comma separated connection pool sizes")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma separated numbers of concurrent calls")
+    parser.add_argument("--bulk-size", type=int, default=100, help="recipients per send_bulk_sms call")
+    parser.add_argument("--history", type=int, default=20000, help="messages in the exported history")
+    parser.add_argument("--history-rounds", type=int, default=3, help="full exports per history_export case")
+    parser.add_argument("--page-size", type=int, default=100, help="page size of the history export")
+    parser.add_argument("--latency", type=float, default=0, help="latency added by the mock server, in seconds")
+    parser.add_argument("--trace-memory", action="store_true", help="also report the peak traced allocations, which slows the run down")
+    parser.add_argument("--label", default=None, help="name of the results file. Defaults to the current git commit")
+    parser.add_argument("--compare", default=None, help="results file of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    scenarios = [scenario for scenario in args.scenarios.split(",") if scenario]
+    modes = [mode for mode in args.modes.split(",") if mode]
+    pool_sizes = [int(size) for size in args.pool_sizes.split(",")]
+    concurrencies = [int(size) for size in args.concurrency.split(",")]
+
+    url, stop = start_process(history=args.history, history_size=args.history, latency=args.latency)
+    results = []
+    print(f"{'scenario':<16}{'mode':<7}{'pool':>5}{'conc':>6}{'calls/s':>10}{'items/s':>11}{'p50 ms':>9}{'p99 ms':>9}{'rss MB':>8}{'errors':>8}")
+    try:
+        for scenario in scenarios:
+            for mode in modes:
+                if mode == "async" and scenario in ("token", "history_export"):
+                    continue
+                for pool_size in pool_sizes:
+                    for concurrency in concurrencies:
+                        row = run_case(url, scenario, mode, pool_size, concurrency, args)
+                        results.append(row)
+                        print(f"{scenario:<16}{mode:<7}{pool_size:>5}{concurrency:>6}{row['calls_per_s']:>10.1f}{row['items_per_s']:>11.1f}"
+                            f"{row['p50_ms'] or 0:>9.2f}{row['p99_ms'] or 0:>9.2f}{row['peak_rss_mb']:>8.1f}{row['errors']:>8}")
+    finally:
+        stop()
+
+    label = args.label or git_commit() or datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{label}.json")
+    with open(path, "w") as file:
+        json.dump({
+            "label": label,
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": vars(args),
+            "results": results,
+        }, file, indent=2)
+    print(f"\nResults written to {path}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"FAIL: {len(regressions)} cases regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
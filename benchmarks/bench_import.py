@@ -0,0 +1,65 @@
+"""
+Measures the cost of importing the SDK in fresh interpreters and fails when 'import termii'
+exceeds its budget or loads the HTTP stack. Run it from the root of the repository:
+
+    python benchmarks/bench_import.py [--budget-ms 20] [--runs 5]
+
+Every run starts a new interpreter, so nothing is cached in sys.modules, and times only
+the import statement, not the interpreter startup. The best of the runs is compared with
+the budget.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DEFAULT_BUDGET_MS = 20.0
+HEAVY_MODULES = ("requests", "httpx", "numpy", "termii.client", "termii.async_client")
+
+MEASURE = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed * 1000, ",".join(heavy))
+"""
+
+def measure(statement, runs):
+    best = None
+    heavy = ""
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", MEASURE.format(statement=statement, heavy=HEAVY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True, check=True).stdout.split(" ", 1)
+        milliseconds = float(output[0])
+        if best is None or milliseconds < best:
+            best = milliseconds
+            heavy = output[1].strip()
+    return best, heavy
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="maximum time 'import termii' may take")
+    parser.add_argument("--runs", type=int, default=5, help="interpreters started per statement, the best run is reported")
+    args = parser.parse_args()
+
+    statements = ("import termii", "from termii.validation import SCHEMAS", "from termii import Client", "from termii import AsyncClient")
+    results = {statement: measure(statement, args.runs) for statement in statements}
+
+    print(f"{'statement':<40}{'ms':>10}  loaded")
+    for statement, (milliseconds, heavy) in results.items():
+        print(f"{statement:<40}{milliseconds:>10.2f}  {heavy or '-'}")
+
+    milliseconds, heavy = results["import termii"]
+    if heavy:
+        print(f"FAIL: 'import termii' loaded {heavy}")
+        return 1
+    if milliseconds > args.budget_ms:
+        print(f"FAIL: 'import termii' took {milliseconds:.2f}ms, the budget is {args.budget_ms:.2f}ms")
+        return 1
+    print(f"OK: 'import termii' took {milliseconds:.2f}ms, the budget is {args.budget_ms:.2f}ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
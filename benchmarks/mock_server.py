@@ -0,0 +1,169 @@
+"""
+A local HTTP mock of the termii API serving the termii.simulator.TermiiSimulator, so the SDK
+can be benchmarked over real sockets without hitting the paid API. Run it on its own:
+
+    python benchmarks/mock_server.py --port 8080 [--latency 0.02] [--error-rate 0.01] [--rate-limit 100]
+
+and point a client at it with Client(api_key, base_url="http://127.0.0.1:8080").
+
+GET /_mock/pin?pin_id=... returns the pin of a pin_id, so benchmarks can verify the tokens they send.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from termii.simulator import TermiiSimulator
+
+class MockTermiiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # The headers and the body are written separately, which stalls every response on a
+    # delayed ACK unless Nagle's algorithm is off.
+    disable_nagle_algorithm = True
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return bytes(body)
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else None
+
+    def _respond(self, status_code, body, headers=None):
+        content = json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _handle(self):
+        body = self._read_body()
+        simulator = self.server.simulator
+
+        if self.path.startswith("/_mock/pin"):
+            pin_id = dict(parse_qsl(urlsplit(self.path).query)).get("pin_id")
+            entry = simulator.pins.get(pin_id)
+            self._respond(200 if entry else 404, {"pin": entry["pin"] if entry else None})
+            return
+
+        outcome = simulator.handle(self.command, self.path, data=body)
+        if outcome.delay:
+            time.sleep(outcome.delay)
+        if outcome.fault is not None:
+            # A failed connection or a lost response: drop the connection without answering.
+            self.close_connection = True
+            return
+        self._respond(outcome.status_code, outcome.body, outcome.headers)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+class MockTermiiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, simulator):
+        super().__init__(address, MockTermiiHandler)
+        self.simulator = simulator
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+def start_server(host="127.0.0.1", port=0, history=0, **options):
+    """
+    Starts a MockTermiiServer on a background thread of this process and returns it
+
+    Params:
+    host: str
+        The address to listen on
+    port: int
+        The port to listen on. 0 picks a free port
+    history: int
+        The number of messages seeded into the message history
+    options: any
+        The options of the TermiiSimulator (Example: latency=0.01 )
+    """
+    simulator = TermiiSimulator(**options)
+    simulator.seed_history(history)
+    server = MockTermiiServer((host, port), simulator)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def _serve(connection, host, port, history, options):
+    server = start_server(host, port, history, **options)
+    connection.send(server.url)
+    connection.recv()
+    server.shutdown()
+
+def start_process(host="127.0.0.1", port=0, history=0, **options):
+    """
+    Starts a MockTermiiServer in a child process, so it does not compete with the benchmarked
+    client for the GIL or show up in its memory. Returns (url, stop), where stop() ends the process
+
+    Params:
+    host: str
+        The address to listen on
+    port: int
+        The port to listen on. 0 picks a free port
+    history: int
+        The number of messages seeded into the message history
+    options: any
+        The options of the TermiiSimulator (Example: latency=0.01 )
+    """
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve, args=(child, host, port, history, options), daemon=True)
+    process.start()
+    url = parent.recv()
+
+    def stop():
+        parent.send(None)
+        process.join(5)
+        if process.is_alive():
+            process.terminate()
+
+    return url, stop
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--history", type=int, default=0, help="messages seeded into the message history")
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--jitter", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--throttle-rate", type=float, default=0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--timeout-rate", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = start_server(args.host, args.port, args.history, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, rate_limit=args.rate_limit, timeout_rate=args.timeout_rate, seed=args.seed)
+    print(f"Mock termii API listening on {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,13 @@ setup(
   download_url = 'https://github.com/panam-py/termii-python/archive/refs/tags/v_0.1.0.tar.gz',    
   keywords = ['Termii SDK', 'Python', 'API'],   
   install_requires=[            
+          'requests',
     ],
+  extras_require={
+          'async': ['httpx'],
+          'numpy': ['numpy'],
+          'orjson': ['orjson'],
+    },
   classifiers=[
     'Development Status :: 3 - Alpha',      
     'Intended Audience :: Developers',      
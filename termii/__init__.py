@@ -1 +1,24 @@
-from client import Client
\ No newline at end of file
+"""
+The termii SDK. Client and AsyncClient are imported lazily on first use, so importing the
+package is cheap and the HTTP stack (requests, or httpx for AsyncClient) is only loaded
+by the code that sends requests.
+"""
+import importlib
+
+__all__ = ["Client", "AsyncClient"]
+
+_LAZY_ATTRIBUTES = {
+    "Client": "client",
+    "AsyncClient": "async_client",
+}
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
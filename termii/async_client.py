@@ -0,0 +1,572 @@
+import asyncio
+import time
+from collections import deque
+from . import bulk
+from . import upload
+from .pagination import aiter_pages, afetch_all_pages, DEFAULT_PAGE_SIZE
+from . import termii_switch
+from . import termii_token
+from . import termii_insight
+from .cache import ListingCache, MISSING, index_listing
+from .contacts import ContactImport
+from .async_session import AsyncTermiiSession, DEFAULT_ASYNC_POOL_SIZE
+from . import validation
+from .idempotency import fingerprint
+from .store import HistoryCursor
+from .templates import MessageTemplate, group_by_text
+from .utilities import WrongType, APIError
+
+class AsyncClient:
+    """
+    Creates an asyncio termii client using the api_key. It has the same methods
+    as Client, but every method is a coroutine and requests are sent on a
+    non-blocking pooled session, so many sends and verifies can be in flight at once.
+    ...
+
+    Attributes:
+    api_key: str
+        The termii developer API Key to create a client from.
+    pool_size: int
+        The maximum number of connections the client keeps open to the termii API.
+    session: AsyncTermiiSession
+        The pooled session every request of the client is sent with.
+    rate_limiter: RateLimiter
+        An optional rate_limit.RateLimiter pacing the requests of the client per endpoint group.
+    retry_policy: RetryPolicy
+        An optional retry.RetryPolicy deciding which failed requests are sent again.
+        By default 429s, connection failures and 5xx responses of idempotent requests are retried.
+    lookup_cache: TTLCache
+        An optional cache.TTLCache answering repeated search_number and search_number_status
+        lookups of the same number without a request.
+    listing_ttl: float
+        The number of seconds the sender ID and phonebook listings are cached for. See Client
+    codec: JSONCodec
+        An optional codec.JSONCodec, or the name of its backend, encoding requests and decoding responses. See Client
+    transport: AsyncHTTPTransport
+        An optional transport sending the requests of the client, such as a simulator.AsyncSimulatorTransport. See Client
+    base_url: str
+        An optional scheme and host the requests are sent to instead of https://api.ng.termii.com. See Client
+    hooks: list
+        Optional callables passed a metrics.RequestMetrics after every request. See Client
+    idempotency_guard: IdempotencyGuard
+        An optional idempotency.IdempotencyGuard suppressing repeats of the same message. See Client
+    pin_ledger: PinLedger
+        An optional pins.PinLedger answering verifies of expired, exhausted or already verified pins locally. See Client
+    normaliser: NumberNormaliser
+        An optional phone_numbers.NumberNormaliser checking and normalising phone numbers before they are sent. See Client
+
+    Methods:
+    See Client. Every method of Client is available on AsyncClient as a coroutine, except outbox:
+    the workers of an outbox send from their own threads, so open it on a Client.
+    close: A coroutine that closes every pooled connection held by the client.
+    """
+    def __init__(self, api_key, pool_size=DEFAULT_ASYNC_POOL_SIZE, rate_limiter=None, retry_policy=None, lookup_cache=None, listing_ttl=None, codec=None, transport=None, base_url=None, hooks=None, idempotency_guard=None, pin_ledger=None, normaliser=None):
+        self.api_key = api_key
+        self.normaliser = normaliser
+        self.pin_ledger = pin_ledger
+        self.idempotency_guard = idempotency_guard
+        self.lookup_cache = lookup_cache
+        self.listing_cache = ListingCache(listing_ttl) if listing_ttl is not None else None
+        self.pool_size = pool_size
+        self.session = AsyncTermiiSession(pool_size, rate_limiter=rate_limiter, retry_policy=retry_policy, codec=codec,
+            transport=transport, base_url=base_url, hooks=hooks)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """
+        A coroutine that closes every pooled connection held by the client.
+        """
+        await self.session.close()
+
+    async def _get(self, url, **params):
+        params["api_key"] = self.api_key
+        response = await self.session.get(url, params=params)
+        return self.session.codec.decode(response)
+
+    async def _send(self, method, url, payload):
+        response = await self.session.request(method, url, json=payload)
+        return self.session.codec.decode(response)
+
+    async def _post(self, url, payload, statuses):
+        # Sends a message, notes its status code and returns its decoded body. Raises APIError for a status other than 2xx.
+        response = await self.session.post(url, json=payload)
+        statuses.append(response.status_code)
+        return self.session.codec.decode(response, check=True)
+
+    async def _send_checked(self, url, payload, number_to, sender_id, message, channel, statuses):
+        # Sends a message through the idempotency guard, if there is one.
+        if self.idempotency_guard is None:
+            return await self._post(url, payload, statuses)
+        return await self.idempotency_guard.run_async(fingerprint(number_to, sender_id, message, channel),
+            lambda: self._post(url, payload, statuses), transport=self.session.transport)
+
+    async def _send_once(self, url, payload, number_to, sender_id, message, channel):
+        # Sends a message and returns its decoded body, the error body too if termii rejected it.
+        try:
+            return await self._send_checked(url, payload, number_to, sender_id, message, channel, [])
+        except APIError as error:
+            if not error.decoded:
+                raise
+            return error.response
+
+    async def _send_chunk(self, index, chunk, sender_id, message, message_type, channel, templated=False):
+        # Sends a chunk of a bulk message and returns its ChunkResult, like bulk._send_chunk.
+        label = message if templated else None
+        statuses = []
+        try:
+            payload = termii_switch.bulk_message_payload(self.api_key, chunk, sender_id, message, message_type, channel)
+            response = await self._send_checked(termii_switch.BULK_MESSAGE_URL, payload, chunk, sender_id, message, channel, statuses)
+        except APIError as error:
+            return bulk.ChunkResult(index, len(chunk), response=error.response, error=error, message=label, status_code=error.status_code)
+        except Exception as error:
+            return bulk.ChunkResult(index, len(chunk), error=error, message=label)
+        return bulk.ChunkResult(index, len(chunk), response=response, message=label, status_code=statuses[-1] if statuses else None)
+
+    async def _fetch_listing(self, name, id_field, url, bypass_cache):
+        if self.listing_cache is None:
+            response = await afetch_all_pages(self.session, url, {"api_key": self.api_key})
+            return response, index_listing(response, id_field) or {}
+
+        if not bypass_cache:
+            cached = self.listing_cache.get(name)
+            if cached is not MISSING:
+                return cached
+
+        response = await afetch_all_pages(self.session, url, {"api_key": self.api_key})
+        return self.listing_cache.set(name, response, id_field)
+
+    def _invalidate_listing(self, name):
+        if self.listing_cache is not None:
+            self.listing_cache.invalidate(name)
+
+    """ START OF METHODS FOR SWITCH"""
+    async def fetch_sender_ids(self, bypass_cache=False):
+        """
+        A method to fetch the sender ids of the client. See Client.fetch_sender_ids
+        """
+        response, _ = await self._fetch_listing("sender_ids", "sender_id", termii_switch.FETCH_SENDER_ID_URL, bypass_cache)
+        return response
+
+    async def has_sender_id(self, sender_id):
+        """
+        A method to check if a sender ID exists on the account. See Client.has_sender_id
+        """
+        _, index = await self._fetch_listing("sender_ids", "sender_id", termii_switch.FETCH_SENDER_ID_URL, False)
+        return sender_id in index
+
+    async def request_sender_id(self, sender_id, usecase, company):
+        """
+        A method to request new termii sender ID. See Client.request_sender_id
+        """
+        payload = termii_switch.sender_id_request_payload(self.api_key, sender_id, usecase, company)
+        response = await self._send("POST", termii_switch.REQUEST_SENDER_ID_URL, payload)
+        self._invalidate_listing("sender_ids")
+        return response
+
+    async def send_message(self, number_to, sender_id, message, message_type, channel, media_dict):
+        """
+        A method to send a message using the termii API. See Client.send_message
+        """
+        if self.normaliser is not None:
+            number_to = self.normaliser.check(number_to)
+
+        payload = termii_switch.message_payload(self.api_key, number_to, sender_id, message, message_type, channel, media_dict)
+        return await self._send_once(termii_switch.SEND_MESSAGE_URL, payload, number_to, sender_id, message, channel)
+
+    async def send_bulk_sms(self, numbers_to, sender_id, message, message_type, channel):
+        """
+        A method to send bulk sms messages using the termii API. See Client.send_bulk_sms
+        """
+        if self.normaliser is not None:
+            numbers_to = self.normaliser.check_many(numbers_to)
+
+        payload = termii_switch.bulk_message_payload(self.api_key, numbers_to, sender_id, message, message_type, channel)
+        return await self._send_once(termii_switch.BULK_MESSAGE_URL, payload, numbers_to, sender_id, message, channel)
+
+    async def send_bulk_sms_chunked(self, numbers_to, sender_id, message, message_type, channel,
+        chunk_size=bulk.MAX_BULK_RECIPIENTS, max_workers=bulk.DEFAULT_BULK_WORKERS):
+        """
+        A method to send one sms to any number of recipients in concurrent, API-sized chunks. See Client.send_bulk_sms_chunked
+        """
+        if chunk_size < 1 or chunk_size > bulk.MAX_BULK_RECIPIENTS:
+            raise ValueError(f"chunk_size must be between 1 and {bulk.MAX_BULK_RECIPIENTS}")
+
+        validation.SEND_BULK_SMS.validate({"sender_id": sender_id, "message": message, "message_type": message_type, "channel": channel})
+        if self.normaliser is not None:
+            numbers_to = self.normaliser.iter_checked(numbers_to)
+
+        results = []
+        pending = set()
+
+        index = 0
+        try:
+            for index, chunk in enumerate(bulk.chunk_numbers(numbers_to, chunk_size)):
+                if len(pending) >= max_workers:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    results.extend(task.result() for task in done)
+
+                pending.add(asyncio.ensure_future(self._send_chunk(index, chunk, sender_id, message, message_type, channel)))
+                index += 1
+        except Exception as error:
+            # The chunks already read are still sent and reported, like bulk.send_bulk_in_chunks.
+            results.append(bulk.ChunkResult(index, 0, error=error))
+
+        if pending:
+            done, _ = await asyncio.wait(pending)
+            results.extend(task.result() for task in done)
+
+        return bulk.BulkResult(results)
+
+    async def send_templated(self, template, records, sender_id, message_type, channel, number_field=bulk.DEFAULT_NUMBER_FIELD,
+        chunk_size=bulk.MAX_BULK_RECIPIENTS, max_workers=bulk.DEFAULT_BULK_WORKERS):
+        """
+        A method to send a personalised sms to a stream of contact records in grouped bulk requests. See Client.send_templated
+        """
+        if chunk_size < 1 or chunk_size > bulk.MAX_BULK_RECIPIENTS:
+            raise ValueError(f"chunk_size must be between 1 and {bulk.MAX_BULK_RECIPIENTS}")
+
+        template = template if isinstance(template, MessageTemplate) else MessageTemplate(template)
+        validation.SEND_BULK_SMS.validate({"sender_id": sender_id, "message": template.template, "message_type": message_type, "channel": channel})
+        normalise = self.normaliser.normalise if self.normaliser is not None else None
+
+        results = []
+        skipped = []
+        pending = set()
+
+        index = 0
+        try:
+            for index, (message, chunk) in enumerate(group_by_text(template, records, chunk_size, number_field=number_field, normalise=normalise, skipped=skipped)):
+                if len(pending) >= max_workers:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    results.extend(task.result() for task in done)
+
+                pending.add(asyncio.ensure_future(self._send_chunk(index, chunk, sender_id, message, message_type, channel, templated=True)))
+                index += 1
+        except Exception as error:
+            # The groups already read are still sent and reported, like bulk.send_bulk_in_chunks.
+            results.append(bulk.ChunkResult(index, 0, error=error))
+
+        if pending:
+            done, _ = await asyncio.wait(pending)
+            results.extend(task.result() for task in done)
+
+        return bulk.TemplatedResult(results, skipped)
+
+    async def _send_one(self, index, message):
+        statuses = []
+        try:
+            if type(message) != dict:
+                raise WrongType("dict", "message")
+            number_to = message["number_to"]
+            if self.normaliser is not None:
+                number_to = self.normaliser.check(number_to)
+            channel = message.get("channel", "generic")
+            payload = termii_switch.message_payload(self.api_key, number_to, message["sender_id"], message["message"],
+                message.get("message_type", "plain"), channel, message.get("media_dict", {}))
+            response = await self._send_checked(termii_switch.SEND_MESSAGE_URL, payload, number_to, message["sender_id"], message["message"], channel, statuses)
+        except APIError as error:
+            return bulk.SendResult(index, message, response=error.response, error=error, status_code=error.status_code)
+        except Exception as error:
+            return bulk.SendResult(index, message, error=error)
+        return bulk.SendResult(index, message, response=response, status_code=statuses[-1] if statuses else None)
+
+    async def send_many(self, messages, max_workers=bulk.DEFAULT_SEND_WORKERS, ordered=False):
+        """
+        An async generator that sends a different message to every recipient concurrently. See Client.send_many
+        """
+        pending = deque() if ordered else set()
+
+        try:
+            for index, message in enumerate(messages):
+                if len(pending) >= max_workers:
+                    if ordered:
+                        yield await pending.popleft()
+                    else:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            yield task.result()
+
+                task = asyncio.ensure_future(self._send_one(index, message))
+                if ordered:
+                    pending.append(task)
+                else:
+                    pending.add(task)
+
+            while pending:
+                if ordered:
+                    yield await pending.popleft()
+                else:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def send_message_with_autogenerated_number(self, number_to, message):
+        """
+        A method to send messages using Termii's auto-generated messaging numbers. See Client.send_message_with_autogenerated_number
+        """
+        payload = termii_switch.number_message_payload(self.api_key, number_to, message)
+        return await self._send("POST", termii_switch.NUMBER_MESSAGE_SEND_URL, payload)
+
+    async def send_device_template(self, phone_number, device_id, template_id, data):
+        """
+        A method to set a device template for one-time-passwords. See Client.send_device_template
+        """
+        payload = termii_switch.device_template_payload(self.api_key, phone_number, device_id, template_id, data)
+        return await self._send("POST", termii_switch.DEVICE_TEMPLATE_URL, payload)
+
+    async def fetch_phonebooks(self, bypass_cache=False):
+        """
+        A method to get all the phonebooks associated to a termii client. See Client.fetch_phonebooks
+        """
+        response, _ = await self._fetch_listing("phonebooks", "id", termii_switch.PHONEBOOKS_URL, bypass_cache)
+        return response
+
+    async def has_phonebook(self, phonebook_id):
+        """
+        A method to check if a phonebook exists on the account. See Client.has_phonebook
+        """
+        _, index = await self._fetch_listing("phonebooks", "id", termii_switch.PHONEBOOKS_URL, False)
+        return phonebook_id in index
+
+    async def create_phonebook(self, description, phonebook_name):
+        """
+        A method to create a phonebook using the termii API. See Client.create_phonebook
+        """
+        payload = termii_switch.phonebook_payload(self.api_key, phonebook_name, description)
+        response = await self._send("POST", termii_switch.PHONEBOOKS_URL, payload)
+        self._invalidate_listing("phonebooks")
+        return response
+
+    async def update_phonebook(self, phonebook_id, phonebook_name, phone_description):
+        """
+        A method to update a phonebook using the termii API. See Client.update_phonebook
+        """
+        payload = termii_switch.phonebook_payload(self.api_key, phonebook_name, phone_description)
+        response = await self._send("PATCH", f"{termii_switch.PHONEBOOKS_URL}/{phonebook_id}", payload)
+        self._invalidate_listing("phonebooks")
+        return response
+
+    async def delete_phonebook(self, phonebook_id):
+        """
+        A method to delete a phonebook using the termii API. See Client.delete_phonebook
+        """
+        response = await self.session.delete(f"{termii_switch.PHONEBOOKS_URL}/{phonebook_id}", params={"api_key": self.api_key})
+        response = self.session.codec.decode(response)
+        self._invalidate_listing("phonebooks")
+        return response
+
+    async def fetch_contacts(self, phonebook_id):
+        """
+        A method to get all the contacts associated to a termii phonebook. See Client.fetch_contacts
+        """
+        return await self._get(f"{termii_switch.PHONEBOOKS_URL}/{phonebook_id}/contacts")
+
+    async def iter_contacts(self, phonebook_id, page_size=DEFAULT_PAGE_SIZE, prefetch=0):
+        """
+        An async generator over the contacts of a termii phonebook, fetched lazily page by page. See Client.iter_contacts
+        """
+        url = f"{termii_switch.PHONEBOOKS_URL}/{phonebook_id}/contacts"
+        async for page in aiter_pages(self.session, url, {"api_key": self.api_key}, page_size, prefetch):
+            for contact in page:
+                yield contact
+
+    async def add_new_contact(self, phone_number, phonebook_id, country_code, options):
+        """
+        A method to add a single contact to a phonebook using the termii API. See Client.add_new_contact
+        """
+        if self.normaliser is not None:
+            self.normaliser.check(phone_number, country_code)
+
+        payload = termii_switch.contact_payload(self.api_key, phone_number, country_code, options)
+        response = await self._send("POST", f"{termii_switch.PHONEBOOKS_URL}/{phonebook_id}/contacts", payload)
+        self._invalidate_listing("phonebooks")
+        return response
+
+    async def add_contacts(self, contact_file, country_code, extension, phonebook_id):
+        """
+        A method to add contacts to a phonebook using the termii API. See Client.add_contacts
+        """
+        stream = upload.contact_stream(contact_file, country_code, extension)
+        response = await upload._upload_async(self.session, f"{termii_switch.PHONEBOOKS_URL}/{phonebook_id}/contacts?api_key={self.api_key}", stream)
+        response = self.session.codec.decode(response)
+        self._invalidate_listing("phonebooks")
+        return response
+
+    async def upload_contacts(self, contact_file, country_code, extension, phonebook_id,
+        split_size=upload.DEFAULT_SPLIT_SIZE, max_workers=upload.DEFAULT_UPLOAD_WORKERS, header=False):
+        """
+        A method to add the contacts of a file of any size to a phonebook in concurrent, streamed uploads. See Client.upload_contacts
+        """
+        if self.normaliser is not None and extension in upload.SPLITTABLE_TYPES and not isinstance(contact_file, ContactImport):
+            contact_file = ContactImport(contact_file, country_code, header=header, normalise=self.normaliser.normalise)
+
+        response = await upload.upload_contacts_async(self.session, f"{termii_switch.PHONEBOOKS_URL}/{phonebook_id}/contacts?api_key={self.api_key}",
+            contact_file, country_code, extension, split_size=split_size, max_workers=max_workers, header=header)
+        self._invalidate_listing("phonebooks")
+        return response
+
+    async def delete_contact(self, contact_id):
+        """
+        A method to delete contacts from a phonebook using the termii API. See Client.delete_contact
+        """
+        response = await self.session.delete(f"{termii_switch.DELETE_CONTACT_URL}/{contact_id}", params={"api_key": self.api_key})
+        response = self.session.codec.decode(response)
+        self._invalidate_listing("phonebooks")
+        return response
+
+    async def send_campaign(self, country_code, sender_id, message, channel, message_type, phonebook_id, campaign_type, **schedule):
+        """
+        A method to send campaigns using the termii API. See Client.send_campaign
+        """
+        payload = termii_switch.campaign_payload(self.api_key, country_code, sender_id, message, channel, message_type,
+            phonebook_id, campaign_type, **schedule)
+        return await self._send("POST", termii_switch.SEND_CAMPAIGN_URL, payload)
+
+    async def fetch_campaigns(self):
+        """
+        A method to get the all campaigns associated with a client. See Client.fetch_campaigns
+        """
+        return await self._get(termii_switch.CAMPAIGNS_URL)
+
+    async def fetch_campaign_history(self, campaign_id):
+        """
+        A method to get the history of a certain campaign. See Client.fetch_campaign_history
+        """
+        response = await self.session.get(f"{termii_switch.CAMPAIGNS_URL}/{campaign_id}", params={"api_key": self.api_key})
+        return termii_switch.campaign_history_body(self.session.codec, response)
+    """ END OF METHODS FOR SWITCH """
+
+    """ START OF METHODS FOR INSIGHT """
+    async def get_balance(self):
+        """
+        A method to check a client's termii balance. See Client.get_balance
+        """
+        return await self._get(termii_insight.BALANCE_URL)
+
+    async def _cached_lookup(self, key, bypass_cache, method, url, **kwargs):
+        if self.lookup_cache is not None and not bypass_cache:
+            cached = self.lookup_cache.get(key)
+            if cached is not MISSING:
+                return cached
+
+        response = await self.session.request(method, url, **kwargs)
+        status_code = response.status_code
+        response = self.session.codec.decode(response)
+
+        if self.lookup_cache is not None and status_code == 200:
+            self.lookup_cache.set(key, response)
+        return response
+
+    async def search_number(self, phone_number, bypass_cache=False):
+        """
+        A method to verify phone numbers and automatically detect their status. See Client.search_number
+        """
+        params = {"api_key": self.api_key, "phone_number": phone_number}
+        return await self._cached_lookup(("dnd", phone_number, None), bypass_cache, "GET", termii_insight.SEARCH_URL, params=params)
+
+    async def search_number_status(self, phone_number, country_code, bypass_cache=False):
+        """
+        A method to detect if a number is fake or has ported to a new network. See Client.search_number_status
+        """
+        payload = termii_insight.number_status_payload(self.api_key, phone_number, country_code)
+        return await self._cached_lookup(("status", phone_number, country_code), bypass_cache, "GET", termii_insight.STATUS_URL, json=payload)
+
+    async def fetch_history(self):
+        """
+        A method that returns reports for messages sent across the sms, voice & whatsapp channels. See Client.fetch_history
+        """
+        return await self._get(termii_insight.HISTORY_URL)
+
+    async def iter_history(self, page_size=DEFAULT_PAGE_SIZE, prefetch=1):
+        """
+        An async generator over the message reports, fetched lazily page by page. See Client.iter_history
+        """
+        async for page in aiter_pages(self.session, termii_insight.HISTORY_URL, {"api_key": self.api_key}, page_size, prefetch):
+            for report in page:
+                yield report
+
+    async def sync_history(self, store, page_size=DEFAULT_PAGE_SIZE, prefetch=1, full=False):
+        """
+        A method that copies the message reports sent since the last sync into a local store. See Client.sync_history
+        """
+        cursor = HistoryCursor(store)
+        if full:
+            cursor.sent_at = None
+        written = 0
+        pages = aiter_pages(self.session, termii_insight.HISTORY_URL, {"api_key": self.api_key}, page_size, prefetch)
+        try:
+            async for page in pages:
+                reports, done = cursor.take(page)
+                if reports:
+                    store.upsert(reports)
+                    written += len(reports)
+                if done:
+                    break
+        finally:
+            await pages.aclose()
+        cursor.save()
+        return written
+    """ END OF METHODS FOR INSIGHT """
+
+    """ START OF METHODS FOR TOKEN """
+    async def send_token(self, message_type, phone_number,
+        sender_id, channel, pin_attempts, pin_time_to_live,
+        pin_length, pin_placeholder, message_text):
+        """
+        A method that allows businesses trigger one-time-passwords(OTP). See Client.send_token
+        """
+        payload = termii_token.token_payload(self.api_key, message_type, phone_number, sender_id, channel, pin_attempts,
+            pin_time_to_live, pin_length, pin_placeholder, message_text)
+        started = time.monotonic()
+        response = await self._send("POST", termii_token.SEND_TOKEN_URL, payload)
+        if self.pin_ledger is not None:
+            self.pin_ledger.record_response(response, pin_time_to_live, pin_attempts, phone_number, started)
+        return response
+
+    async def voice_token(self, phone_number, pin_attempts, pin_time_to_live, pin_length):
+        """
+        A method that triggers one-time-passwords via a voice channel. See Client.voice_token
+        """
+        payload = termii_token.voice_token_payload(self.api_key, phone_number, pin_attempts, pin_time_to_live, pin_length)
+        started = time.monotonic()
+        response = await self._send("POST", termii_token.SEND_TOKEN_VOICE_URL, payload)
+        if self.pin_ledger is not None:
+            self.pin_ledger.record_response(response, pin_time_to_live, pin_attempts, phone_number, started)
+        return response
+
+    async def voice_call(self, phone_number, code, pin_attempts, pin_time_to_live, pin_length):
+        """
+        A method that sends a one-time-password through a voice call. See Client.voice_call
+        """
+        payload = termii_token.voice_call_payload(self.api_key, phone_number, code, pin_attempts, pin_time_to_live, pin_length)
+        return await self._send("POST", termii_token.SEND_TOKEN_VOICECALL_URL, payload)
+
+    async def verify_token(self, pin_id, pin):
+        """
+        A method that checks tokens sent to customers. See Client.verify_token
+        """
+        payload = termii_token.verify_token_payload(self.api_key, pin_id, pin)
+        if self.pin_ledger is not None:
+            return await self.pin_ledger.verify_async(pin_id,
+                lambda: self._send("POST", termii_token.SEND_TOKEN_VERIFYTOKEN_URL, payload))
+        return await self._send("POST", termii_token.SEND_TOKEN_VERIFYTOKEN_URL, payload)
+
+    async def in_app_token(self, phone_number, pin_attempts, pin_time_to_live, pin_length):
+        """
+        A method that returns OTP code in JSON format for web or mobile apps. See Client.in_app_token
+        """
+        payload = termii_token.in_app_token_payload(self.api_key, phone_number, pin_attempts, pin_time_to_live, pin_length)
+        started = time.monotonic()
+        response = await self._send("POST", termii_token.SEND_TOKEN_IN_APP, payload)
+        if self.pin_ledger is not None:
+            self.pin_ledger.record_response(response, pin_time_to_live, pin_attempts, phone_number, started)
+        return response
+    """ END OF METHODS FOR TOKEN """
@@ -0,0 +1,212 @@
+import asyncio
+import time
+from . import metrics
+from .codec import get_codec, encode_json
+from .retry import RetryPolicy, rewind_body
+from .transport import rebase_url
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+DEFAULT_ASYNC_POOL_SIZE = 100
+
+class AsyncHTTPTransport:
+    """
+    The transport an AsyncTermiiSession sends its requests with. It sends the requests
+    to the termii API with an httpx.AsyncClient over a pool of keep-alive connections.
+    See transport.HTTPTransport
+
+    Attributes:
+    pool_size: int
+        The maximum number of connections open to the termii API at once.
+    trace: bool
+        Measure the connect, TLS and time to first byte of every request from the httpx trace
+        events and attach them to its response as termii_phases. Set by sessions with hooks.
+    errors: tuple
+        The exceptions raised by send when a request could not be completed.
+    """
+
+    def __init__(self, pool_size=DEFAULT_ASYNC_POOL_SIZE, trace=False):
+        if httpx is None:
+            raise ImportError("httpx is required for the AsyncClient. Install it with 'pip install termii[async]'")
+
+        self.pool_size = pool_size
+        self.trace = trace
+        self.errors = (httpx.TransportError,)
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            self._client = httpx.AsyncClient(limits=limits)
+        return self._client
+
+    async def send(self, method, url, **kwargs):
+        """
+        Sends one request and returns its httpx.Response
+
+        Params:
+        method: str
+            The HTTP method of the request (Example: 'GET')
+        url: str
+            The url the request should be sent to
+        """
+        if not self.trace:
+            return await self._get_client().request(method, url, **kwargs)
+
+        started = {}
+        phases = metrics.Phases()
+
+        async def trace(event, info):
+            # httpcore reports every step as '<name>.started' and '<name>.complete' (Example: 'connection.start_tls.complete' )
+            name, _, stage = event.rpartition(".")
+            if stage == "started":
+                started[name] = time.perf_counter()
+            elif stage == "complete" and name in started:
+                elapsed = time.perf_counter() - started[name]
+                if name == "connection.connect_tcp":
+                    phases.connect += elapsed
+                elif name == "connection.start_tls":
+                    phases.tls += elapsed
+                elif name.endswith("receive_response_headers"):
+                    phases.ttfb = time.perf_counter() - started.get(name.replace("receive_response_headers", "send_request_headers"), started[name])
+
+        response = await self._get_client().request(method, url, extensions={"trace": trace}, **kwargs)
+        response.termii_phases = phases
+        return response
+
+    def is_connect_error(self, error):
+        """
+        Returns True if a request that raised one of errors never reached the API
+
+        Params:
+        error: Exception
+            The exception raised by send
+        """
+        return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
+    async def close(self):
+        """
+        Closes every connection held by the pool.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+class AsyncTermiiSession:
+    """
+    A non-blocking pooled HTTP session for the termii API built on httpx.
+    Connections are kept alive and reused by every coroutine sharing the session.
+
+    Attributes:
+    pool_size: int
+        The maximum number of connections open to the termii API at once.
+        Requests above this limit wait for a free connection.
+    rate_limiter: RateLimiter
+        Paces the requests sent with the session. No pacing is done if None.
+    retry_policy: RetryPolicy
+        Decides which failed requests are sent again. A default RetryPolicy is used if not passed.
+        Pass RetryPolicy(max_retries=0) to disable retries.
+    codec: JSONCodec
+        Encodes the json bodies of requests and decodes responses. Can be the name of a backend. The default codec, which set_default_codec changes, is used if not passed.
+    transport: AsyncHTTPTransport
+        Sends the requests. An AsyncHTTPTransport with pool_size connections is used if not passed.
+        Pass a simulator.AsyncSimulatorTransport to run against the in-process termii simulator.
+    base_url: str
+        Sends the requests to another scheme and host than https://api.ng.termii.com (Example: 'http://127.0.0.1:8080' ).
+    hooks: list
+        Callables passed a metrics.RequestMetrics after every request. See TermiiSession
+    """
+
+    def __init__(self, pool_size=DEFAULT_ASYNC_POOL_SIZE, rate_limiter=None, retry_policy=None, codec=None, transport=None, base_url=None, hooks=None):
+        self.pool_size = pool_size
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.hooks = list(hooks or ())
+        self._codec = get_codec(codec) if codec is not None else None
+        self._traced = None
+        self.transport = transport if transport is not None else AsyncHTTPTransport(pool_size, trace=bool(self.hooks))
+        self.base_url = base_url
+
+    @property
+    def codec(self):
+        # A session created without a codec follows codec.set_default_codec.
+        codec = self._codec if self._codec is not None else get_codec()
+        if not self.hooks:
+            return codec
+        self._traced = metrics.trace_codec(codec, self._traced)
+        return self._traced
+
+    async def request(self, method, url, **kwargs):
+        """
+        Sends a request over a pooled connection and returns the response.
+
+        Params:
+        method: str
+            The HTTP method of the request (Example: 'GET')
+        url: str
+            The url the request should be sent to
+        """
+        if "json" in kwargs:
+            kwargs = encode_json(self.codec, kwargs, body="content")
+
+        url = rebase_url(url, self.base_url)
+        transport = self.transport
+        attempt = 0
+        measured = metrics.start_request(method, url, kwargs.get("content")) if self.hooks else None
+        start = time.perf_counter()
+
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(url)
+
+            try:
+                response = await transport.send(method, url, **kwargs)
+            except transport.errors as error:
+                if measured is not None:
+                    measured.statuses.append(type(error).__name__)
+                if not self.retry_policy.should_retry_error(method, attempt, transport.is_connect_error(error)) or not rewind_body(kwargs.get("content")):
+                    if measured is not None:
+                        self._emit(measured, start, attempt, error=error)
+                    raise
+                delay = self.retry_policy.delay(attempt)
+            else:
+                if measured is not None:
+                    measured.statuses.append(response.status_code)
+                if not self.retry_policy.should_retry_response(method, attempt, response) or not rewind_body(kwargs.get("content")):
+                    if measured is not None:
+                        self._emit(measured, start, attempt, response=response)
+                    return response
+                delay = self.retry_policy.delay(attempt, response)
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _emit(self, measured, start, attempt, response=None, error=None):
+        if response is not None:
+            metrics.record_response(measured, response, self.codec)
+        else:
+            measured.error = type(error).__name__
+        measured.retries = attempt
+        measured.latency = time.perf_counter() - start
+        metrics.emit(self.hooks, measured)
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def patch(self, url, **kwargs):
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        return await self.request("DELETE", url, **kwargs)
+
+    async def close(self):
+        """
+        Closes every connection held by the transport.
+        """
+        await self.transport.close()
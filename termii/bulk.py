@@ -0,0 +1,258 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from . import termii_switch
+from . import validation
+from .results import ChunkResult, BulkResult, SendResult, TemplatedResult
+from .idempotency import fingerprint
+from .session import get_session
+from .templates import MessageTemplate, group_by_text, DEFAULT_NUMBER_FIELD
+from .utilities import WrongType, APIError
+
+MAX_BULK_RECIPIENTS = 10000
+DEFAULT_BULK_WORKERS = 4
+DEFAULT_SEND_WORKERS = 8
+
+def chunk_numbers(numbers_to, chunk_size=MAX_BULK_RECIPIENTS):
+    """
+    Lazily splits any iterable of phone numbers into lists of at most chunk_size numbers
+
+    Params:
+    numbers_to: iterable
+        The phone numbers to split
+    chunk_size: int
+        The maximum number of phone numbers in a chunk
+    """
+    iterator = iter(numbers_to)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def _guarded(guard, session, send, number_to, sender_id, message, channel):
+    # Makes a send through the idempotency guard, if there is one.
+    if guard is None:
+        return send()
+    return guard.run(fingerprint(number_to, sender_id, message, channel), send, transport=get_session(session).transport)
+
+def _post(session, url, payload, statuses):
+    # Sends a message, notes its status code and returns its decoded body. Raises APIError for a status other than 2xx.
+    session = get_session(session)
+    response = session.post(url, json=payload)
+    statuses.append(response.status_code)
+    return session.codec.decode(response, check=True)
+
+def _send_chunk(api_key, index, chunk, sender_id, message, message_type, channel, session, templated=False, guard=None):
+    label = message if templated else None
+    statuses = []
+    try:
+        payload = termii_switch.bulk_message_payload(api_key, chunk, sender_id, message, message_type, channel)
+        response = _guarded(guard, session, lambda: _post(session, termii_switch.BULK_MESSAGE_URL, payload, statuses), chunk, sender_id, message, channel)
+    except APIError as error:
+        return ChunkResult(index, len(chunk), response=error.response, error=error, message=label, status_code=error.status_code)
+    except Exception as error:
+        return ChunkResult(index, len(chunk), error=error, message=label)
+    return ChunkResult(index, len(chunk), response=response, message=label, status_code=statuses[-1] if statuses else None)
+
+def send_bulk_in_chunks(api_key, numbers_to, sender_id, message, message_type, channel,
+        chunk_size=MAX_BULK_RECIPIENTS, max_workers=DEFAULT_BULK_WORKERS, session=None, guard=None):
+    """
+    A function to send one message to an arbitrarily large stream of recipients.
+    The recipients are split into chunks the bulk endpoint accepts and the chunks are
+    sent concurrently. At most max_workers chunks are held in memory at a time, the
+    recipient stream is only read further once a chunk has been sent. If reading the
+    stream raises, such as InvalidPhoneNumber from a normaliser, the chunks already read
+    are still sent and the error is reported as a failed chunk of size 0 ending the result.
+
+    Params:
+    api_key: str
+        The API key for a certain termii account
+    numbers_to: iterable
+        Any iterable (list, generator, file...) of phone numbers in international format. '+' should be excluded
+    sender_id: str
+        The sender id this message should be sent from and identify with
+    message: str
+        The message to be sent.
+    message_type: str
+        The type of message to be sent. Should be 'plain'
+    channel: str
+        The channel this message should be sent with. Can be 'dnd', 'whatsapp' or 'generic'
+    chunk_size: int
+        The number of recipients in each request. Must be between 1 and 10000
+    max_workers: int
+        The maximum number of chunks sent at the same time
+    session: TermiiSession| Optional
+        The pooled session the requests are sent with. The shared default session is used if not passed
+    guard: IdempotencyGuard| Optional
+        Suppresses chunks that were already sent with the same text within its window
+    """
+
+    if chunk_size < 1 or chunk_size > MAX_BULK_RECIPIENTS:
+        raise ValueError(f"chunk_size must be between 1 and {MAX_BULK_RECIPIENTS}")
+
+    validation.SEND_BULK_SMS.validate({"sender_id": sender_id, "message": message, "message_type": message_type, "channel": channel})
+
+    results = []
+    pending = set()
+
+    index = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for index, chunk in enumerate(chunk_numbers(numbers_to, chunk_size)):
+                if len(pending) >= max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    results.extend(future.result() for future in done)
+
+                pending.add(executor.submit(_send_chunk, api_key, index, chunk, sender_id, message, message_type, channel, session, guard=guard))
+                index += 1
+        except Exception as error:
+            # The chunks already read are still sent and reported, the rest of the stream is abandoned.
+            results.append(ChunkResult(index, 0, error=error))
+
+        done, _ = wait(pending)
+        results.extend(future.result() for future in done)
+
+    return BulkResult(results)
+
+def send_templated(api_key, template, records, sender_id, message_type, channel, number_field=DEFAULT_NUMBER_FIELD,
+        chunk_size=MAX_BULK_RECIPIENTS, max_workers=DEFAULT_BULK_WORKERS, normalise=None, session=None, guard=None):
+    """
+    A function to send a personalised message to a stream of contact records with as few
+    requests as possible. The template is compiled once and rendered for every record, and
+    the recipients whose messages rendered to the same text share bulk requests, so a
+    campaign with a handful of distinct texts costs a handful of requests instead of one
+    per contact. The grouped chunks are sent concurrently.
+
+    The recipients of every distinct text are held in memory until the stream ends or the
+    group fills a chunk, so the memory grows with the number of distinct texts pending.
+    If reading the records raises, the groups already read are still sent and the error is
+    reported as a failed chunk of size 0 ending the result.
+
+    Params:
+    api_key: str
+        The API key for a certain termii account
+    template: MessageTemplate| str
+        The message with {field} placeholders filled from every record (Example: 'Hi {first_name}, your code is {code}' )
+    records: iterable
+        Any iterable of mappings holding the phone number and the fields of the template, such as a csv.DictReader
+    sender_id: str
+        The sender id this message should be sent from and identify with
+    message_type: str
+        The type of message to be sent. Should be 'plain'
+    channel: str
+        The channel this message should be sent with. Can be 'dnd', 'whatsapp' or 'generic'
+    number_field: str
+        The key of the phone number in every record
+    chunk_size: int
+        The maximum number of recipients in each request. Must be between 1 and 10000
+    max_workers: int
+        The maximum number of chunks sent at the same time
+    normalise: callable| Optional
+        Returns a phone number in international format, or None if it is invalid. Records with invalid numbers are skipped
+    session: TermiiSession| Optional
+        The pooled session the requests are sent with. The shared default session is used if not passed
+    guard: IdempotencyGuard| Optional
+        Suppresses chunks that were already sent with the same text within its window
+    """
+
+    if chunk_size < 1 or chunk_size > MAX_BULK_RECIPIENTS:
+        raise ValueError(f"chunk_size must be between 1 and {MAX_BULK_RECIPIENTS}")
+
+    template = template if isinstance(template, MessageTemplate) else MessageTemplate(template)
+    validation.SEND_BULK_SMS.validate({"sender_id": sender_id, "message": template.template, "message_type": message_type, "channel": channel})
+
+    results = []
+    skipped = []
+    pending = set()
+
+    index = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        groups = group_by_text(template, records, chunk_size, number_field=number_field, normalise=normalise, skipped=skipped)
+        try:
+            for index, (message, chunk) in enumerate(groups):
+                if len(pending) >= max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    results.extend(future.result() for future in done)
+
+                pending.add(executor.submit(_send_chunk, api_key, index, chunk, sender_id, message, message_type, channel, session, templated=True, guard=guard))
+                index += 1
+        except Exception as error:
+            # The groups already read are still sent and reported, the rest of the stream is abandoned.
+            results.append(ChunkResult(index, 0, error=error))
+
+        done, _ = wait(pending)
+        results.extend(future.result() for future in done)
+
+    return TemplatedResult(results, skipped)
+
+def _send_one(api_key, index, message, session, guard=None):
+    statuses = []
+    try:
+        if type(message) != dict:
+            raise WrongType("dict", "message")
+        channel = message.get("channel", "generic")
+        payload = termii_switch.message_payload(api_key, message["number_to"], message["sender_id"], message["message"],
+            message.get("message_type", "plain"), channel, message.get("media_dict", {}))
+        response = _guarded(guard, session, lambda: _post(session, termii_switch.SEND_MESSAGE_URL, payload, statuses),
+            message["number_to"], message["sender_id"], message["message"], channel)
+    except APIError as error:
+        return SendResult(index, message, response=error.response, error=error, status_code=error.status_code)
+    except Exception as error:
+        return SendResult(index, message, error=error)
+    return SendResult(index, message, response=response, status_code=statuses[-1] if statuses else None)
+
+def send_many(api_key, messages, max_workers=DEFAULT_SEND_WORKERS, ordered=False, session=None, guard=None):
+    """
+    A generator that sends a different message to every recipient on a pool of worker
+    threads and yields a SendResult for every message. A failed message does not stop
+    the batch, its SendResult carries the error instead. At most twice max_workers
+    messages are read from the input ahead of the results.
+
+    Params:
+    api_key: str
+        The API key for a certain termii account
+    messages: iterable
+        Any iterable of dictionaries with the 'number_to', 'sender_id' and 'message' keys.
+        'message_type', 'channel' and 'media_dict' are optional and default to 'plain', 'generic' and {}
+    max_workers: int
+        The maximum number of messages sent at the same time
+    ordered: bool
+        Yield the results in the order of the input if True, otherwise as soon as each message is sent
+    session: TermiiSession| Optional
+        The pooled session the requests are sent with. The shared default session is used if not passed
+    guard: IdempotencyGuard| Optional
+        Suppresses messages that were already sent to the same recipient within its window
+    """
+
+    max_pending = max_workers * 2
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = deque() if ordered else set()
+
+    try:
+        for index, message in enumerate(messages):
+            if len(pending) >= max_pending:
+                if ordered:
+                    yield pending.popleft().result()
+                else:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+
+            future = executor.submit(_send_one, api_key, index, message, session, guard)
+            if ordered:
+                pending.append(future)
+            else:
+                pending.add(future)
+
+        while pending:
+            if ordered:
+                yield pending.popleft().result()
+            else:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
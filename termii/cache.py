@@ -0,0 +1,167 @@
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+class TTLCache:
+    """
+    A thread-safe cache holding at most maxsize entries, each for at most ttl seconds.
+    When the cache is full, the least recently used entry is evicted.
+
+    Attributes:
+    maxsize: int
+        The maximum number of entries held by the cache
+    ttl: float
+        The number of seconds an entry stays valid after it is set
+    hits: int
+        The number of lookups answered from the cache
+    misses: int
+        The number of lookups that found no valid entry
+    """
+
+    def __init__(self, maxsize=1024, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        """
+        Returns the value cached for the key, or default if there is no valid entry
+
+        Params:
+        key: hashable
+            The key of the entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """
+        Caches the value for the key, evicting the least recently used entry if the cache is full
+
+        Params:
+        key: hashable
+            The key of the entry
+        value: any
+            The value to cache
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """
+        Removes the entry of the key from the cache, if there is one
+
+        Params:
+        key: hashable
+            The key of the entry
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Removes every entry from the cache
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"TTLCache(size={len(self)}, maxsize={self.maxsize}, ttl={self.ttl}, hits={self.hits}, misses={self.misses})"
+
+class ListingCache:
+    """
+    Caches listing responses of the termii API, such as the sender ids or the phonebooks
+    of an account, together with a dictionary indexing the listed items by id.
+    Listings are kept for ttl seconds or until they are invalidated.
+
+    Attributes:
+    ttl: float
+        The number of seconds a listing stays valid after it is fetched
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._cache = TTLCache(maxsize=16, ttl=ttl)
+
+    @property
+    def hits(self):
+        return self._cache.hits
+
+    @property
+    def misses(self):
+        return self._cache.misses
+
+    def get(self, name):
+        """
+        Returns the cached (response, index) pair of a listing, or MISSING if it is not cached
+
+        Params:
+        name: str
+            The name of the listing (Example: 'sender_ids')
+        """
+        return self._cache.get(name)
+
+    def set(self, name, response, id_field):
+        """
+        Caches a listing response and returns the (response, index) pair. Responses without
+        a 'data' list, such as error responses, are not cached and get an empty index.
+
+        Params:
+        name: str
+            The name of the listing (Example: 'sender_ids')
+        response: dict
+            The decoded termii response of the listing
+        id_field: str
+            The field of the listed items to index them by (Example: 'sender_id')
+        """
+        index = index_listing(response, id_field)
+        if index is not None:
+            self._cache.set(name, (response, index))
+        return response, index or {}
+
+    def invalidate(self, name):
+        """
+        Drops a cached listing, so the next lookup fetches it again
+
+        Params:
+        name: str
+            The name of the listing (Example: 'phonebooks')
+        """
+        self._cache.invalidate(name)
+
+def index_listing(response, id_field):
+    """
+    Returns a dictionary of the items of a termii listing response keyed by id_field,
+    or None if the response has no 'data' list. Only the items of the response are indexed,
+    so a listing of several pages is fetched with pagination.fetch_all_pages first
+
+    Params:
+    response: dict
+        The decoded termii response of the listing
+    id_field: str
+        The field of the listed items to index them by (Example: 'sender_id')
+    """
+    items = response.get("data") if isinstance(response, dict) else None
+    if not isinstance(items, list):
+        return None
+    return {item[id_field]: item for item in items if isinstance(item, dict) and id_field in item}
@@ -1,6 +1,16 @@
-import termii_switch
-import termii_token
-import termii_insight
+import time
+from . import termii_switch
+from . import termii_token
+from . import termii_insight
+from . import bulk
+from . import upload
+from .contacts import ContactImport
+from .pagination import fetch_all_pages, DEFAULT_PAGE_SIZE
+from .cache import ListingCache, MISSING, index_listing
+from .idempotency import fingerprint
+from .outbox import Outbox, DEFAULT_OUTBOX_WORKERS
+from .session import TermiiSession, DEFAULT_POOL_SIZE
+from .utilities import APIError
 
 class Client:
     """
@@ -10,21 +20,62 @@ class Client:
     Attributes:
     api_key: str 
         The termii developer API Key to create a client from.
+    pool_size: int
+        The maximum number of keep-alive connections the client keeps open to the termii API.
+    session: TermiiSession
+        The thread-safe pooled session every request of the client is sent with.
+    rate_limiter: RateLimiter
+        An optional rate_limit.RateLimiter pacing the requests of the client per endpoint group.
+    retry_policy: RetryPolicy
+        An optional retry.RetryPolicy deciding which failed requests are sent again.
+        By default 429s, connection failures and 5xx responses of idempotent requests are retried.
+    lookup_cache: TTLCache
+        An optional cache.TTLCache answering repeated search_number and search_number_status
+        lookups of the same number without a request.
+    listing_ttl: float
+        The number of seconds the sender ID and phonebook listings are cached for. They are not cached if None.
+    normaliser: NumberNormaliser
+        An optional phone_numbers.NumberNormaliser checking and normalising phone numbers before they are sent.
+    codec: JSONCodec
+        An optional codec.JSONCodec, or the name of its backend, encoding requests and decoding responses.
+        orjson or ujson are used when installed, otherwise the json module.
+    transport: HTTPTransport
+        An optional transport sending the requests of the client. Pass a simulator.SimulatorTransport
+        to run the client against the in-process termii simulator instead of the termii API.
+    base_url: str
+        An optional scheme and host the requests are sent to instead of https://api.ng.termii.com (Example: 'http://127.0.0.1:8080' ).
+    hooks: list
+        Optional callables passed a metrics.RequestMetrics with the latency, phases, sizes, status and retries
+        of every request, such as a metrics.MetricsRecorder or a metrics.OpenTelemetryHook.
+    idempotency_guard: IdempotencyGuard
+        An optional idempotency.IdempotencyGuard suppressing repeats of the same message to the same recipients
+        within its window, across send_message, send_bulk_sms, send_bulk_sms_chunked, send_templated, send_many and outboxes.
+    pin_ledger: PinLedger
+        An optional pins.PinLedger remembering the pins of send_token, voice_token and in_app_token, so verify_token
+        answers verifies of expired, exhausted or already verified pins without a request.
 
     Methods:
     fetch_sender_ids: A method to request new termii sender ID.
+    has_sender_id: A method to check if a sender ID exists on the account using the cached sender ID listing.
     request_sender_id: A method to request new termii sender ID.
     send_message: A method to send a message using the termii API.
     send_bulk_sms: A method to send bulk sms messages using the termii API.
+    send_bulk_sms_chunked: A method to send one sms to any number of recipients in concurrent, API-sized chunks.
+    send_templated: A method to send a personalised sms to a stream of contact records, grouping identical texts into bulk requests.
+    send_many: A method to send a different message to every recipient on a pool of worker threads.
+    outbox: A method that opens a durable SQLite outbox whose background workers send the messages queued on it.
     send_message_with_autogenerated_number: A method to send messages to customers using Termii's auto-generated messaging numbers that adapt to customers location.
     send_device_template: A method to set a device template for the one-time-passwords (pins) sent to their customers via whatsapp or sms.
     fetch_phonebooks: A method to get all the phonebooks associated to a termii client
+    has_phonebook: A method to check if a phonebook exists on the account using the cached phonebook listing.
     create_phonebook: A method to create a phonebook using the termii API
     update_phonebook: A method to update phonebook using the termii API
     delete_phonebook: A method to delete a phonebook using the termii API
     fetch_contacts: A method to get all the contacts associated to a termii phonebook
+    iter_contacts: A method that lazily iterates over the contacts of a termii phonebook page by page.
     add_new_contact: A method to add a single contact to a phonebook using the termii API
     add_contacts: A method to add contacts to a phonebook using the termii API
+    upload_contacts: A method to add the contacts of a file of any size to a phonebook in concurrent, streamed uploads.
     delete_contact: A method to delete contacts from a phonebook using the termii API
     send_campaign: A method to send campaigns using the termii API
     fetch_campaigns: A method to get the all campaigns associated with a client
@@ -33,22 +84,91 @@ class Client:
     search_number: A method to verify phone numbers and automatically detect their status
     search_number_status: A method to detect if a number is fake or has ported to a new network.
     fetch_history: A method that returns reports for messages sent across the sms, voice & whatsapp channels.
+    iter_history: A method that lazily iterates over the message reports page by page.
+    sync_history: A method that copies the message reports sent since the last sync into a local store.
     send_token:  A method that allows businesses trigger one-time-passwords(OTP) across any available messaging channel on Termii.
     voice_token: A method that enables you to generate and trigger one-time-passwords via a voice channel to a phone number.
     voice_call: A method that enables you to send messages from your application through a voice channel to a client's phone number.
     verify_token:  A method that checks tokens sent to customers and returns a response confirming the status of the token.
     in_app_token: A method that returns OTP code in JSON fromat which can be used in any web or mobile app.
+    close: A method that closes every pooled connection held by the client.
     """
-    def __init__(self, api_key):
+    def __init__(self, api_key, pool_size=DEFAULT_POOL_SIZE, rate_limiter=None, retry_policy=None, lookup_cache=None, listing_ttl=None, normaliser=None, codec=None, transport=None, base_url=None, hooks=None, idempotency_guard=None, pin_ledger=None):
         self.api_key = api_key
+        self.pin_ledger = pin_ledger
+        self.idempotency_guard = idempotency_guard
+        self.normaliser = normaliser
+        self.lookup_cache = lookup_cache
+        self.listing_cache = ListingCache(listing_ttl) if listing_ttl is not None else None
+        self.pool_size = pool_size
+        self.session = TermiiSession(pool_size, rate_limiter=rate_limiter, retry_policy=retry_policy, codec=codec,
+            transport=transport, base_url=base_url, hooks=hooks)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        A method that closes every pooled connection held by the client.
+        """
+        self.session.close()
+
+    def _fetch_listing(self, name, id_field, url, bypass_cache):
+        if self.listing_cache is None:
+            response = fetch_all_pages(self.session, url, {"api_key": self.api_key})
+            return response, index_listing(response, id_field) or {}
+
+        if not bypass_cache:
+            cached = self.listing_cache.get(name)
+            if cached is not MISSING:
+                return cached
+
+        response = fetch_all_pages(self.session, url, {"api_key": self.api_key})
+        return self.listing_cache.set(name, response, id_field)
+
+    def _invalidate_listing(self, name):
+        if self.listing_cache is not None:
+            self.listing_cache.invalidate(name)
+
+    def _send_once(self, url, payload, number_to, sender_id, message, channel):
+        # Sends a message through the idempotency guard, which only remembers sends termii accepted.
+        # The error body of a rejected send is returned, like without a guard.
+        send = lambda: self.session.codec.decode(self.session.post(url, json=payload), check=True)
+        try:
+            return self.idempotency_guard.run(fingerprint(number_to, sender_id, message, channel), send, transport=self.session.transport)
+        except APIError as error:
+            if not error.decoded:
+                raise
+            return error.response
 
     """ START OF METHODS FOR SWITCH"""
-    def fetch_sender_ids(self):
+    def fetch_sender_ids(self, bypass_cache=False):
         """
-        A method to request new termii sender ID.
+        A method to fetch the sender ids of the client. Every page of the listing is fetched,
+        and the response of the first page is returned with the sender ids of every page.
+
+        Params:
+        bypass_cache: bool| Optional
+            Fetch the listing from the termii API even if it is cached
         """
-        response = termii_switch.get_sender_ids(self.api_key)
+        response, _ = self._fetch_listing("sender_ids", "sender_id", termii_switch.FETCH_SENDER_ID_URL, bypass_cache)
         return response
+
+    def has_sender_id(self, sender_id):
+        """
+        A method to check if a sender ID exists on the account. The sender ID listing is
+        fetched once and then looked up locally until it expires or is invalidated,
+        if the client was created with a listing_ttl.
+
+        Params:
+        sender_id: str
+            The sender ID to look up
+        """
+        _, index = self._fetch_listing("sender_ids", "sender_id", termii_switch.FETCH_SENDER_ID_URL, False)
+        return sender_id in index
     
     def request_sender_id(self, sender_id, usecase, company):
         """
@@ -63,7 +183,8 @@ class Client:
             The name of the company associated with this sender_id
         """
 
-        response = termii_switch.request_new_sender_id(self.api_key, sender_id, usecase, company)
+        response = termii_switch.request_new_sender_id(self.api_key, sender_id, usecase, company, session=self.session)
+        self._invalidate_listing("sender_ids")
         return response
     
     def send_message(self, number_to, sender_id, message, message_type, channel, media_dict):
@@ -84,7 +205,14 @@ class Client:
         media_dict: dict
             A dictionary containing the options for media if applicable. Should contain 'url' and 'caption' keys. Pass an empty dictionary if not applicable
         """
-        response = termii_switch.post_message(self.api_key, number_to, sender_id, message, message_type, channel, media_dict)
+        if self.normaliser is not None:
+            number_to = self.normaliser.check(number_to)
+
+        if self.idempotency_guard is not None:
+            payload = termii_switch.message_payload(self.api_key, number_to, sender_id, message, message_type, channel, media_dict)
+            return self._send_once(termii_switch.SEND_MESSAGE_URL, payload, number_to, sender_id, message, channel)
+
+        response = termii_switch.post_message(self.api_key, number_to, sender_id, message, message_type, channel, media_dict, session=self.session)
         return response
 
     def send_bulk_sms(self, numbers_to, sender_id, message, message_type, channel):
@@ -104,9 +232,117 @@ class Client:
             The channel this message should be sent with. Can be 'dnd', 'whatsapp' or 'generic'
         """
 
-        response = termii_switch.post_message_bulk(self.api_key, numbers_to, sender_id, message, message_type, channel)
+        if self.normaliser is not None:
+            numbers_to = self.normaliser.check_many(numbers_to)
+
+        if self.idempotency_guard is not None:
+            payload = termii_switch.bulk_message_payload(self.api_key, numbers_to, sender_id, message, message_type, channel)
+            return self._send_once(termii_switch.BULK_MESSAGE_URL, payload, numbers_to, sender_id, message, channel)
+
+        response = termii_switch.post_message_bulk(self.api_key, numbers_to, sender_id, message, message_type, channel, session=self.session)
+        return response
+
+    def send_bulk_sms_chunked(self, numbers_to, sender_id, message, message_type, channel,
+        chunk_size=bulk.MAX_BULK_RECIPIENTS, max_workers=bulk.DEFAULT_BULK_WORKERS):
+        """
+        A method to send one sms to any number of recipients. The recipients are sent
+        in API-sized chunks, several chunks at a time, and a BulkResult with the status
+        of every chunk is returned.
+
+        Params:
+        numbers_to: iterable
+            Any iterable of phone numbers in international format, such as a list or a generator. '+' should be excluded
+        sender_id: str
+            The sender id this message should be sent from and identify with
+        message: str
+            The message to be sent.
+        message_type: str
+            The type of message to be sent. Should be 'plain'
+        channel: str
+            The channel this message should be sent with. Can be 'dnd', 'whatsapp' or 'generic'
+        chunk_size: int
+            The number of recipients in each request. Must be between 1 and 10000
+        max_workers: int
+            The maximum number of chunks sent at the same time
+        """
+
+        if self.normaliser is not None:
+            numbers_to = self.normaliser.iter_checked(numbers_to)
+
+        response = bulk.send_bulk_in_chunks(self.api_key, numbers_to, sender_id, message, message_type, channel,
+            chunk_size=chunk_size, max_workers=max_workers, session=self.session, guard=self.idempotency_guard)
         return response
 
+    def send_templated(self, template, records, sender_id, message_type, channel, number_field=bulk.DEFAULT_NUMBER_FIELD,
+        chunk_size=bulk.MAX_BULK_RECIPIENTS, max_workers=bulk.DEFAULT_BULK_WORKERS):
+        """
+        A method to send a personalised sms to a stream of contact records. The template is compiled
+        once and rendered for every record, and recipients whose messages render to the same text are
+        sent together in bulk requests. A TemplatedResult with the status of every request and the
+        records that were skipped is returned.
+
+        Params:
+        template: MessageTemplate| str
+            The message with {field} placeholders filled from every record (Example: 'Hi {first_name}, your code is {code}' )
+        records: iterable
+            Any iterable of mappings holding the phone number and the fields of the template, such as a csv.DictReader
+        sender_id: str
+            The sender id this message should be sent from and identify with
+        message_type: str
+            The type of message to be sent. Should be 'plain'
+        channel: str
+            The channel this message should be sent with. Can be 'dnd', 'whatsapp' or 'generic'
+        number_field: str
+            The key of the phone number in every record
+        chunk_size: int
+            The maximum number of recipients in each request. Must be between 1 and 10000
+        max_workers: int
+            The maximum number of requests sent at the same time
+        """
+
+        normalise = self.normaliser.normalise if self.normaliser is not None else None
+        response = bulk.send_templated(self.api_key, template, records, sender_id, message_type, channel, number_field=number_field,
+            chunk_size=chunk_size, max_workers=max_workers, normalise=normalise, session=self.session, guard=self.idempotency_guard)
+        return response
+
+    def send_many(self, messages, max_workers=bulk.DEFAULT_SEND_WORKERS, ordered=False):
+        """
+        A method to send a different message to every recipient on a pool of worker threads.
+        It returns a generator yielding a SendResult for every message. Errors are reported
+        on the SendResult of the message that failed and do not stop the rest of the batch.
+
+        Params:
+        messages: iterable
+            Any iterable of dictionaries with the 'number_to', 'sender_id' and 'message' keys.
+            'message_type', 'channel' and 'media_dict' are optional and default to 'plain', 'generic' and {}
+        max_workers: int
+            The maximum number of messages sent at the same time
+        ordered: bool
+            Yield the results in the order of the input if True, otherwise as soon as each message is sent
+        """
+
+        response = bulk.send_many(self.api_key, messages, max_workers=max_workers, ordered=ordered, session=self.session, guard=self.idempotency_guard)
+        return response
+
+    def outbox(self, path, workers=DEFAULT_OUTBOX_WORKERS, **options):
+        """
+        A method that opens a durable outbox.Outbox stored in a SQLite database and starts its workers.
+        Its enqueue methods return as soon as the send is stored, and the workers send it with the
+        session of the client. Sends survive restarts and are flushed when the outbox is closed.
+
+        Params:
+        path: str
+            The path of the SQLite database of the outbox
+        workers: int
+            The number of threads sending the queued messages
+        options: any
+            The other options of the Outbox (Example: max_attempts=5, on_result=callback )
+        """
+
+        options.setdefault("normaliser", self.normaliser)
+        options.setdefault("guard", self.idempotency_guard)
+        return Outbox(self.api_key, path, workers=workers, session=self.session, **options).start()
+
     def send_message_with_autogenerated_number(self, number_to, message):
         """
         A method to send messages to customers using Termii's auto-generated messaging numbers that adapt to customers location.
@@ -118,7 +354,7 @@ class Client:
             The message to be sent.
         """
 
-        response = termii_switch.number_message_send(self.api_key, number_to, message)
+        response = termii_switch.number_message_send(self.api_key, number_to, message, session=self.session)
         return response
 
     def send_device_template(self, phone_number, device_id, template_id, data):
@@ -136,17 +372,35 @@ class Client:
             Represents an object of key: value pair. The keys for the data object can be found on the device subscription page on your dashboard.
         """
 
-        response = termii_switch.template_setter(self.api_key, phone_number, device_id, template_id, data)
+        response = termii_switch.template_setter(self.api_key, phone_number, device_id, template_id, data, session=self.session)
         return response
 
-    def fetch_phonebooks(self):
+    def fetch_phonebooks(self, bypass_cache=False):
         """
-        A method to get all the phonebooks associated to a termii client
+        A method to get all the phonebooks associated to a termii client. Every page of the listing
+        is fetched, and the response of the first page is returned with the phonebooks of every page.
+
+        Params:
+        bypass_cache: bool| Optional
+            Fetch the listing from the termii API even if it is cached
         """
         
-        response = termii_switch.get_phonebooks(self.api_key)
+        response, _ = self._fetch_listing("phonebooks", "id", termii_switch.PHONEBOOKS_URL, bypass_cache)
         return response
 
+    def has_phonebook(self, phonebook_id):
+        """
+        A method to check if a phonebook exists on the account. The phonebook listing is
+        fetched once and then looked up locally until it expires or is invalidated,
+        if the client was created with a listing_ttl.
+
+        Params:
+        phonebook_id: str
+            The id of the phonebook to look up
+        """
+        _, index = self._fetch_listing("phonebooks", "id", termii_switch.PHONEBOOKS_URL, False)
+        return phonebook_id in index
+
     def create_phonebook(self, description, phonebook_name):
         """
         A method to create a phonebook using the termii API
@@ -157,7 +411,8 @@ class Client:
         phonebook_name: str
             The name of the phonebook
         """
-        response = termii_switch.make_phonebook(self.api_key, description, phonebook_name)
+        response = termii_switch.make_phonebook(self.api_key, description, phonebook_name, session=self.session)
+        self._invalidate_listing("phonebooks")
         return response
     
     def update_phonebook(self, phonebook_id, phonebook_name, phone_description):
@@ -173,7 +428,8 @@ class Client:
             The new description of the phonebook
         """
 
-        response = termii_switch.patch_phonebook(self.api_key, phonebook_id, phonebook_name, phone_description)
+        response = termii_switch.patch_phonebook(self.api_key, phonebook_id, phonebook_name, phone_description, session=self.session)
+        self._invalidate_listing("phonebooks")
         return response
 
     def delete_phonebook(self, phonebook_id):
@@ -185,7 +441,8 @@ class Client:
             The id of the phonebook to be updated
         """
 
-        response = termii_switch.remove_phonebook(self.api_key, phonebook_id)
+        response = termii_switch.remove_phonebook(self.api_key, phonebook_id, session=self.session)
+        self._invalidate_listing("phonebooks")
         return response
     
     def fetch_contacts(self, phonebook_id):
@@ -197,7 +454,25 @@ class Client:
             The id of the phonebook
         """
         
-        response = termii_switch.get_contacts_from_phonebook(self.api_key, phonebook_id)
+        response = termii_switch.get_contacts_from_phonebook(self.api_key, phonebook_id, session=self.session)
+        return response
+
+    def iter_contacts(self, phonebook_id, page_size=DEFAULT_PAGE_SIZE, prefetch=0):
+        """
+        A method that returns a generator over the contacts of a termii phonebook. The contacts
+        are fetched lazily page by page, so large phonebooks are never held in memory at once.
+
+        Params:
+        phonebook_id: str
+            The id of the phonebook
+        page_size: int
+            The number of contacts fetched per request
+        prefetch: int
+            The number of pages fetched concurrently ahead of the caller. 0 disables prefetching
+        """
+
+        response = termii_switch.iter_contacts_from_phonebook(self.api_key, phonebook_id, page_size=page_size,
+            prefetch=prefetch, session=self.session)
         return response
     
     def add_new_contact(self, phone_number, phonebook_id, country_code, options):
@@ -215,7 +490,11 @@ class Client:
             A dictionary containing certain options such as 'email_address', 'first_name', 'last_name' and 'company' which are all strings. An empty dictionary should be passed if there are no options.
         """
 
-        response = termii_switch.add_contact(self.api_key, phone_number, phonebook_id, country_code, options)
+        if self.normaliser is not None:
+            self.normaliser.check(phone_number, country_code)
+
+        response = termii_switch.add_contact(self.api_key, phone_number, phonebook_id, country_code, options, session=self.session)
+        self._invalidate_listing("phonebooks")
         return response
     
     def add_contacts(self, contact_file, country_code, extension, phonebook_id):
@@ -223,8 +502,9 @@ class Client:
         A method to add contacts to a phonebook using the termii API
 
         Params:
-        contact_file: str
+        contact_file: str| file| iterable
             File containing the list of contacts you want to add to your phonebook. Supported files include : 'txt', 'xlsx', and 'csv'.
+            Can be a path, a file object, or an iterable of bytes or str such as a generator of lines. The file is streamed.
         country_code: str
             Represents short numeric geographical codes developed to represent countries (Example: 234 ).
         extension: str
@@ -233,7 +513,43 @@ class Client:
             The id of the phonebook
         """
 
-        response = termii_switch.add_many_contacts(self.api_key, contact_file, country_code, extension, phonebook_id)
+        response = termii_switch.add_many_contacts(self.api_key, contact_file, country_code, extension, phonebook_id, session=self.session)
+        self._invalidate_listing("phonebooks")
+        return response
+
+    def upload_contacts(self, contact_file, country_code, extension, phonebook_id,
+        split_size=upload.DEFAULT_SPLIT_SIZE, max_workers=upload.DEFAULT_UPLOAD_WORKERS, header=False):
+        """
+        A method to add the contacts of a file of any size to a phonebook using the termii API.
+        The file is streamed, and csv or txt files larger than split_size are split on line
+        boundaries into several uploads sent concurrently. A file given by path is streamed
+        part by part, while the parts of file objects and iterables are read into memory
+        before they are sent, at most max_workers + 1 parts at a time. A BulkResult reporting
+        every upload is returned.
+
+        Params:
+        contact_file: str| file| iterable
+            A path, a file object, or an iterable of bytes or str such as a generator of lines
+        country_code: str
+            Represents short numeric geographical codes developed to represent countries (Example: 234 ).
+        extension: str
+            The extension of the contact file: (Example: 'text/csv')
+        phonebook_id: str
+            The id of the phonebook
+        split_size: int
+            The maximum number of bytes of the file carried by a single upload, a repeated header included. A line longer than split_size is sent in an upload of its own. None disables splitting
+        max_workers: int
+            The maximum number of uploads sent at the same time
+        header: bool
+            Repeat the first line of the file at the top of every upload, for csv files with a header row
+        """
+
+        if self.normaliser is not None and extension in upload.SPLITTABLE_TYPES and not isinstance(contact_file, ContactImport):
+            contact_file = ContactImport(contact_file, country_code, header=header, normalise=self.normaliser.normalise)
+
+        response = termii_switch.upload_many_contacts(self.api_key, contact_file, country_code, extension, phonebook_id,
+            split_size=split_size, max_workers=max_workers, header=header, session=self.session)
+        self._invalidate_listing("phonebooks")
         return response
 
     def delete_contact(self, contact_id):
@@ -247,7 +563,8 @@ class Client:
             The id of the contact to be deleted
         """
 
-        response = termii_switch.delete_one_contact(self.api_key, contact_id)
+        response = termii_switch.delete_one_contact(self.api_key, contact_id, session=self.session)
+        self._invalidate_listing("phonebooks")
         return response
     
     def send_campaign(self, country_code, sender_id, message, channel, message_type, phonebook_id, campaign_type, **schedule):
@@ -275,7 +592,7 @@ class Client:
             The time to send scheduled campaign. This is required if scheduled_sm_status is 'scheduled'. In the format '30-06-2021 6:00'
         """
 
-        response = termii_switch.make_campaign(self.api_key, country_code, sender_id, message, channel, message_type, phonebook_id, campaign_type, **schedule)
+        response = termii_switch.make_campaign(self.api_key, country_code, sender_id, message, channel, message_type, phonebook_id, campaign_type, session=self.session, **schedule)
         return response
     
     def fetch_campaigns(self):
@@ -283,19 +600,20 @@ class Client:
         A method to get the all campaigns associated with a client
         """
 
-        response = termii_switch.get_campaigns(self.api_key)
+        response = termii_switch.get_campaigns(self.api_key, session=self.session)
         return response
     
     def fetch_campaign_history(self, campaign_id):
         """
-        A method to get the history of a certain campaign
+        A method to get the history of a certain campaign. Raises utilities.APIError if termii answered
+        with a server error once the retries ran out, or with a body that is not JSON
 
         Params:
         campaign_id: str
             The ID of the campaign history to be fetched
         """
 
-        response = termii_switch.get_campaign_history(self.api_key, campaign_id)
+        response = termii_switch.get_campaign_history(self.api_key, campaign_id, session=self.session)
         return response
     """ END OF METHODS FOR SWITCH """
     
@@ -305,22 +623,25 @@ class Client:
         A method to check a client's termii balance
         """
 
-        response = termii_insight.check_balance(self.api_key)
+        response = termii_insight.check_balance(self.api_key, session=self.session)
         return response
     
-    def search_number(self, phone_number):
+    def search_number(self, phone_number, bypass_cache=False):
         """
         A method to verify phone numbers and automatically detect their status
 
         Params: 
         phone_number: str
             Represents the phone number to be verified. Phone number must be in the international format without the '+'
+        bypass_cache: bool| Optional
+            Skip the lookup_cache of the client and always send the request
         """
 
-        response = termii_insight.check_number(self.api_key, phone_number)
+        response = termii_insight.check_number(self.api_key, phone_number, session=self.session,
+            cache=self.lookup_cache, bypass_cache=bypass_cache)
         return response
 
-    def search_number_status(self, phone_number, country_code):
+    def search_number_status(self, phone_number, country_code, bypass_cache=False):
         """
         A method to detect if a number is fake or has ported to a new network.
 
@@ -331,9 +652,12 @@ class Client:
             Represents the phone number to be verified. Phone number must be in the international format without the '+'
         country_code: str
             Represents short alphabetic codes developed to represent countries (Example: NG ).
+        bypass_cache: bool| Optional
+            Skip the lookup_cache of the client and always send the request
         """
 
-        response = termii_insight.get_number_status(self.api_key, phone_number, country_code)
+        response = termii_insight.get_number_status(self.api_key, phone_number, country_code, session=self.session,
+            cache=self.lookup_cache, bypass_cache=bypass_cache)
         return response
 
     def fetch_history(self):
@@ -341,7 +665,45 @@ class Client:
         A method that returns reports for messages sent across the sms, voice & whatsapp channels.
         """
 
-        response = termii_insight.get_full_history(self.api_key)
+        response = termii_insight.get_full_history(self.api_key, session=self.session)
+        return response
+
+    def iter_history(self, page_size=DEFAULT_PAGE_SIZE, prefetch=1):
+        """
+        A method that returns a generator over the reports of messages sent across the sms, voice & whatsapp
+        channels. Pages are fetched lazily, with the next page fetched while the current one is processed,
+        so scanning the history runs in constant memory. Stop iterating to stop fetching.
+
+        Params:
+        page_size: int
+            The number of reports fetched per request
+        prefetch: int
+            The number of pages fetched ahead. 0 disables prefetching
+        """
+
+        response = termii_insight.iter_full_history(self.api_key, page_size=page_size, prefetch=prefetch, session=self.session)
+        return response
+
+    def sync_history(self, store, page_size=DEFAULT_PAGE_SIZE, prefetch=1, full=False):
+        """
+        A method that copies the message reports sent since the last sync into a local store.MessageStore and
+        returns how many were written. Only the messages newer than the cursor kept in the store are written.
+        The inbox endpoint answers with the whole history on every request, so every sync still downloads it
+        and filters it locally, but status lookups become indexed local queries instead of downloads.
+
+        Params:
+        store: MessageStore
+            The store the reports are written to
+        page_size: int
+            The number of reports fetched per request
+        prefetch: int
+            The number of pages fetched ahead. 0 disables prefetching
+        full: bool| Optional
+            Walk the whole history again, refreshing the status of messages synced before
+        """
+
+        response = termii_insight.sync_history(self.api_key, store, page_size=page_size, prefetch=prefetch,
+            full=full, session=self.session)
         return response
     """ END OF METHODS FOR INSIGHT """
 
@@ -358,9 +720,12 @@ class Client:
         generated randomly and there's an optionto set an expiry time.
         """
 
+        started = time.monotonic()
         response = termii_token.send_new_token(self.api_key, message_type, 
         phone_number, sender_id, channel, pin_attempts, pin_time_to_live,
-        pin_length, pin_placeholder, message_text)
+        pin_length, pin_placeholder, message_text, session=self.session)
+        if self.pin_ledger is not None:
+            self.pin_ledger.record_response(response, pin_time_to_live, pin_attempts, phone_number, started)
         return response
     
     def voice_token(self, phone_number, pin_attempts, pin_time_to_live, pin_length):
@@ -384,7 +749,10 @@ class Client:
         pin_length : integer
             Length of PIN code. Has a minimum of 4 and maximum of 8.
     """
-        response = termii_token.send_voice_token(self.api_key, phone_number, pin_attempts, pin_time_to_live, pin_length)
+        started = time.monotonic()
+        response = termii_token.send_voice_token(self.api_key, phone_number, pin_attempts, pin_time_to_live, pin_length, session=self.session)
+        if self.pin_ledger is not None:
+            self.pin_ledger.record_response(response, pin_time_to_live, pin_attempts, phone_number, started)
         return response
 
     def voice_call(self, phone_number, code, pin_attempts, pin_time_to_live, pin_length):
@@ -411,7 +779,7 @@ class Client:
         pin_length : integer
             Length of the pin code. Has a minimum of 4 and maximum of 8.
         """
-        response = termii_token.make_voice_call(self.api_key, phone_number, code, pin_attempts, pin_time_to_live, pin_length)
+        response = termii_token.make_voice_call(self.api_key, phone_number, code, pin_attempts, pin_time_to_live, pin_length, session=self.session)
         return response
     
     def verify_token(self, pin_id, pin):
@@ -428,7 +796,10 @@ class Client:
         pin : string
             The pin code (Example: "195558")
         """
-        response = termii_token.verify_sent_token(self.api_key, pin_id, pin)
+        if self.pin_ledger is not None:
+            return self.pin_ledger.verify(pin_id,
+                lambda: termii_token.verify_sent_token(self.api_key, pin_id, pin, session=self.session))
+        response = termii_token.verify_sent_token(self.api_key, pin_id, pin, session=self.session)
         return response
     
     def in_app_token(self, phone_number, pin_attempts, pin_time_to_live, pin_length):
@@ -456,6 +827,9 @@ class Client:
             Length of the pin code. Has a minimum of 4 and maximum of 8.
         """
         
+        started = time.monotonic()
         response = termii_token.send_token_in_app(self.api_key, phone_number,
-        pin_attempts, pin_time_to_live, pin_length)
+        pin_attempts, pin_time_to_live, pin_length, session=self.session)
+        if self.pin_ledger is not None:
+            self.pin_ledger.record_response(response, pin_time_to_live, pin_attempts, phone_number, started)
         return response
\ No newline at end of file
@@ -0,0 +1,146 @@
+import json
+from .utilities import APIError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+BACKENDS = ("orjson", "ujson", "json")
+JSON_CONTENT_TYPE = "application/json"
+
+class JSONCodec:
+    """
+    Encodes request bodies and decodes response bodies of the termii API.
+    dumps always returns bytes, so the body is sent as it is without being encoded again,
+    and loads parses the raw response bytes, so they are never decoded to a str first
+    when the backend can parse bytes (orjson and ujson can).
+
+    Attributes:
+    name: str
+        The name of the backend (Example: 'orjson' )
+    dumps: callable
+        Returns the JSON encoding of an object as bytes
+    loads: callable
+        Returns the object decoded from JSON bytes or str
+    """
+
+    def __init__(self, name, dumps, loads):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def decode(self, response, check=False):
+        """
+        Returns the decoded JSON body of a response. Raises APIError if the body is not JSON,
+        such as the html error page of a gateway
+
+        Params:
+        response: requests.Response| httpx.Response
+            The response to decode
+        check: bool
+            Raise APIError if the status of the response is not 2xx, instead of returning the error body
+        """
+        return check_response(response, self.loads, check)
+
+    def __repr__(self):
+        return f"JSONCodec(name={self.name!r})"
+
+def check_response(response, loads, check=True):
+    """
+    Returns the decoded JSON body of a response, and raises APIError if the body is not JSON
+    or, with check, if the status of the response is not 2xx
+
+    Params:
+    response: requests.Response| httpx.Response
+        The response to decode
+    loads: callable
+        Returns the object decoded from the JSON bytes of the body
+    check: bool
+        Raise APIError for a status other than 2xx
+    """
+    try:
+        body = loads(response.content)
+    except ValueError:
+        raise APIError(response.status_code, response.text, decoded=False) from None
+    if check and not 200 <= response.status_code < 300:
+        raise APIError(response.status_code, body)
+    return body
+
+def _json_dumps(obj):
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def _ujson_dumps(obj):
+    return ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+def _backend(name):
+    if name == "orjson" and orjson is not None:
+        return JSONCodec("orjson", orjson.dumps, orjson.loads)
+    if name == "ujson" and ujson is not None:
+        return JSONCodec("ujson", _ujson_dumps, ujson.loads)
+    if name == "json":
+        return JSONCodec("json", _json_dumps, json.loads)
+    return None
+
+def get_codec(name=None):
+    """
+    Returns the JSONCodec of a backend. By default the fastest installed backend is used,
+    orjson, then ujson, then the json module of the standard library.
+
+    Params:
+    name: str| JSONCodec| Optional
+        The name of the backend: 'orjson', 'ujson' or 'json'. A JSONCodec is returned as it is
+    """
+    if name is None:
+        return default_codec
+    if isinstance(name, JSONCodec):
+        return name
+
+    codec = _backend(name)
+    if codec is None:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown JSON backend {name!r}. Use one of: {', '.join(BACKENDS)}")
+        raise ImportError(f"The {name} JSON backend is not installed. Install it with 'pip install {name}'")
+    return codec
+
+def set_default_codec(codec):
+    """
+    Changes the codec used by sessions created without one, including the shared default session
+    and the sessions that already exist
+
+    Params:
+    codec: JSONCodec| str
+        The codec, or the name of its backend
+    """
+    global default_codec
+    default_codec = get_codec(codec)
+
+def encode_json(codec, kwargs, body="data"):
+    """
+    Replaces the 'json' keyword argument of a request by a body encoded with the codec
+    and returns the keyword arguments to send
+
+    Params:
+    codec: JSONCodec
+        The codec encoding the body
+    kwargs: dict
+        The keyword arguments of the request
+    body: str
+        The keyword argument the encoded body is passed as, 'data' for requests and 'content' for httpx
+    """
+    payload = kwargs.pop("json", None)
+    if payload is None:
+        return kwargs
+    headers = dict(kwargs.get("headers") or {})
+    if not any(key.lower() == "content-type" for key in headers):
+        headers["Content-Type"] = JSON_CONTENT_TYPE
+    kwargs["headers"] = headers
+    kwargs[body] = codec.dumps(payload)
+    return kwargs
+
+default_codec = next(codec for codec in map(_backend, BACKENDS) if codec is not None)
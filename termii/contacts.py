@@ -0,0 +1,120 @@
+import csv
+import io
+import os
+from .phone_numbers import normalise_number
+
+def _iter_text_lines(source):
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, newline="", encoding="utf-8") as file:
+            yield from file
+        return
+
+    if hasattr(source, "read"):
+        source = iter(source.readline, source.read(0))
+
+    for line in source:
+        yield line.decode("utf-8") if isinstance(line, bytes) else line
+
+def parse_contacts(source, delimiter=",", header=False):
+    """
+    A generator that lazily parses a csv or txt contact file and yields every row as a list of fields.
+    A txt file with one number per line is a csv file with a single column.
+
+    Params:
+    source: str| file| iterable
+        A path, a file object, or any iterable of lines as bytes or str
+    delimiter: str
+        The field delimiter of the file
+    header: bool
+        Skip the first row of the file if True
+    """
+    rows = csv.reader(_iter_text_lines(source), delimiter=delimiter)
+    if header:
+        next(rows, None)
+    for row in rows:
+        if row and any(field.strip() for field in row):
+            yield row
+
+class ContactImport:
+    """
+    A pipeline stage in front of add_contacts and upload_contacts. It lazily parses a csv or txt
+    contact file, normalises the phone numbers to international format and drops invalid and
+    duplicate numbers before anything is uploaded. Iterating over it yields the clean file line
+    by line, so it can be passed straight to add_contacts or upload_contacts as the contact_file.
+
+    Duplicates are detected with a set of the numbers stored as integers, which takes a fraction
+    of the memory of a set of strings.
+
+    Attributes:
+    country_code: str
+        Represents short numeric geographical codes developed to represent countries (Example: 234 ).
+    phone_column: int
+        The position of the phone number in every row
+    header: bool
+        The first row of the file is a header. It is written unchanged at the top of the clean file
+    rows: int
+        The number of rows read so far
+    invalid: int
+        The number of rows dropped because their phone number is invalid
+    duplicates: int
+        The number of rows dropped because their phone number was already seen
+
+    The counts are those of the current or last iteration, every iteration starting from scratch.
+    """
+
+    def __init__(self, source, country_code, phone_column=0, delimiter=",", header=False, normalise=normalise_number):
+        self.source = source
+        self.country_code = country_code
+        self.phone_column = phone_column
+        self.delimiter = delimiter
+        self.header = header
+        self.normalise = normalise
+        self.rows = 0
+        self.invalid = 0
+        self.duplicates = 0
+        self._seen = set()
+
+    @property
+    def unique(self):
+        return len(self._seen)
+
+    def __iter__(self):
+        # Every iteration reads the source again, so it is counted and deduplicated from scratch.
+        self.rows = 0
+        self.invalid = 0
+        self.duplicates = 0
+        self._seen = set()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=self.delimiter, lineterminator="\n")
+
+        def line(row):
+            writer.writerow(row)
+            text = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return text
+
+        rows = parse_contacts(self.source, self.delimiter)
+        if self.header:
+            first = next(rows, None)
+            if first is not None:
+                yield line(first)
+
+        for row in rows:
+            self.rows += 1
+            number = self.normalise(row[self.phone_column], self.country_code) if len(row) > self.phone_column else None
+            if number is None:
+                self.invalid += 1
+                continue
+
+            key = int(number)
+            if key in self._seen:
+                self.duplicates += 1
+                continue
+            self._seen.add(key)
+
+            row[self.phone_column] = number
+            yield line(row)
+
+    def __repr__(self):
+        return f"ContactImport(rows={self.rows}, unique={self.unique}, invalid={self.invalid}, duplicates={self.duplicates})"
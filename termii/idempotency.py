@@ -0,0 +1,225 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from .utilities import APIError, DuplicateSend, ValidationError
+
+DEFAULT_WINDOW = 600
+DEFAULT_MAX_ENTRIES = 100000
+IN_FLIGHT = "in_flight"
+SENT = "sent"
+UNCERTAIN = "uncertain"
+
+def fingerprint(number_to, sender_id, message, channel):
+    """
+    Returns the 16 byte digest identifying a send, so two sends of the same text from the same
+    sender to the same recipients over the same channel have the same fingerprint
+
+    Params:
+    number_to: str| list
+        The phone number, or the phone numbers of a bulk send, the message is sent to
+    sender_id: str
+        The sender id of the message
+    message: str
+        The text of the message
+    channel: str
+        The channel of the message
+    """
+    if isinstance(number_to, (list, tuple)):
+        number_to = ",".join(sorted(str(number) for number in number_to))
+    text = "\x1f".join((str(number_to), str(sender_id), str(message), str(channel).lower()))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+class _Entry:
+    __slots__ = ("expires", "state", "response", "error")
+
+    def __init__(self, expires):
+        self.expires = expires
+        self.state = IN_FLIGHT
+        self.response = None
+        self.error = None
+
+class IdempotencyGuard:
+    """
+    Suppresses repeated sends of the same message. Every send is fingerprinted from its
+    recipient, sender, text and channel and remembered for window seconds, in a store
+    holding at most max_entries fingerprints, the oldest being forgotten first.
+
+    A repeat of a send that went through returns the response of the first send without a
+    request, and a repeat of a send still in flight, or of a send that failed after reaching
+    the API (a read timeout, a lost response or a 5xx) so it may have been delivered, raises
+    DuplicateSend. A send that certainly was not delivered is forgotten so it can be retried
+    at once: a connection failure, a local validation error, a send termii rejected with a 4xx
+    status, 429 included, and a cancelled send. This keeps several workers dispatching the
+    same message from sending it twice within the window.
+
+    Attributes:
+    window: float
+        The number of seconds a send is remembered for
+    max_entries: int
+        The maximum number of sends remembered at once
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, max_entries=DEFAULT_MAX_ENTRIES):
+        self.window = window
+        self.max_entries = max_entries
+        self.suppressed = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self, now):
+        entries = self._entries
+        # Every entry lives for the same window, so the oldest insertion expires first.
+        while entries:
+            key, entry = next(iter(entries.items()))
+            if entry.expires > now and len(entries) <= self.max_entries:
+                break
+            del entries[key]
+
+    def begin(self, key):
+        """
+        Claims a fingerprint before its send. Returns (True, None) if the send should be made,
+        and (False, response) if the same send already went through. Raises DuplicateSend if
+        the same send is in flight or its outcome is unknown
+
+        Params:
+        key: bytes
+            The fingerprint of the send
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= now:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self._entries[key] = _Entry(now + self.window)
+                self._evict(now)
+                return True, None
+
+            self.suppressed += 1
+            if entry.state == SENT:
+                return False, entry.response
+            raise DuplicateSend(key, entry.error)
+
+    def complete(self, key, response):
+        """
+        Records that the send of a fingerprint went through
+
+        Params:
+        key: bytes
+            The fingerprint of the send
+        response: dict
+            The decoded termii response of the send, returned to repeats
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.state = SENT
+                entry.response = response
+
+    def fail(self, key, error, reached_api=True):
+        """
+        Records that the send of a fingerprint failed. A send that never reached the API is
+        forgotten, any other failure is remembered as uncertain
+
+        Params:
+        key: bytes
+            The fingerprint of the send
+        error: Exception
+            The exception raised by the send
+        reached_api: bool
+            False if the request was never received by the API, so sending it again is safe
+        """
+        with self._lock:
+            if not reached_api:
+                self._entries.pop(key, None)
+                return
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.state = UNCERTAIN
+                entry.error = error
+
+    def _reached_api(self, error, transport):
+        # Only a send that certainly was not delivered may be sent again.
+        if isinstance(error, ValidationError):
+            return False
+        if isinstance(error, APIError) and error.decoded and 400 <= error.status_code < 500:
+            return False
+        return not (transport is not None and isinstance(error, transport.errors) and transport.is_connect_error(error))
+
+    def forget(self, key):
+        """
+        Forgets a fingerprint, so the next send with it is made whatever happened before
+
+        Params:
+        key: bytes
+            The fingerprint of the send
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Forgets every fingerprint
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def run(self, key, send, transport=None):
+        """
+        Makes a send unless it is a repeat, and returns its response or the response of the first send
+
+        Params:
+        key: bytes
+            The fingerprint of the send
+        send: callable
+            Makes the send and returns its decoded response. Must raise, such as an APIError
+            from codec.decode(response, check=True), if termii did not answer with a 2xx status
+        transport: HTTPTransport| Optional
+            The transport of the send, used to tell connection failures, which are safe to retry, from other failures
+        """
+        first, response = self.begin(key)
+        if not first:
+            return response
+        try:
+            response = send()
+        except Exception as error:
+            self.fail(key, error, self._reached_api(error, transport))
+            raise
+        except BaseException:
+            self.forget(key)
+            raise
+        self.complete(key, response)
+        return response
+
+    async def run_async(self, key, send, transport=None):
+        """
+        Makes a send unless it is a repeat. See run
+
+        Params:
+        key: bytes
+            The fingerprint of the send
+        send: callable
+            Returns an awaitable making the send and returning its decoded response. Must raise if termii did not answer with a 2xx status
+        transport: AsyncHTTPTransport| Optional
+            The transport of the send, used to tell connection failures from other failures
+        """
+        first, response = self.begin(key)
+        if not first:
+            return response
+        try:
+            response = await send()
+        except Exception as error:
+            self.fail(key, error, self._reached_api(error, transport))
+            raise
+        except BaseException:
+            # A cancelled send is released too, so its key is not left in flight forever.
+            self.forget(key)
+            raise
+        self.complete(key, response)
+        return response
@@ -0,0 +1,387 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+from .codec import JSONCodec
+from .utilities import APIError
+
+logger = logging.getLogger(__name__)
+
+# The upper bounds, in seconds, of the latency histogram buckets. The last bucket is +Inf.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASES = ("connect", "tls", "ttfb", "decode")
+API_PREFIX = "/api/"
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[\w-]+$")
+_NOT_DECODED = object()
+
+class Phases:
+    """
+    Where the time of one attempt went, as measured by the transport that sent it.
+    A phase is 0 when it did not happen, such as connect and tls on a reused connection.
+
+    Attributes:
+    connect: float
+        The seconds spent opening the TCP connection
+    tls: float
+        The seconds spent on the TLS handshake
+    ttfb: float
+        The seconds from sending the request on an open connection to receiving the response headers
+    """
+
+    __slots__ = ("connect", "tls", "ttfb")
+
+    def __init__(self, connect=0.0, tls=0.0, ttfb=0.0):
+        self.connect = connect
+        self.tls = tls
+        self.ttfb = ttfb
+
+    def __repr__(self):
+        return f"Phases(connect={self.connect!r}, tls={self.tls!r}, ttfb={self.ttfb!r})"
+
+class RequestMetrics:
+    """
+    The measurements of one request to the termii API, passed to the hooks of the
+    session once the request completed or failed. The phases are those of the last attempt.
+
+    Attributes:
+    endpoint: str
+        The path of the endpoint below /api/ with ids replaced by {id} (Example: 'sms/send' )
+    method: str
+        The HTTP method of the request
+    status_code: int
+        The status code of the final response. None if no response was received
+    error: str
+        The name of the exception raised by the last attempt. None if a response was received
+    statuses: list
+        The status code, or the exception name, of every attempt
+    retries: int
+        The number of times the request was sent again
+    latency: float
+        The seconds from the first attempt to the final response, including rate limiting, retries and backoff
+    connect: float
+        The seconds spent opening the TCP connection. None if the transport does not measure phases
+    tls: float
+        The seconds spent on the TLS handshake. None if the transport does not measure phases
+    ttfb: float
+        The seconds until the response headers were received. None if the transport does not measure phases
+    decode: float
+        The seconds spent decoding the JSON body of the response. None if it is not JSON
+    bytes_out: int
+        The size of the request body. None if it was streamed from a file
+    bytes_in: int
+        The size of the response body
+    started: float
+        The unix time the request was started at
+    """
+
+    __slots__ = ("endpoint", "method", "status_code", "error", "statuses", "retries", "latency",
+        "connect", "tls", "ttfb", "decode", "bytes_out", "bytes_in", "started")
+
+    def __init__(self, endpoint, method, bytes_out=None):
+        self.endpoint = endpoint
+        self.method = method
+        self.status_code = None
+        self.error = None
+        self.statuses = []
+        self.retries = 0
+        self.latency = None
+        self.connect = None
+        self.tls = None
+        self.ttfb = None
+        self.decode = None
+        self.bytes_out = bytes_out
+        self.bytes_in = None
+        self.started = time.time()
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"RequestMetrics(endpoint={self.endpoint!r}, method={self.method!r}, status_code={self.status_code!r}, latency={self.latency!r})"
+
+def endpoint_name(url):
+    """
+    Returns the name requests to a url are reported under: the path below /api/ with
+    every segment holding an id replaced by {id}, so all calls of an endpoint share a name
+
+    Params:
+    url: str
+        The url of the request (Example: 'https://api.ng.termii.com/api/phonebooks/12/contacts' returns 'phonebooks/{id}/contacts' )
+    """
+    path = urlsplit(url).path
+    if path.startswith(API_PREFIX):
+        path = path[len(API_PREFIX):]
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.strip("/").split("/"))
+
+def body_size(body):
+    """
+    Returns the number of bytes of a request body, or None for streamed bodies
+
+    Params:
+    body: bytes| str| file| None
+        The data or content of the request
+    """
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    return None
+
+def start_request(method, url, body):
+    """
+    Returns the RequestMetrics of a request about to be sent
+
+    Params:
+    method: str
+        The HTTP method of the request
+    url: str
+        The url of the request
+    body: bytes| str| file| None
+        The data or content of the request
+    """
+    return RequestMetrics(endpoint_name(url), method.upper(), body_size(body))
+
+def record_response(metrics, response, codec):
+    """
+    Completes the metrics of a request with its final response. The body is decoded here
+    to time the codec, and kept on the response so decoding it again costs nothing.
+
+    Params:
+    metrics: RequestMetrics
+        The metrics of the request
+    response: requests.Response| httpx.Response
+        The final response of the request
+    codec: JSONCodec
+        The codec the response is decoded with
+    """
+    metrics.status_code = response.status_code
+    content = response.content
+    metrics.bytes_in = len(content)
+
+    phases = getattr(response, "termii_phases", None)
+    if phases is not None:
+        metrics.connect = phases.connect
+        metrics.tls = phases.tls
+        metrics.ttfb = phases.ttfb
+
+    start = time.perf_counter()
+    try:
+        response.termii_decoded = codec.loads(content)
+    except ValueError:
+        return
+    metrics.decode = time.perf_counter() - start
+
+class TracedCodec(JSONCodec):
+    """
+    The codec of a session with hooks. It encodes like the codec it wraps, and returns
+    the body record_response already decoded instead of decoding it a second time.
+    """
+
+    def __init__(self, codec):
+        super().__init__(codec.name, codec.dumps, codec.loads)
+        self.wrapped = codec
+
+    def decode(self, response, check=False):
+        decoded = response.__dict__.get("termii_decoded", _NOT_DECODED)
+        if decoded is _NOT_DECODED:
+            return super().decode(response, check)
+        if check and not 200 <= response.status_code < 300:
+            raise APIError(response.status_code, decoded)
+        return decoded
+
+def trace_codec(codec, traced=None):
+    """
+    Returns a TracedCodec wrapping a codec, reusing traced if it already wraps it
+
+    Params:
+    codec: JSONCodec
+        The codec to wrap
+    traced: TracedCodec| Optional
+        The TracedCodec returned last time
+    """
+    if traced is not None and traced.wrapped is codec:
+        return traced
+    return TracedCodec(codec)
+
+def emit(hooks, metrics):
+    """
+    Passes the metrics of a request to every hook. A hook that raises is logged and
+    skipped, so a broken exporter never fails a message that was already sent.
+
+    Params:
+    hooks: list
+        Callables taking a RequestMetrics
+    metrics: RequestMetrics
+        The metrics of the request
+    """
+    for hook in hooks:
+        try:
+            hook(metrics)
+        except Exception:
+            logger.exception("The termii metrics hook %r failed", hook)
+
+class _Series:
+    __slots__ = ("count", "buckets", "latency_sum", "phase_sums", "bytes_out", "bytes_in", "retries", "statuses")
+
+    def __init__(self, size):
+        self.count = 0
+        self.buckets = [0] * size
+        self.latency_sum = 0.0
+        self.phase_sums = dict.fromkeys(PHASES, 0.0)
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.retries = 0
+        self.statuses = Counter()
+
+class MetricsRecorder:
+    """
+    A hook aggregating the metrics of every request per endpoint and method: a latency
+    histogram, the time spent in every phase, the bytes sent and received, the status
+    codes and the retries. The aggregates can be read with snapshot or exposed in the
+    Prometheus text format with to_prometheus.
+
+    Attributes:
+    buckets: tuple
+        The upper bounds, in seconds, of the latency histogram buckets
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, metrics):
+        key = (metrics.endpoint, metrics.method)
+        status = str(metrics.status_code) if metrics.status_code is not None else metrics.error
+        bucket = next((index for index, bound in enumerate(self.buckets) if metrics.latency <= bound), len(self.buckets))
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.buckets) + 1)
+            series.count += 1
+            series.buckets[bucket] += 1
+            series.latency_sum += metrics.latency
+            for phase in PHASES:
+                seconds = getattr(metrics, phase)
+                if seconds is not None:
+                    series.phase_sums[phase] += seconds
+            series.bytes_out += metrics.bytes_out or 0
+            series.bytes_in += metrics.bytes_in or 0
+            series.retries += metrics.retries
+            series.statuses[status] += 1
+
+    def snapshot(self):
+        """
+        Returns the aggregates recorded so far as a dict keyed by (endpoint, method)
+        """
+        with self._lock:
+            return {key: {
+                "count": series.count,
+                "latency_sum": series.latency_sum,
+                "buckets": dict(zip(self.buckets + (float("inf"),), series.buckets)),
+                "phase_sums": dict(series.phase_sums),
+                "bytes_out": series.bytes_out,
+                "bytes_in": series.bytes_in,
+                "retries": series.retries,
+                "statuses": dict(series.statuses),
+            } for key, series in self._series.items()}
+
+    def reset(self):
+        """
+        Forgets every aggregate recorded so far
+        """
+        with self._lock:
+            self._series.clear()
+
+    def to_prometheus(self, prefix="termii_client"):
+        """
+        Returns the aggregates in the Prometheus text exposition format, ready to be served on a /metrics endpoint
+
+        Params:
+        prefix: str
+            The prefix of every metric name
+        """
+        lines = [
+            f"# HELP {prefix}_request_duration_seconds Latency of termii API requests, including retries.",
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+        ]
+        snapshot = self.snapshot()
+        for (endpoint, method), series in snapshot.items():
+            labels = f'endpoint="{endpoint}",method="{method}"'
+            cumulative = 0
+            for bound, count in series["buckets"].items():
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"{prefix}_request_duration_seconds_sum{{{labels}}} {series['latency_sum']}")
+            lines.append(f"{prefix}_request_duration_seconds_count{{{labels}}} {series['count']}")
+
+        lines += [f"# HELP {prefix}_request_phase_seconds_total Time spent in each phase of termii API requests.",
+            f"# TYPE {prefix}_request_phase_seconds_total counter"]
+        for (endpoint, method), series in snapshot.items():
+            for phase, seconds in series["phase_sums"].items():
+                lines.append(f'{prefix}_request_phase_seconds_total{{endpoint="{endpoint}",method="{method}",phase="{phase}"}} {seconds}')
+
+        lines += [f"# HELP {prefix}_request_bytes_total Bytes of request and response bodies.",
+            f"# TYPE {prefix}_request_bytes_total counter"]
+        for (endpoint, method), series in snapshot.items():
+            lines.append(f'{prefix}_request_bytes_total{{endpoint="{endpoint}",method="{method}",direction="out"}} {series["bytes_out"]}')
+            lines.append(f'{prefix}_request_bytes_total{{endpoint="{endpoint}",method="{method}",direction="in"}} {series["bytes_in"]}')
+
+        lines += [f"# HELP {prefix}_responses_total Final outcomes of termii API requests by status code or error.",
+            f"# TYPE {prefix}_responses_total counter"]
+        for (endpoint, method), series in snapshot.items():
+            for status, count in series["statuses"].items():
+                lines.append(f'{prefix}_responses_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+
+        lines += [f"# HELP {prefix}_retries_total Requests sent again after a failed attempt.",
+            f"# TYPE {prefix}_retries_total counter"]
+        for (endpoint, method), series in snapshot.items():
+            lines.append(f'{prefix}_retries_total{{endpoint="{endpoint}",method="{method}"}} {series["retries"]}')
+        return "\n".join(lines) + "\n"
+
+class OpenTelemetryHook:
+    """
+    A hook recording the metrics of every request with OpenTelemetry instruments:
+    termii.client.request.duration and termii.client.request.phase.duration histograms,
+    and termii.client.request.bytes and termii.client.request.retries counters,
+    with the endpoint, method and status as attributes.
+
+    Attributes:
+    meter: Meter
+        The OpenTelemetry meter the instruments are created with. The 'termii' meter of the global meter provider is used if not passed
+    """
+
+    def __init__(self, meter=None):
+        if meter is None:
+            try:
+                from opentelemetry import metrics
+            except ImportError:
+                raise ImportError("opentelemetry-api is required for the OpenTelemetryHook. Install it with 'pip install opentelemetry-api'")
+            meter = metrics.get_meter("termii")
+
+        self.meter = meter
+        self._duration = meter.create_histogram("termii.client.request.duration", unit="s", description="Latency of termii API requests, including retries")
+        self._phases = meter.create_histogram("termii.client.request.phase.duration", unit="s", description="Time spent in each phase of termii API requests")
+        self._bytes = meter.create_counter("termii.client.request.bytes", unit="By", description="Bytes of request and response bodies")
+        self._retries = meter.create_counter("termii.client.request.retries", description="Requests sent again after a failed attempt")
+
+    def __call__(self, metrics):
+        status = str(metrics.status_code) if metrics.status_code is not None else metrics.error
+        attributes = {"endpoint": metrics.endpoint, "method": metrics.method, "status": status}
+        self._duration.record(metrics.latency, attributes)
+        for phase in PHASES:
+            seconds = getattr(metrics, phase)
+            if seconds is not None:
+                self._phases.record(seconds, dict(attributes, phase=phase))
+        if metrics.bytes_out:
+            self._bytes.add(metrics.bytes_out, dict(attributes, direction="out"))
+        if metrics.bytes_in:
+            self._bytes.add(metrics.bytes_in, dict(attributes, direction="in"))
+        if metrics.retries:
+            self._retries.add(metrics.retries, attributes)
@@ -0,0 +1,358 @@
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from . import termii_switch
+from . import termii_token
+from . import validation
+from .codec import get_codec
+from .idempotency import fingerprint
+from .session import get_session
+from .utilities import ValidationError, DuplicateSend, APIError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTBOX_WORKERS = 4
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 300.0
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+# The url and payload builder every kind of queued send is dispatched with, and the schema its arguments are checked against when enqueued.
+DISPATCH = {
+    "message": (termii_switch.SEND_MESSAGE_URL, termii_switch.message_payload, validation.SEND_MESSAGE),
+    "bulk_sms": (termii_switch.BULK_MESSAGE_URL, termii_switch.bulk_message_payload, validation.SEND_BULK_SMS),
+    "token": (termii_token.SEND_TOKEN_URL, termii_token.token_payload, validation.SEND_TOKEN),
+    "voice_token": (termii_token.SEND_TOKEN_VOICE_URL, termii_token.voice_token_payload, validation.VOICE_TOKEN),
+}
+# The statuses of a send termii did not take that is worth trying again: throttling and server errors.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    arguments BLOB NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    response BLOB,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_ready ON outbox (status, available_at, id);
+"""
+
+def _retryable(error):
+    # A send rejected locally, suppressed as a duplicate or rejected by termii for good is not tried again.
+    if isinstance(error, (ValidationError, DuplicateSend)):
+        return False
+    if isinstance(error, APIError):
+        return error.status_code in RETRY_STATUSES
+    return True
+
+class Outbox:
+    """
+    A durable queue of outgoing sends stored in a local SQLite database and drained by
+    background worker threads through the termii_switch and termii_token functions.
+    Enqueueing validates the arguments, writes one row and returns its id, so a request
+    handler never waits for the termii API.
+
+    Sends are delivered at least once: a queued send survives a crash or a restart, and
+    a send that was in flight when the process died is sent again when the outbox is
+    started again. Sends that failed on the transport, were throttled (429) or hit a
+    server error (5xx) are retried with an exponential backoff up to max_attempts times.
+    Sends termii rejected with another error status, or that local validation rejected,
+    fail at once with the error reported to on_result. close flushes the queue before the
+    workers stop, and is called at exit if the outbox was not closed.
+
+    The database runs in WAL mode with synchronous=NORMAL, so an enqueue survives the
+    process dying, but may be lost if the machine loses power before the next checkpoint.
+
+    Attributes:
+    api_key: str
+        The API key for a certain termii account
+    path: str
+        The path of the SQLite database. It is created if it does not exist
+    workers: int
+        The number of threads sending the queued messages
+    session: TermiiSession| Optional
+        The pooled session the requests are sent with. The shared default session is used if not passed
+    max_attempts: int
+        The number of times a send is tried before it is marked as failed
+    retry_delay: float
+        The delay in seconds before the first retry of a failed send. It doubles with every attempt
+    keep_sent: bool
+        Keep the rows of sent messages with their response. They are deleted once sent if False
+    on_result: callable| Optional
+        Called from a worker thread as on_result(id, kind, response, error) when a send succeeded or finally failed
+    normaliser: NumberNormaliser| Optional
+        Checks and normalises the phone numbers when they are enqueued
+    guard: IdempotencyGuard| Optional
+        Suppresses messages and bulk messages that were already sent within its window. A suppressed send fails with DuplicateSend
+        unless the first send went through, so a send retried after a crash is not delivered twice while it is remembered
+    """
+
+    def __init__(self, api_key, path, workers=DEFAULT_OUTBOX_WORKERS, session=None, max_attempts=DEFAULT_MAX_ATTEMPTS,
+            retry_delay=DEFAULT_RETRY_DELAY, keep_sent=False, on_result=None, normaliser=None, guard=None):
+        self.api_key = api_key
+        self.path = path
+        self.workers = workers
+        self.session = session
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.keep_sent = keep_sent
+        self.on_result = on_result
+        self.normaliser = normaliser
+        self.guard = guard
+        self.codec = get_codec()
+
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._threads = []
+        self._closing = False
+        self._flush = True
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        """
+        Requeues the sends that were in flight when the process last stopped and starts the workers. Returns the outbox
+        """
+        with self._lock:
+            if self._threads:
+                return self
+            self._db.execute("UPDATE outbox SET status = ? WHERE status = ?", (PENDING, SENDING))
+            self._closing = False
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"termii-outbox-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        atexit.register(self.close)
+        return self
+
+    def enqueue(self, kind, **arguments):
+        """
+        Validates the arguments of a send, stores it and returns its id. The send is made by a worker
+
+        Params:
+        kind: str
+            The kind of send: 'message', 'bulk_sms', 'token' or 'voice_token'
+        arguments: any
+            The arguments of the termii_switch or termii_token function of the kind, without api_key and session
+        """
+        if kind not in DISPATCH:
+            raise ValueError(f"Unknown send kind {kind!r}. Use one of: {', '.join(DISPATCH)}")
+        DISPATCH[kind][2].validate(arguments)
+
+        if self.normaliser is not None:
+            if "number_to" in arguments:
+                arguments["number_to"] = self.normaliser.check(arguments["number_to"])
+            if "numbers_to" in arguments:
+                arguments["numbers_to"] = self.normaliser.check_many(arguments["numbers_to"])
+            if "phone_number" in arguments:
+                arguments["phone_number"] = self.normaliser.check(arguments["phone_number"])
+
+        encoded = self.codec.dumps(arguments)
+        now = time.time()
+        with self._lock:
+            if self._closing:
+                raise RuntimeError("The outbox is closed")
+            row_id = self._db.execute("INSERT INTO outbox (kind, arguments, status, enqueued_at, available_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, encoded, PENDING, now, now, now)).lastrowid
+            self._wakeup.notify()
+        return row_id
+
+    def enqueue_message(self, number_to, sender_id, message, message_type="plain", channel="generic", media_dict=None):
+        """
+        Queues a message for termii_switch.post_message and returns its id. See Client.send_message
+        """
+        return self.enqueue("message", number_to=number_to, sender_id=sender_id, message=message,
+            message_type=message_type, channel=channel, media_dict=media_dict or {})
+
+    def enqueue_bulk_sms(self, numbers_to, sender_id, message, message_type="plain", channel="generic"):
+        """
+        Queues a bulk message for termii_switch.post_message_bulk and returns its id. See Client.send_bulk_sms
+        """
+        return self.enqueue("bulk_sms", numbers_to=list(numbers_to), sender_id=sender_id, message=message,
+            message_type=message_type, channel=channel)
+
+    def enqueue_token(self, message_type, phone_number, sender_id, channel, pin_attempts, pin_time_to_live, pin_length, pin_placeholder, message_text):
+        """
+        Queues a token for termii_token.send_new_token and returns its id. See Client.send_token
+        """
+        return self.enqueue("token", message_type=message_type, phone_number=phone_number, sender_id=sender_id, channel=channel,
+            pin_attempts=pin_attempts, pin_time_to_live=pin_time_to_live, pin_length=pin_length,
+            pin_placeholder=pin_placeholder, message_text=message_text)
+
+    def enqueue_voice_token(self, phone_number, pin_attempts, pin_time_to_live, pin_length):
+        """
+        Queues a voice token for termii_token.send_voice_token and returns its id. See Client.voice_token
+        """
+        return self.enqueue("voice_token", phone_number=phone_number, pin_attempts=pin_attempts,
+            pin_time_to_live=pin_time_to_live, pin_length=pin_length)
+
+    def _claim(self, now):
+        row = self._db.execute("SELECT id, kind, arguments, attempts FROM outbox WHERE status = ? AND available_at <= ? ORDER BY available_at, id LIMIT 1",
+            (PENDING, now)).fetchone()
+        if row is not None:
+            self._db.execute("UPDATE outbox SET status = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?", (SENDING, now, row[0]))
+        return row
+
+    def _next_retry(self):
+        row = self._db.execute("SELECT MIN(available_at) FROM outbox WHERE status = ?", (PENDING,)).fetchone()
+        return row[0]
+
+    def _release(self, row_id=None):
+        # Puts claimed rows that were not sent back in the queue, with the attempt they were claimed for undone.
+        if row_id is None:
+            self._db.execute("UPDATE outbox SET status = ?, attempts = MAX(attempts - 1, 0) WHERE status = ?", (PENDING, SENDING))
+        else:
+            self._db.execute("UPDATE outbox SET status = ?, attempts = MAX(attempts - 1, 0) WHERE id = ? AND status = ?", (PENDING, row_id, SENDING))
+
+    def _work(self):
+        while True:
+            with self._lock:
+                while True:
+                    # Nothing more is claimed once the outbox closes without a flush.
+                    if self._closing and not self._flush:
+                        return
+                    now = time.time()
+                    row = self._claim(now)
+                    if row is not None:
+                        break
+                    next_retry = self._next_retry()
+                    # Retries waiting for their backoff are left for the next start when closing.
+                    if self._closing and (not self._flush or next_retry is None or next_retry > now):
+                        return
+                    self._wakeup.wait(None if next_retry is None else max(next_retry - now, 0.001))
+
+            try:
+                self._send(*row)
+            except BaseException:
+                with self._lock:
+                    self._release(row[0])
+                raise
+
+    def _dispatch(self, kind, arguments):
+        url, build, _ = DISPATCH[kind]
+        payload = build(self.api_key, **arguments)
+        session = get_session(self.session)
+        send = lambda: session.codec.decode(session.post(url, json=payload), check=True)
+        if self.guard is None or kind not in ("message", "bulk_sms"):
+            return send()
+        number_to = arguments["number_to"] if kind == "message" else arguments["numbers_to"]
+        key = fingerprint(number_to, arguments["sender_id"], arguments["message"], arguments["channel"])
+        return self.guard.run(key, send, transport=session.transport)
+
+    def _send(self, row_id, kind, arguments, attempts):
+        try:
+            response = self._dispatch(kind, self.codec.loads(arguments))
+        except Exception as error:
+            attempts += 1
+            final = not _retryable(error) or attempts >= self.max_attempts
+            now = time.time()
+            delay = min(self.retry_delay * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+            with self._lock:
+                self._db.execute("UPDATE outbox SET status = ?, available_at = ?, updated_at = ?, error = ? WHERE id = ?",
+                    (FAILED if final else PENDING, now + delay, now, repr(error), row_id))
+                self._wakeup.notify()
+            if final:
+                self._report(row_id, kind, error.response if isinstance(error, APIError) else None, error)
+            return
+
+        with self._lock:
+            if self.keep_sent:
+                self._db.execute("UPDATE outbox SET status = ?, updated_at = ?, response = ?, error = NULL WHERE id = ?",
+                    (SENT, time.time(), self.codec.dumps(response), row_id))
+            else:
+                self._db.execute("DELETE FROM outbox WHERE id = ?", (row_id,))
+        self._report(row_id, kind, response, None)
+
+    def _report(self, row_id, kind, response, error):
+        if self.on_result is None:
+            return
+        try:
+            self.on_result(row_id, kind, response, error)
+        except Exception:
+            logger.exception("The on_result callback of the termii outbox failed for send %s", row_id)
+
+    def counts(self):
+        """
+        Returns the number of queued sends in every status (Example: {'pending': 12, 'failed': 1} )
+        """
+        with self._lock:
+            return dict(self._db.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+
+    def failed(self):
+        """
+        Returns the (id, kind, arguments, error) of every send that finally failed
+        """
+        with self._lock:
+            rows = self._db.execute("SELECT id, kind, arguments, error FROM outbox WHERE status = ? ORDER BY id", (FAILED,)).fetchall()
+        return [(row_id, kind, self.codec.loads(arguments), error) for row_id, kind, arguments, error in rows]
+
+    def retry_failed(self):
+        """
+        Queues every failed send again with a fresh number of attempts and returns how many were requeued
+        """
+        with self._lock:
+            count = self._db.execute("UPDATE outbox SET status = ?, attempts = 0, available_at = ? WHERE status = ?",
+                (PENDING, time.time(), FAILED)).rowcount
+            self._wakeup.notify_all()
+        return count
+
+    def prune(self, older_than=0):
+        """
+        Deletes the sent and failed rows last updated more than older_than seconds ago and returns how many were deleted
+
+        Params:
+        older_than: float
+            The age in seconds of the rows to delete
+        """
+        with self._lock:
+            return self._db.execute("DELETE FROM outbox WHERE status IN (?, ?) AND updated_at <= ?",
+                (SENT, FAILED, time.time() - older_than)).rowcount
+
+    def close(self, flush=True, timeout=None):
+        """
+        Stops the workers. With flush, every send that is ready is sent first; sends waiting
+        for a retry stay queued for the next start. Without flush, only the sends already
+        being made are finished and every other send stays queued.
+
+        Params:
+        flush: bool
+            Send the queued messages before stopping if True
+        timeout: float| Optional
+            The maximum number of seconds to wait for the workers. Waits until the queue is flushed if None
+        """
+        atexit.unregister(self.close)
+        with self._lock:
+            if self._closing and not self._threads:
+                return
+            self._closing = True
+            self._flush = flush
+            self._wakeup.notify_all()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+        if any(thread.is_alive() for thread in self._threads):
+            return
+        self._threads = []
+        with self._lock:
+            self._release()
+            self._db.close()
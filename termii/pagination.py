@@ -0,0 +1,225 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .utilities import UnexpectedResponse
+
+DEFAULT_PAGE_SIZE = 100
+
+def page_items(body, page_size, previous=None):
+    """
+    Returns the (items, has_more, last_page) of one decoded page of a termii listing.
+    Both paginated responses with a 'data' list and plain lists are understood.
+
+    A listing without pagination fields, such as the inbox which answers every page with
+    the whole list, only has more pages while a page is exactly page_size items long and
+    differs from the previous one. A repeated page comes back without items.
+
+    Params:
+    body: dict| list
+        The decoded response of the page
+    page_size: int
+        The number of items requested per page
+    previous: list| Optional
+        The items of the previous page
+    """
+    if isinstance(body, list):
+        if previous and body == previous:
+            return [], False, None
+        return body, len(body) == page_size, None
+
+    if not isinstance(body, dict) or not isinstance(body.get("data"), list):
+        raise UnexpectedResponse(body)
+
+    items = body["data"]
+    last_page = body.get("last_page")
+
+    if last_page is not None and body.get("current_page") is not None:
+        has_more = body["current_page"] < last_page
+    elif "next_page_url" in body:
+        has_more = bool(body["next_page_url"])
+    else:
+        if previous and items == previous:
+            return [], False, last_page
+        has_more = len(items) == page_size
+    return items, has_more and len(items) > 0, last_page
+
+def _merge(first, items, body):
+    # The response of a whole listing: its first page holding the items of every page, or the error body that stopped the walk.
+    if body is not None:
+        return body
+    return items if isinstance(first, list) else dict(first, data=items)
+
+def fetch_all_pages(session, url, params, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Returns the decoded response of a whole termii listing: the response of its first page
+    with the items of every page in its 'data' list. A page that is not part of a listing,
+    such as an error response, is returned as it is instead.
+
+    Params:
+    session: TermiiSession
+        The session the pages are fetched with
+    url: str
+        The url of the listing
+    params: dict
+        The query parameters sent with every page, such as the api_key
+    page_size: int
+        The number of items requested per page
+    """
+    first = None
+    items = []
+    page_list = None
+    page = 1
+    while True:
+        body = session.codec.decode(session.get(url, params=dict(params, page=page, per_page=page_size)))
+        try:
+            page_list, has_more, _ = page_items(body, page_size, page_list)
+        except UnexpectedResponse:
+            return _merge(first, items, body)
+        first = body if first is None else first
+        items.extend(page_list)
+        if not has_more:
+            return _merge(first, items, None)
+        page += 1
+
+async def afetch_all_pages(session, url, params, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Returns the decoded response of a whole termii listing. See fetch_all_pages
+
+    Params:
+    session: AsyncTermiiSession
+        The session the pages are fetched with
+    url: str
+        The url of the listing
+    params: dict
+        The query parameters sent with every page, such as the api_key
+    page_size: int
+        The number of items requested per page
+    """
+    first = None
+    items = []
+    page_list = None
+    page = 1
+    while True:
+        body = session.codec.decode(await session.get(url, params=dict(params, page=page, per_page=page_size)))
+        try:
+            page_list, has_more, _ = page_items(body, page_size, page_list)
+        except UnexpectedResponse:
+            return _merge(first, items, body)
+        first = body if first is None else first
+        items.extend(page_list)
+        if not has_more:
+            return _merge(first, items, None)
+        page += 1
+
+def iter_pages(session, url, params, page_size=DEFAULT_PAGE_SIZE, prefetch=1):
+    """
+    A generator that walks the pages of a termii listing lazily and yields the items of
+    each page as a list. Once the first page gave the number of pages, up to prefetch
+    pages are fetched in the background while the caller processes the current one, so
+    at most prefetch + 1 pages are held in memory. Endpoints answering with a plain list,
+    such as the message inbox, give no number of pages and are not prefetched. Closing the
+    generator early stops fetching.
+
+    Params:
+    session: TermiiSession
+        The session the pages are fetched with
+    url: str
+        The url of the listing
+    params: dict
+        The query parameters sent with every page, such as the api_key
+    page_size: int
+        The number of items requested per page
+    prefetch: int
+        The number of pages fetched ahead of the caller. 0 fetches each page only when it is needed
+    """
+
+    def fetch(page):
+        response = session.get(url, params=dict(params, page=page, per_page=page_size))
+        return session.codec.decode(response)
+
+    executor = ThreadPoolExecutor(max_workers=prefetch) if prefetch > 0 else None
+    pending = deque()
+    next_page = 1
+    last_page = None
+    items = None
+
+    try:
+        while True:
+            if pending:
+                body = pending.popleft().result()
+            elif last_page is not None and next_page > last_page:
+                return
+            else:
+                body = fetch(next_page)
+                next_page += 1
+
+            items, has_more, page_count = page_items(body, page_size, items)
+            if page_count is not None:
+                last_page = page_count
+
+            # Pages are only fetched ahead once the first page gave the number of pages, so none past the end is requested.
+            while executor is not None and has_more and last_page is not None and len(pending) < prefetch and next_page <= last_page:
+                pending.append(executor.submit(fetch, next_page))
+                next_page += 1
+
+            if items:
+                yield items
+            if not has_more:
+                return
+    finally:
+        for future in pending:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+async def aiter_pages(session, url, params, page_size=DEFAULT_PAGE_SIZE, prefetch=1):
+    """
+    An async generator that walks the pages of a termii listing lazily. See iter_pages
+
+    Params:
+    session: AsyncTermiiSession
+        The session the pages are fetched with
+    url: str
+        The url of the listing
+    params: dict
+        The query parameters sent with every page, such as the api_key
+    page_size: int
+        The number of items requested per page
+    prefetch: int
+        The number of pages fetched ahead of the caller. 0 fetches each page only when it is needed
+    """
+
+    async def fetch(page):
+        response = await session.get(url, params=dict(params, page=page, per_page=page_size))
+        return session.codec.decode(response)
+
+    pending = deque()
+    next_page = 1
+    last_page = None
+    items = None
+
+    try:
+        while True:
+            if pending:
+                body = await pending.popleft()
+            elif last_page is not None and next_page > last_page:
+                return
+            else:
+                body = await fetch(next_page)
+                next_page += 1
+
+            items, has_more, page_count = page_items(body, page_size, items)
+            if page_count is not None:
+                last_page = page_count
+
+            while prefetch > 0 and has_more and last_page is not None and len(pending) < prefetch and next_page <= last_page:
+                pending.append(asyncio.ensure_future(fetch(next_page)))
+                next_page += 1
+
+            if items:
+                yield items
+            if not has_more:
+                return
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,346 @@
+import importlib.util
+from .utilities import InvalidPhoneNumber
+
+# NumPy takes longer to import than the rest of the SDK, so it is only imported when a batch needs it.
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+NUMPY_THRESHOLD = 50000
+MIN_NUMBER_LENGTH = 8
+MAX_NUMBER_LENGTH = 15
+SEPARATORS = " -().+/"
+
+# Calling code: (country, minimum and maximum length of the national number, {network: prefixes})
+COUNTRY_PLANS = {
+    "234": ("NG", 10, 10, {
+        "MTN": ("703", "704", "706", "803", "806", "810", "813", "814", "816", "903", "906", "913", "916"),
+        "Airtel": ("701", "708", "802", "808", "812", "901", "902", "904", "907", "912"),
+        "Glo": ("705", "805", "807", "811", "815", "905", "915"),
+        "9mobile": ("809", "817", "818", "908", "909"),
+    }),
+    "233": ("GH", 9, 9, {
+        "MTN": ("24", "25", "53", "54", "55", "59"),
+        "Telecel": ("20", "50"),
+        "AirtelTigo": ("26", "27", "56", "57"),
+    }),
+    "254": ("KE", 9, 9, {
+        "Safaricom": ("70", "71", "72", "74", "79", "11"),
+        "Airtel": ("73", "75", "78", "10"),
+    }),
+    "27": ("ZA", 9, 9, {}),
+    "256": ("UG", 9, 9, {}),
+    "255": ("TZ", 9, 9, {}),
+    "250": ("RW", 9, 9, {}),
+    "237": ("CM", 9, 9, {}),
+    "225": ("CI", 10, 10, {}),
+    "221": ("SN", 9, 9, {}),
+    "229": ("BJ", 8, 10, {}),
+    "228": ("TG", 8, 8, {}),
+    "20": ("EG", 9, 10, {}),
+    "260": ("ZM", 9, 9, {}),
+    "263": ("ZW", 9, 9, {}),
+    "44": ("GB", 9, 10, {}),
+    "1": ("US", 10, 10, {}),
+    "91": ("IN", 10, 10, {}),
+}
+
+def _build_trie(prefixes):
+    # Every node is a dict of digit to child node, the value of a prefix is stored under None.
+    root = {}
+    for prefix, value in prefixes:
+        node = root
+        for digit in prefix:
+            node = node.setdefault(digit, {})
+        node[None] = value
+    return root
+
+def _longest_match(trie, digits):
+    node = trie
+    match = None
+    for digit in digits:
+        node = node.get(digit)
+        if node is None:
+            break
+        if None in node:
+            match = node[None]
+    return match
+
+class NumberInfo:
+    """
+    A validated phone number
+
+    Attributes:
+    number: str
+        The phone number in international format without the '+'
+    calling_code: str
+        The calling code of the country of the number, or None if the country is unknown
+    country: str
+        The short alphabetic code of the country of the number (Example: NG ), or None if it is unknown
+    network: str
+        The network the number was issued by, or None if it is unknown
+    """
+
+    __slots__ = ("number", "calling_code", "country", "network")
+
+    def __init__(self, number, calling_code, country, network):
+        self.number = number
+        self.calling_code = calling_code
+        self.country = country
+        self.network = network
+
+    def __repr__(self):
+        return f"NumberInfo(number={self.number!r}, country={self.country!r}, network={self.network!r})"
+
+class NumberNormaliser:
+    """
+    Normalises and validates phone numbers locally, before they are sent to the termii API.
+    Numbers are turned into international format without the '+' and checked against a
+    prefix trie of country calling codes, national number lengths and network prefixes,
+    which is compiled once when the normaliser is created.
+
+    Attributes:
+    country_code: str
+        The calling code added to numbers written in national format (Example: 234 )
+    plans: dict
+        Maps a calling code to a (country, minimum length, maximum length, {network: prefixes})
+        tuple describing its national numbers. Defaults to COUNTRY_PLANS
+    allow_unknown: bool
+        Accept numbers of countries missing from plans if they have between 8 and 15 digits
+    drop_invalid: bool
+        Drop invalid numbers from lists instead of raising InvalidPhoneNumber
+    """
+
+    def __init__(self, country_code="234", plans=None, allow_unknown=True, drop_invalid=False):
+        self.country_code = str(country_code)
+        self.plans = plans if plans is not None else COUNTRY_PLANS
+        self.allow_unknown = allow_unknown
+        self.drop_invalid = drop_invalid
+        self._countries = _build_trie((code, code) for code in self.plans)
+        self._networks = {
+            code: _build_trie((prefix, network) for network, prefixes in plan[3].items() for prefix in prefixes)
+            for code, plan in self.plans.items()
+        }
+
+    def _international(self, number, country_code):
+        text = str(number).strip()
+        digits = "".join(character for character in text if character.isdigit())
+
+        if text.startswith("+"):
+            return digits
+        if digits.startswith("00"):
+            return digits[2:]
+        if digits.startswith("0"):
+            return country_code + digits[1:]
+        if digits.startswith(country_code):
+            return digits
+        return country_code + digits
+
+    def _is_clean(self, number):
+        text = str(number).strip()
+        return text != "" and all(character.isdigit() or character in SEPARATORS for character in text)
+
+    def info(self, number, country_code=None):
+        """
+        Returns a NumberInfo for a valid phone number, or None if the number is invalid
+
+        Params:
+        number: str| int
+            The phone number, in international or national format (Example: '0803 123 4567')
+        country_code: str| Optional
+            The calling code of numbers in national format. The country_code of the normaliser is used if not passed
+        """
+        if not self._is_clean(number):
+            return None
+
+        digits = self._international(number, str(country_code or self.country_code))
+        if digits.startswith("0"):
+            return None
+
+        calling_code = _longest_match(self._countries, digits[:3])
+        if calling_code is None:
+            if self.allow_unknown and MIN_NUMBER_LENGTH <= len(digits) <= MAX_NUMBER_LENGTH:
+                return NumberInfo(digits, None, None, None)
+            return None
+
+        country, minimum, maximum, _ = self.plans[calling_code]
+        national = digits[len(calling_code):]
+        if not minimum <= len(national) <= maximum:
+            return None
+
+        return NumberInfo(digits, calling_code, country, _longest_match(self._networks[calling_code], national))
+
+    def normalise(self, number, country_code=None):
+        """
+        Returns a phone number in international format without the '+', or None if it is invalid
+
+        Params:
+        number: str| int
+            The phone number, in international or national format (Example: '+234 803 123 4567')
+        country_code: str| Optional
+            The calling code of numbers in national format. The country_code of the normaliser is used if not passed
+        """
+        info = self.info(number, country_code)
+        return info.number if info is not None else None
+
+    def normalise_many(self, numbers, country_code=None, use_numpy=None):
+        """
+        Normalises a whole list of phone numbers in one call and returns a list holding the
+        normalised number, or None, for every input. Large lists are processed with NumPy
+        when it is installed.
+
+        Params:
+        numbers: iterable
+            The phone numbers to normalise
+        country_code: str| Optional
+            The calling code of numbers in national format. The country_code of the normaliser is used if not passed
+        use_numpy: bool| Optional
+            Force (True) or disable (False) NumPy processing. By default NumPy is used for lists of 50000 numbers or more
+        """
+        numbers = list(numbers)
+
+        if use_numpy is None:
+            use_numpy = HAS_NUMPY and len(numbers) >= NUMPY_THRESHOLD
+        if use_numpy:
+            normalised, valid = self.normalise_array(numbers, country_code)
+            return [number if ok else None for number, ok in zip(normalised.tolist(), valid.tolist())]
+
+        normalise = self.normalise
+        return [normalise(number, country_code) for number in numbers]
+
+    def normalise_array(self, numbers, country_code=None):
+        """
+        Normalises an array of phone numbers with vectorised NumPy operations. Returns a
+        (numbers, valid) pair of arrays, where invalid numbers are empty strings in numbers
+        and False in valid. Requires NumPy.
+
+        Params:
+        numbers: array-like
+            The phone numbers to normalise
+        country_code: str| Optional
+            The calling code of numbers in national format. The country_code of the normaliser is used if not passed
+        """
+        if not HAS_NUMPY:
+            raise ImportError("NumPy is required for normalise_array. Install it with 'pip install numpy'")
+        import numpy
+
+        char = numpy.char
+        country_code = str(country_code or self.country_code)
+
+        text = char.strip(numpy.asarray(numbers, dtype=str))
+        plus = char.startswith(text, "+")
+        digits = text
+        for separator in SEPARATORS:
+            digits = char.replace(digits, separator, "")
+        valid = char.isdigit(digits) & ~char.startswith(digits, "000")
+
+        double_zero = ~plus & char.startswith(digits, "00")
+        trunk_zero = ~plus & ~double_zero & char.startswith(digits, "0")
+        national = ~plus & ~double_zero & ~trunk_zero & ~char.startswith(digits, country_code)
+
+        stripped = char.lstrip(digits, "0")
+        digits = numpy.where(double_zero, stripped, digits)
+        digits = numpy.where(trunk_zero, char.add(country_code, stripped), digits)
+        digits = numpy.where(national, char.add(country_code, digits), digits)
+        valid &= ~char.startswith(digits, "0")
+
+        lengths = char.str_len(digits)
+        matched = numpy.zeros(len(digits), dtype=bool)
+        for calling_code in sorted(self.plans, key=len, reverse=True):
+            _, minimum, maximum, _ = self.plans[calling_code]
+            in_country = ~matched & char.startswith(digits, calling_code)
+            national_lengths = lengths - len(calling_code)
+            valid &= ~in_country | ((national_lengths >= minimum) & (national_lengths <= maximum))
+            matched |= in_country
+
+        if self.allow_unknown:
+            valid &= matched | ((lengths >= MIN_NUMBER_LENGTH) & (lengths <= MAX_NUMBER_LENGTH))
+        else:
+            valid &= matched
+
+        return numpy.where(valid, digits, ""), valid
+
+    def check(self, number, country_code=None):
+        """
+        Returns a phone number in international format without the '+', raising InvalidPhoneNumber if it is invalid
+
+        Params:
+        number: str| int
+            The phone number to check
+        country_code: str| Optional
+            The calling code of numbers in national format. The country_code of the normaliser is used if not passed
+        """
+        normalised = self.normalise(number, country_code)
+        if normalised is None:
+            raise InvalidPhoneNumber([number])
+        return normalised
+
+    def check_many(self, numbers, country_code=None):
+        """
+        Normalises a list of phone numbers in one call. Invalid numbers are dropped if
+        drop_invalid is set, otherwise InvalidPhoneNumber is raised listing all of them.
+
+        Params:
+        numbers: iterable
+            The phone numbers to check
+        country_code: str| Optional
+            The calling code of numbers in national format. The country_code of the normaliser is used if not passed
+        """
+        numbers = list(numbers)
+        normalised = self.normalise_many(numbers, country_code)
+
+        if not self.drop_invalid:
+            invalid = [number for number, result in zip(numbers, normalised) if result is None]
+            if invalid:
+                raise InvalidPhoneNumber(invalid)
+        return [number for number in normalised if number is not None]
+
+    def iter_checked(self, numbers, country_code=None, batch_size=10000):
+        """
+        A generator applying check_many lazily to a stream of phone numbers, batch_size numbers at a time
+
+        Params:
+        numbers: iterable
+            The phone numbers to check
+        country_code: str| Optional
+            The calling code of numbers in national format. The country_code of the normaliser is used if not passed
+        batch_size: int
+            The number of phone numbers normalised in one call
+        """
+        batch = []
+        for number in numbers:
+            batch.append(number)
+            if len(batch) >= batch_size:
+                yield from self.check_many(batch, country_code)
+                batch = []
+        if batch:
+            yield from self.check_many(batch, country_code)
+
+default_normaliser = NumberNormaliser()
+
+def calling_code(country, plans=None):
+    """
+    Returns the calling code of a country given by its short alphabetic code, or None if it is unknown
+
+    Params:
+    country: str
+        The short alphabetic code of the country (Example: NG )
+    plans: dict| Optional
+        The country plans to look the country up in. Defaults to COUNTRY_PLANS
+    """
+    country = str(country).strip().upper()
+    for code, plan in (plans if plans is not None else COUNTRY_PLANS).items():
+        if plan[0] == country:
+            return code
+    return None
+
+def normalise_number(number, country_code):
+    """
+    Returns a phone number in international format without the '+', or None if it is invalid.
+    Uses the default NumberNormaliser.
+
+    Params:
+    number: str| int
+        The phone number to normalise (Example: '0803 123 4567', '+234-803-123-4567')
+    country_code: str
+        Represents short numeric geographical codes developed to represent countries (Example: 234 ).
+    """
+    return default_normaliser.normalise(number, country_code)
@@ -0,0 +1,267 @@
+import math
+import threading
+import time
+
+DEFAULT_TICK = 1.0
+DEFAULT_RETAIN = 3600
+DEFAULT_GRACE = 2.0
+DEFAULT_MAX_ENTRIES = 100000
+# The longest pin_time_to_live accepted by termii, in minutes.
+MAX_TIME_TO_LIVE = 60
+ACTIVE = "active"
+VERIFIED = "verified"
+
+class _Pin:
+    __slots__ = ("expires", "deadline", "attempts", "number", "state")
+
+    def __init__(self, expires, deadline, attempts, number):
+        self.expires = expires
+        self.deadline = deadline
+        self.attempts = attempts
+        self.number = number
+        self.state = ACTIVE
+
+def pin_id_of(response):
+    """
+    Returns the pin id of the decoded response of send_token, voice_token or in_app_token, or None if it has none
+
+    Params:
+    response: dict
+        The decoded termii response
+    """
+    if not isinstance(response, dict):
+        return None
+    pin_id = response.get("pinId")
+    if pin_id is None and isinstance(response.get("data"), dict):
+        pin_id = response["data"].get("pin_id")
+    return str(pin_id) if pin_id is not None else None
+
+class PinLedger:
+    """
+    Remembers the pins sent by a client, with their expiry time and the attempts left, so
+    verifies that are certain to fail are answered locally instead of by the termii API.
+    A verify of a pin that has expired, has no attempts left or was already verified
+    returns the response termii would give without a request, which keeps floods of
+    guesses against the same pins off the network.
+
+    Pins are kept in a timing wheel of tick second slots, each pin sitting in the slot of
+    the tick it is forgotten at, retain seconds after it expires. Recording a pin is
+    constant time, and the slots passed since the last call are swept on every call, so
+    the ledger never grows past the pins of the last hour or so.
+
+    The ledger errs towards the network: expiry is counted from the start of the send and
+    a pin is only expired locally grace seconds after it, an attempt is only counted once
+    termii answers the verify, and pins the ledger does not know are verified by termii.
+
+    Attributes:
+    tick: float
+        The number of seconds covered by a slot of the wheel
+    retain: float
+        The number of seconds an expired pin is remembered for, so late verifies are still answered locally
+    grace: float
+        The number of seconds added to the time to live of a pin, covering the delay of the send
+    max_entries: int
+        The maximum number of pins remembered at once. Pins sent while the ledger is full are verified by termii
+    answered: int
+        The number of verifies answered locally so far
+    """
+
+    def __init__(self, tick=DEFAULT_TICK, retain=DEFAULT_RETAIN, grace=DEFAULT_GRACE, max_entries=DEFAULT_MAX_ENTRIES):
+        self.tick = tick
+        self.retain = retain
+        self.grace = grace
+        self.max_entries = max_entries
+        self.answered = 0
+        self._entries = {}
+        self._size = int(math.ceil((MAX_TIME_TO_LIVE * 60 + grace + retain) / tick)) + 2
+        self._slots = [[] for _ in range(self._size)]
+        self._cursor = int(time.monotonic() / tick)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _advance(self, now):
+        tick = int(now / self.tick)
+        cursor = self._cursor
+        if tick <= cursor:
+            return
+        entries = self._entries
+        # Every deadline is less than a full turn of the wheel away, so one turn sweeps every pin due.
+        for position in range(cursor + 1, cursor + min(tick - cursor, self._size) + 1):
+            index = position % self._size
+            slot = self._slots[index]
+            if not slot:
+                continue
+            kept = []
+            for pin_id, entry in slot:
+                if entries.get(pin_id) is not entry:
+                    continue
+                if entry.deadline <= tick:
+                    del entries[pin_id]
+                else:
+                    kept.append((pin_id, entry))
+            self._slots[index] = kept
+        self._cursor = tick
+
+    def record(self, pin_id, pin_time_to_live, pin_attempts, phone_number=None, started=None):
+        """
+        Remembers a pin sent to a phone number
+
+        Params:
+        pin_id: str
+            The id of the pin given by termii
+        pin_time_to_live: int
+            The number of minutes the pin is valid for
+        pin_attempts: int
+            The number of times the pin can be attempted
+        phone_number: str| Optional
+            The phone number the pin was sent to, returned as the msisdn of local answers
+        started: float| Optional
+            The time.monotonic() the send was started at. Now if not passed
+        """
+        try:
+            minutes = int(pin_time_to_live)
+            attempts = int(pin_attempts)
+        except (TypeError, ValueError):
+            return
+        if pin_id is None or not 0 < minutes <= MAX_TIME_TO_LIVE:
+            return
+
+        now = time.monotonic()
+        expires = (started if started is not None else now) + minutes * 60 + self.grace
+        deadline = int((expires + self.retain) / self.tick) + 1
+        with self._lock:
+            self._advance(now)
+            if len(self._entries) >= self.max_entries:
+                return
+            entry = _Pin(expires, deadline, max(1, attempts), phone_number)
+            self._entries[str(pin_id)] = entry
+            self._slots[deadline % self._size].append((str(pin_id), entry))
+
+    def record_response(self, response, pin_time_to_live, pin_attempts, phone_number=None, started=None):
+        """
+        Remembers the pin of the decoded response of send_token, voice_token or in_app_token and returns its id
+
+        Params:
+        response: dict
+            The decoded termii response of the send
+        pin_time_to_live: int
+            The number of minutes the pin is valid for
+        pin_attempts: int
+            The number of times the pin can be attempted
+        phone_number: str| Optional
+            The phone number the pin was sent to
+        started: float| Optional
+            The time.monotonic() the send was started at
+        """
+        pin_id = pin_id_of(response)
+        if pin_id is not None:
+            self.record(pin_id, pin_time_to_live, pin_attempts, phone_number, started)
+        return pin_id
+
+    def check(self, pin_id):
+        """
+        Returns the local answer to a verify of a pin that is certain to fail, or None if termii has to verify it
+
+        Params:
+        pin_id: str
+            The id of the pin
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._advance(now)
+            entry = self._entries.get(str(pin_id))
+            if entry is None:
+                return None
+            if entry.state == VERIFIED:
+                response = {"pinId": pin_id, "verified": False, "msisdn": entry.number, "message": "Pin already verified"}
+            elif entry.expires <= now:
+                response = {"pinId": pin_id, "verified": "Expired", "msisdn": entry.number}
+            elif entry.attempts <= 0:
+                response = {"pinId": pin_id, "verified": False, "msisdn": entry.number, "message": "Pin attempts exceeded"}
+            else:
+                return None
+            self.answered += 1
+            return response
+
+    def settle(self, pin_id, response):
+        """
+        Updates a pin with the answer of termii to its verify
+
+        Params:
+        pin_id: str
+            The id of the pin
+        response: dict
+            The decoded termii response of the verify
+        """
+        verified = response.get("verified") if isinstance(response, dict) else None
+        with self._lock:
+            entry = self._entries.get(str(pin_id))
+            if entry is None:
+                return
+            if verified is True or str(verified).lower() == "true":
+                entry.state = VERIFIED
+            elif str(verified).lower() == "expired":
+                entry.expires = min(entry.expires, time.monotonic())
+            elif verified is False or str(verified).lower() == "false":
+                entry.attempts -= 1
+                if "exceeded" in str(response.get("message", "")).lower():
+                    entry.attempts = 0
+            else:
+                # An answer the ledger does not understand, such as an unknown pin id, is left to termii from now on.
+                del self._entries[str(pin_id)]
+
+    def forget(self, pin_id):
+        """
+        Forgets a pin, so its next verify is sent to termii
+
+        Params:
+        pin_id: str
+            The id of the pin
+        """
+        with self._lock:
+            self._entries.pop(str(pin_id), None)
+
+    def clear(self):
+        """
+        Forgets every pin
+        """
+        with self._lock:
+            self._entries.clear()
+            for slot in self._slots:
+                slot.clear()
+
+    def verify(self, pin_id, send):
+        """
+        Answers a verify locally if it is certain to fail, otherwise makes it and settles the pin with its response
+
+        Params:
+        pin_id: str
+            The id of the pin
+        send: callable
+            Makes the verify and returns its decoded response
+        """
+        response = self.check(pin_id)
+        if response is not None:
+            return response
+        response = send()
+        self.settle(pin_id, response)
+        return response
+
+    async def verify_async(self, pin_id, send):
+        """
+        Answers a verify locally if it is certain to fail. See verify
+
+        Params:
+        pin_id: str
+            The id of the pin
+        send: callable
+            Returns an awaitable making the verify and returning its decoded response
+        """
+        response = self.check(pin_id)
+        if response is not None:
+            return response
+        response = await send()
+        self.settle(pin_id, response)
+        return response
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+SWITCH = "switch"
+BULK = "bulk"
+TOKEN = "token"
+INSIGHT = "insight"
+
+INSIGHT_PATHS = ("/api/get-balance", "/api/check/dnd", "/api/insight/", "/api/sms/inbox")
+
+def endpoint_group(url):
+    """
+    Returns the endpoint group a termii url belongs to: 'bulk', 'token', 'insight' or 'switch'
+
+    Params:
+    url: str
+        The url of the request
+    """
+    path = urlsplit(url).path
+
+    if path.startswith("/api/sms/send/bulk"):
+        return BULK
+    if path.startswith("/api/sms/otp"):
+        return TOKEN
+    if path.startswith(INSIGHT_PATHS):
+        return INSIGHT
+    return SWITCH
+
+class TokenBucket:
+    """
+    A token bucket that can be shared by threads and coroutines. Every request takes
+    one token, tokens are refilled at a constant rate up to the size of the bucket.
+    Callers that find the bucket empty reserve a future token and wait for it, so they
+    are served in the order they arrived.
+
+    Attributes:
+    rate: float
+        The number of tokens added to the bucket per second
+    capacity: int
+        The maximum number of tokens in the bucket, which is the largest burst allowed
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, int(rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """
+        Takes a token from the bucket, blocking the thread until one is available
+        """
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """
+        Takes a token from the bucket, suspending the coroutine until one is available
+        """
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+class RateLimiter:
+    """
+    Paces requests on the client side with a separate token bucket for every endpoint group,
+    so a burst of requests waits locally instead of being throttled by the termii API.
+
+    Attributes:
+    limits: dict
+        Maps an endpoint group ('switch', 'bulk', 'token' or 'insight') to a (rate, burst)
+        tuple, where rate is the number of requests allowed per second and burst the number
+        of requests allowed at once. Groups not in the dictionary are not limited.
+        (Example: {'switch': (50, 10), 'token': (20, 5)})
+    """
+
+    def __init__(self, limits):
+        self.limits = limits
+        self._buckets = {group: TokenBucket(rate, burst) for group, (rate, burst) in limits.items()}
+
+    def acquire(self, url):
+        """
+        Waits until a request to the url is allowed
+
+        Params:
+        url: str
+            The url of the request
+        """
+        bucket = self._buckets.get(endpoint_group(url))
+        if bucket is not None:
+            bucket.acquire()
+
+    async def acquire_async(self, url):
+        """
+        Waits without blocking the event loop until a request to the url is allowed
+
+        Params:
+        url: str
+            The url of the request
+        """
+        bucket = self._buckets.get(endpoint_group(url))
+        if bucket is not None:
+            await bucket.acquire_async()
@@ -0,0 +1,122 @@
+class ChunkResult:
+    """
+    The outcome of sending one chunk of a bulk message
+
+    Attributes:
+    index: int
+        The position of the chunk in the recipient stream, starting from 0
+    size: int
+        The number of recipients in the chunk
+    response: dict
+        The decoded termii response for the chunk, including the error body of a chunk termii rejected. None if no response was received
+    error: Exception
+        The exception raised while sending the chunk, an APIError if termii answered with an error status. None if the chunk was sent.
+        For a chunk of size 0, the exception raised while reading the recipients, which ended the batch
+    message: str
+        The text sent to the chunk when the chunks of a batch carry different texts. None otherwise
+    status_code: int
+        The HTTP status code termii answered with. None if no response was received, or if the chunk was a suppressed repeat
+    """
+
+    def __init__(self, index, size, response=None, error=None, message=None, status_code=None):
+        self.index = index
+        self.size = size
+        self.response = response
+        self.error = error
+        self.message = message
+        self.status_code = status_code
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"ChunkResult(index={self.index}, size={self.size}, {status})"
+
+class BulkResult:
+    """
+    The aggregated outcome of a chunked bulk message
+
+    Attributes:
+    chunks: list
+        A ChunkResult for every chunk sent, ordered by chunk index
+    """
+
+    def __init__(self, chunks):
+        self.chunks = sorted(chunks, key=lambda chunk: chunk.index)
+
+    @property
+    def total(self):
+        return sum(chunk.size for chunk in self.chunks)
+
+    @property
+    def sent(self):
+        return sum(chunk.size for chunk in self.chunks if chunk.ok)
+
+    @property
+    def failed(self):
+        return [chunk for chunk in self.chunks if not chunk.ok]
+
+    @property
+    def ok(self):
+        return not self.failed
+
+    def __repr__(self):
+        return f"BulkResult(chunks={len(self.chunks)}, total={self.total}, sent={self.sent})"
+
+class TemplatedResult(BulkResult):
+    """
+    The aggregated outcome of a templated bulk message. Every chunk is one bulk request
+    sending one rendered text to the recipients it rendered the same for.
+
+    Attributes:
+    chunks: list
+        A ChunkResult for every bulk request sent, ordered by chunk index. Its message is the rendered text
+    skipped: list
+        An (index, error) pair for every record that was not sent because it lacks a template
+        field or its phone number is invalid
+    """
+
+    def __init__(self, chunks, skipped):
+        super().__init__(chunks)
+        self.skipped = skipped
+
+    @property
+    def groups(self):
+        return len({chunk.message for chunk in self.chunks})
+
+    def __repr__(self):
+        return f"TemplatedResult(chunks={len(self.chunks)}, groups={self.groups}, total={self.total}, sent={self.sent}, skipped={len(self.skipped)})"
+
+class SendResult:
+    """
+    The outcome of sending one message of a send_many batch
+
+    Attributes:
+    index: int
+        The position of the message in the input stream, starting from 0
+    message: dict
+        The message as it was passed in
+    response: dict
+        The decoded termii response for the message, including the error body of a message termii rejected. None if no response was received
+    error: Exception
+        The exception raised while sending the message, an APIError if termii answered with an error status. None if the message was sent
+    status_code: int
+        The HTTP status code termii answered with. None if no response was received, or if the message was a suppressed repeat
+    """
+
+    def __init__(self, index, message, response=None, error=None, status_code=None):
+        self.index = index
+        self.message = message
+        self.response = response
+        self.error = error
+        self.status_code = status_code
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"error={self.error!r}"
+        return f"SendResult(index={self.index}, {status})"
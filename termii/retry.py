@@ -0,0 +1,125 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS")
+
+class RetryPolicy:
+    """
+    Decides if and when a failed request to the termii API is sent again.
+    Retries wait an exponentially growing, randomly jittered delay, unless the
+    API asked for a specific delay with a Retry-After header.
+
+    Requests that were never processed by the API (a 429 response or a failed
+    connection) are always safe to retry. Other failures of non-idempotent
+    requests, such as a 5xx on a message send, are only retried when
+    retry_non_idempotent is set, since the first attempt may have gone through.
+
+    Attributes:
+    max_retries: int
+        The maximum number of times a request is sent again. 0 disables retries
+    backoff_factor: float
+        The base delay in seconds. The delay before retry n is at most backoff_factor * 2 ** n
+    max_backoff: float
+        The maximum delay in seconds before a retry, including delays asked for with Retry-After
+    retry_statuses: tuple
+        The response status codes that are retried
+    retry_non_idempotent: bool
+        Retry POST and PATCH requests on 5xx responses and read errors as well
+    """
+
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=30, retry_statuses=RETRY_STATUSES, retry_non_idempotent=False):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = retry_statuses
+        self.retry_non_idempotent = retry_non_idempotent
+
+    def _method_allowed(self, method):
+        return self.retry_non_idempotent or method.upper() in IDEMPOTENT_METHODS
+
+    def should_retry_response(self, method, attempt, response):
+        """
+        Returns True if a request that got the response should be sent again
+
+        Params:
+        method: str
+            The HTTP method of the request
+        attempt: int
+            The number of retries already made for the request
+        response: Response
+            The response of the last attempt
+        """
+        if attempt >= self.max_retries or response.status_code not in self.retry_statuses:
+            return False
+        return response.status_code == 429 or self._method_allowed(method)
+
+    def should_retry_error(self, method, attempt, connect_failed):
+        """
+        Returns True if a request that raised a connection error or a timeout should be sent again
+
+        Params:
+        method: str
+            The HTTP method of the request
+        attempt: int
+            The number of retries already made for the request
+        connect_failed: bool
+            True if the connection could not be established, so the request was never sent
+        """
+        if attempt >= self.max_retries:
+            return False
+        return connect_failed or self._method_allowed(method)
+
+    def delay(self, attempt, response=None):
+        """
+        Returns the number of seconds to wait before the next retry
+
+        Params:
+        attempt: int
+            The number of retries already made for the request
+        response: Response| Optional
+            The response of the last attempt, whose Retry-After header is honoured
+        """
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+def parse_retry_after(value):
+    """
+    Returns the number of seconds asked for by a Retry-After header, or None if the header is missing or invalid
+
+    Params:
+    value: str
+        The value of the Retry-After header, in seconds or as an HTTP date
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def rewind_body(body):
+    """
+    Rewinds a streamed request body consumed by a failed attempt, and returns False if it cannot be sent again
+
+    Params:
+    body: any
+        The body of the request. Bodies without a seek method, such as bytes, are sent again as they are
+    """
+    if not hasattr(body, "seek"):
+        return True
+    if not body.seekable():
+        return False
+    body.seek(0)
+    return True
@@ -0,0 +1,150 @@
+import threading
+import time
+from . import metrics
+from .codec import get_codec, encode_json
+from .retry import RetryPolicy, rewind_body
+from .transport import HTTPTransport, DEFAULT_POOL_SIZE, rebase_url
+
+_default_session = None
+_default_session_lock = threading.Lock()
+
+class TermiiSession:
+    """
+    A thread-safe pooled HTTP session shared by the termii endpoint functions.
+    Connections to the termii API are kept alive and reused, so only the first
+    request on a connection pays for the TCP and TLS handshake.
+
+    The session paces, retries and encodes requests, and hands every attempt to
+    its transport, which sends it. By default requests are sent to the termii API
+    with a transport.HTTPTransport.
+
+    Attributes:
+    pool_size: int
+        The maximum number of connections kept alive in the pool.
+    rate_limiter: RateLimiter
+        Paces the requests sent with the session. No pacing is done if None.
+    retry_policy: RetryPolicy
+        Decides which failed requests are sent again. A default RetryPolicy is used if not passed.
+        Pass RetryPolicy(max_retries=0) to disable retries.
+    codec: JSONCodec
+        Encodes the json bodies of requests and decodes responses. Can be the name of a backend. The default codec, which set_default_codec changes, is used if not passed.
+    transport: HTTPTransport
+        Sends the requests. A transport.HTTPTransport with pool_size connections is used if not passed.
+        Pass a simulator.SimulatorTransport to run against the in-process termii simulator.
+    base_url: str
+        Sends the requests to another scheme and host than https://api.ng.termii.com (Example: 'http://127.0.0.1:8080' ).
+    hooks: list
+        Callables passed a metrics.RequestMetrics after every request, such as a metrics.MetricsRecorder.
+        Requests are not measured if empty, so they cost nothing without hooks.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, rate_limiter=None, retry_policy=None, codec=None, transport=None, base_url=None, hooks=None):
+        self.pool_size = pool_size
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.hooks = list(hooks or ())
+        self._codec = get_codec(codec) if codec is not None else None
+        self._traced = None
+        self.transport = transport if transport is not None else HTTPTransport(pool_size, trace=bool(self.hooks))
+        self.base_url = base_url
+
+    @property
+    def codec(self):
+        # A session created without a codec follows codec.set_default_codec.
+        codec = self._codec if self._codec is not None else get_codec()
+        if not self.hooks:
+            return codec
+        self._traced = metrics.trace_codec(codec, self._traced)
+        return self._traced
+
+    def request(self, method, url, **kwargs):
+        """
+        Sends a request over a pooled connection and returns the response.
+
+        Params:
+        method: str
+            The HTTP method of the request (Example: 'GET')
+        url: str
+            The url the request should be sent to
+        """
+        if "json" in kwargs:
+            kwargs = encode_json(self.codec, kwargs)
+
+        url = rebase_url(url, self.base_url)
+        transport = self.transport
+        attempt = 0
+        measured = metrics.start_request(method, url, kwargs.get("data")) if self.hooks else None
+        start = time.perf_counter()
+
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(url)
+
+            try:
+                response = transport.send(method, url, **kwargs)
+            except transport.errors as error:
+                if measured is not None:
+                    measured.statuses.append(type(error).__name__)
+                if not self.retry_policy.should_retry_error(method, attempt, transport.is_connect_error(error)) or not rewind_body(kwargs.get("data")):
+                    if measured is not None:
+                        self._emit(measured, start, attempt, error=error)
+                    raise
+                delay = self.retry_policy.delay(attempt)
+            else:
+                if measured is not None:
+                    measured.statuses.append(response.status_code)
+                if not self.retry_policy.should_retry_response(method, attempt, response) or not rewind_body(kwargs.get("data")):
+                    if measured is not None:
+                        self._emit(measured, start, attempt, response=response)
+                    return response
+                delay = self.retry_policy.delay(attempt, response)
+
+            attempt += 1
+            time.sleep(delay)
+
+    def _emit(self, measured, start, attempt, response=None, error=None):
+        if response is not None:
+            metrics.record_response(measured, response, self.codec)
+        else:
+            measured.error = type(error).__name__
+        measured.retries = attempt
+        measured.latency = time.perf_counter() - start
+        metrics.emit(self.hooks, measured)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        """
+        Closes every connection held by the transport.
+        """
+        self.transport.close()
+
+def get_session(session=None):
+    """
+    Returns the session an endpoint function should use. When no session is
+    passed, a pooled session shared by the whole process is returned.
+
+    Params:
+    session: TermiiSession| Optional
+        The session to use for the request
+    """
+    global _default_session
+
+    if session is not None:
+        return session
+
+    if _default_session is None:
+        with _default_session_lock:
+            if _default_session is None:
+                _default_session = TermiiSession()
+    return _default_session
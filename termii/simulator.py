@@ -0,0 +1,616 @@
+import asyncio
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qsl
+import requests
+from requests.structures import CaseInsensitiveDict
+from .phone_numbers import default_normaliser, calling_code
+from .rate_limit import endpoint_group
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+CONNECT_ERROR = "connect_error"
+READ_TIMEOUT = "read_timeout"
+DEFAULT_PER_PAGE = 15
+DEFAULT_HISTORY_SIZE = 100000
+
+class SimulatedResponse:
+    """
+    The outcome of one request handled by the TermiiSimulator
+
+    Attributes:
+    status_code: int
+        The HTTP status of the response
+    body: any
+        The JSON body of the response
+    headers: dict
+        The headers of the response
+    delay: float
+        The number of seconds the transport waits before answering, to simulate latency
+    fault: str
+        CONNECT_ERROR or READ_TIMEOUT if the request must fail instead of being answered, otherwise None
+    """
+
+    __slots__ = ("status_code", "body", "headers", "delay", "fault")
+
+    def __init__(self, status_code, body, headers=None, delay=0, fault=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        self.delay = delay
+        self.fault = fault
+
+    def __repr__(self):
+        return f"SimulatedResponse(status_code={self.status_code}, fault={self.fault!r})"
+
+class TermiiSimulator:
+    """
+    An in-process simulator of the Switch, Token and Insight endpoints of the termii API.
+    It keeps the state a real account would have (balance, sender IDs, phonebooks, contacts,
+    pins and the message history) and can inject latency, 5xx errors, timeouts, connection
+    failures and 429s, so production load shapes can be reproduced offline and for free.
+    The responses follow the documented shape of the termii responses, but the simulator
+    does not aim at reproducing every validation rule of the real API.
+
+    Attributes:
+    latency: float
+        The number of seconds every request takes at least
+    jitter: float
+        A random number of seconds between 0 and jitter is added to the latency of every request
+    latencies: dict
+        Overrides latency per endpoint group (Example: {'token': 0.3, 'bulk': 1.0} ). See rate_limit.endpoint_group
+    error_rate: float
+        The fraction of requests answered with a 500
+    throttle_rate: float
+        The fraction of requests answered with a 429
+    rate_limit: float
+        The number of requests per second accepted before answering 429s, like the real API does. None for no limit
+    retry_after: float
+        The Retry-After header sent with 429s, in seconds
+    timeout_rate: float
+        The fraction of requests that are processed but whose response never arrives
+    connect_error_rate: float
+        The fraction of requests that fail to connect, so they never reach the simulator
+    balance: float
+        The balance of the simulated account. Every sms and pin costs one unit
+    seed: int
+        Seeds the random faults, so a run can be reproduced
+    requests: int
+        The number of requests received
+    statuses: Counter
+        The number of responses sent per status code, and of faults per kind
+    """
+
+    def __init__(self, latency=0, jitter=0, latencies=None, error_rate=0, throttle_rate=0, rate_limit=None, retry_after=1,
+            timeout_rate=0, connect_error_rate=0, balance=100000, seed=None, history_size=DEFAULT_HISTORY_SIZE):
+        self.latency = latency
+        self.jitter = jitter
+        self.latencies = latencies or {}
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.timeout_rate = timeout_rate
+        self.connect_error_rate = connect_error_rate
+        self.balance = balance
+        self.requests = 0
+        self.statuses = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = rate_limit or 0
+        self._updated = time.monotonic()
+        self._ids = itertools.count(1)
+        self.sender_ids = {"Termii": {"sender_id": "Termii", "status": "active", "company": "Simulator", "usecase": "Simulated traffic",
+            "country": None, "created_at": _now()}}
+        self.phonebooks = {}
+        self.contacts = {}
+        self.campaigns = {}
+        self.pins = {}
+        self.history = deque(maxlen=history_size)
+        self._routes = [(method, re.compile(f"^{pattern}$"), handler) for method, pattern, handler in (
+            ("GET", r"/api/sender-id", self._sender_ids),
+            ("POST", r"/api/sender-id/request", self._request_sender_id),
+            ("POST", r"/api/sms/send", self._send_message),
+            ("POST", r"/api/sms/send/bulk", self._send_bulk),
+            ("POST", r"/api/sms/number/send", self._send_message),
+            ("POST", r"/api/send/template", self._send_template),
+            ("GET", r"/api/phonebooks", self._phonebooks),
+            ("POST", r"/api/phonebooks", self._create_phonebook),
+            ("PATCH", r"/api/phonebooks/(?P<phonebook_id>[^/]+)", self._update_phonebook),
+            ("DELETE", r"/api/phonebooks/(?P<phonebook_id>[^/]+)", self._delete_phonebook),
+            ("GET", r"/api/phonebooks/(?P<phonebook_id>[^/]+)/contacts", self._contacts),
+            ("POST", r"/api/phonebooks/(?P<phonebook_id>[^/]+)/contacts", self._add_contacts),
+            ("DELETE", r"/api/phonebook/contact/(?P<contact_id>[^/]+)", self._delete_contact),
+            ("POST", r"/api/sms/campaigns/send", self._send_campaign),
+            ("GET", r"/api/sms/campaigns", self._campaigns),
+            ("GET", r"/api/sms/campaigns/(?P<campaign_id>[^/]+)", self._campaign_history),
+            ("POST", r"/api/sms/otp/send", self._send_token),
+            ("POST", r"/api/sms/otp/send/voice", self._send_voice_token),
+            ("POST", r"/api/sms/otp/verify", self._verify_token),
+            ("POST", r"/api/sms/otp/generate", self._in_app_token),
+            ("GET", r"/api/get-balance", self._balance),
+            ("GET", r"/api/check/dnd", self._check_dnd),
+            ("GET", r"/api/insight/number/query", self._number_status),
+            ("GET", r"/api/sms/inbox", self._history),
+        )]
+
+    def _throttled(self):
+        if self.rate_limit is None:
+            return False
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._updated) * self.rate_limit)
+        self._updated = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    def _delay(self, url):
+        latency = self.latencies.get(endpoint_group(url), self.latency)
+        return latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+
+    def handle(self, method, url, params=None, data=None, json_body=None):
+        """
+        Handles one request and returns its SimulatedResponse
+
+        Params:
+        method: str
+            The HTTP method of the request (Example: 'POST')
+        url: str
+            The url of the request. Only its path and query are used, so any host works
+        params: dict| Optional
+            The query parameters of the request
+        data: bytes| str| dict| file| iterable| Optional
+            The body of the request. JSON bodies are decoded, streamed bodies are consumed
+        json_body: any| Optional
+            A body that was not encoded yet
+        """
+        parts = urlsplit(url)
+        values = dict(parse_qsl(parts.query))
+        values.update(params or {})
+        body = json_body if json_body is not None else _read_body(data)
+        if isinstance(body, dict):
+            values.update(body)
+
+        with self._lock:
+            self.requests += 1
+            delay = self._delay(url)
+            draw = self._random.random
+
+            if self.connect_error_rate and draw() < self.connect_error_rate:
+                self.statuses[CONNECT_ERROR] += 1
+                return SimulatedResponse(0, None, delay=delay, fault=CONNECT_ERROR)
+            if self._throttled() or (self.throttle_rate and draw() < self.throttle_rate):
+                self.statuses[429] += 1
+                return SimulatedResponse(429, {"message": "Too Many Attempts."}, {"Retry-After": str(self.retry_after)}, delay)
+            if self.error_rate and draw() < self.error_rate:
+                self.statuses[500] += 1
+                return SimulatedResponse(500, {"message": "Server Error"}, delay=delay)
+            timed_out = bool(self.timeout_rate) and draw() < self.timeout_rate
+
+            status_code, response = self._route(method.upper(), parts.path, values, body)
+            if timed_out:
+                self.statuses[READ_TIMEOUT] += 1
+                return SimulatedResponse(0, None, delay=delay, fault=READ_TIMEOUT)
+            self.statuses[status_code] += 1
+            return SimulatedResponse(status_code, response, delay=delay)
+
+    def _route(self, method, path, values, body):
+        if not values.get("api_key"):
+            return 401, {"message": "Unauthenticated."}
+
+        path_found = False
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            path_found = True
+            if route_method == method:
+                return handler(values, body, **match.groupdict())
+        if path_found:
+            return 405, {"message": f"The {method} method is not supported for this route."}
+        return 404, {"message": "Not Found"}
+
+    def _charge(self, units):
+        self.balance -= units
+        return self.balance
+
+    def _record(self, receiver, sender, message, channel="generic", status="DELIVERED"):
+        message_id = f"{next(self._ids):016d}"
+        self.history.append({
+            "sender": sender, "receiver": receiver, "message": message, "amount": 1, "reroute": 0, "status": status,
+            "sms_type": "plain", "send_by": "api", "media_url": None, "message_id": message_id, "notify_url": None,
+            "notify_id": None, "channel": channel, "created_at": _now(),
+        })
+        return message_id
+
+    def _sender_ids(self, values, body):
+        return 200, _page(list(self.sender_ids.values()), values)
+
+    def _request_sender_id(self, values, body):
+        sender_id = values.get("sender_id")
+        if not sender_id:
+            return 400, {"message": "The sender id field is required."}
+        self.sender_ids[sender_id] = {"sender_id": sender_id, "status": "pending", "company": values.get("company"),
+            "usecase": values.get("usecase"), "country": None, "created_at": _now()}
+        return 200, {"code": "ok", "message": "Sender Id requested. You will be contacted by your account manager."}
+
+    def _send_message(self, values, body):
+        if not values.get("to") or not values.get("sms"):
+            return 400, {"message": "The to and sms fields are required."}
+        message_id = self._record(values["to"], values.get("from"), values["sms"], values.get("channel", "generic"))
+        return 200, {"code": "ok", "message_id": message_id, "message": "Successfully Sent", "balance": self._charge(1), "user": "Simulator"}
+
+    def _send_bulk(self, values, body):
+        numbers = values.get("to")
+        if not isinstance(numbers, list) or not numbers or not values.get("sms"):
+            return 400, {"message": "The to and sms fields are required."}
+        if len(numbers) > 10000:
+            return 400, {"message": "The to may not have more than 10000 items."}
+        message_id = None
+        for number in numbers:
+            message_id = self._record(number, values.get("from"), values["sms"], values.get("channel", "generic"))
+        return 200, {"code": "ok", "message_id": message_id, "message": "Successfully Sent", "balance": self._charge(len(numbers)), "user": "Simulator"}
+
+    def _send_template(self, values, body):
+        message_id = self._record(values.get("phone_number"), values.get("device_id"), json.dumps(values.get("data")), "whatsapp")
+        return 200, {"code": "ok", "message_id": message_id, "message": "Successfully Sent", "balance": self._charge(1), "user": "Simulator"}
+
+    def _phonebooks(self, values, body):
+        phonebooks = [dict(phonebook, total_number_of_contacts=sum(1 for contact in self.contacts.values() if contact["pid"] == phonebook["id"]))
+            for phonebook in self.phonebooks.values()]
+        return 200, _page(phonebooks, values)
+
+    def _create_phonebook(self, values, body):
+        phonebook_id = uuid.uuid4().hex[:12]
+        self.phonebooks[phonebook_id] = {"id": phonebook_id, "name": values.get("phonebook_name"), "description": values.get("description"),
+            "date_created": _now(), "last_updated": _now()}
+        return 200, {"message": "Phonebook added successfully"}
+
+    def _update_phonebook(self, values, body, phonebook_id):
+        phonebook = self.phonebooks.get(phonebook_id)
+        if phonebook is None:
+            return 404, {"message": "Phonebook not found"}
+        phonebook.update(name=values.get("phonebook_name"), description=values.get("description"), last_updated=_now())
+        return 200, {"message": "Phonebook Updated successfully"}
+
+    def _delete_phonebook(self, values, body, phonebook_id):
+        if self.phonebooks.pop(phonebook_id, None) is None:
+            return 404, {"message": "Phonebook not found"}
+        self.contacts = {key: contact for key, contact in self.contacts.items() if contact["pid"] != phonebook_id}
+        return 200, {"message": "Phonebook deleted successfully"}
+
+    def _contacts(self, values, body, phonebook_id):
+        if phonebook_id not in self.phonebooks:
+            return 404, {"message": "Phonebook not found"}
+        return 200, _page([contact for contact in self.contacts.values() if contact["pid"] == phonebook_id], values)
+
+    def _add_contacts(self, values, body, phonebook_id):
+        if phonebook_id not in self.phonebooks:
+            return 404, {"message": "Phonebook not found"}
+
+        if not isinstance(body, dict):
+            rows = _contact_rows(body)
+            if rows is None:
+                return 422, {"message": "The contact file field is required."}
+            for row in rows:
+                contact_id = next(self._ids)
+                self.contacts[contact_id] = {"id": contact_id, "pid": phonebook_id, "phone_number": row, "country_code": values.get("country_code"),
+                    "create_at": _now(), "updated_at": _now()}
+            return 200, {"message": "Your list is being uploaded in the background."}
+
+        contact_id = next(self._ids)
+        contact = {"id": contact_id, "pid": phonebook_id, "phone_number": values.get("phone_number"), "create_at": _now(), "updated_at": _now()}
+        for option in ("email_address", "first_name", "last_name", "company", "country_code"):
+            contact[option] = values.get(option)
+        self.contacts[contact_id] = contact
+        return 200, {"data": contact}
+
+    def _delete_contact(self, values, body, contact_id):
+        if self.contacts.pop(_int(contact_id), None) is None:
+            return 404, {"message": "Contact not found"}
+        return 200, {"message": "Contact deleted successfully"}
+
+    def _send_campaign(self, values, body):
+        phonebook_id = values.get("phonebook_id")
+        if phonebook_id not in self.phonebooks:
+            return 404, {"message": "Phonebook not found"}
+        campaign_id = f"C{next(self._ids)}"
+        recipients = [contact["phone_number"] for contact in self.contacts.values() if contact["pid"] == phonebook_id]
+        for number in recipients:
+            self._record(number, values.get("sender_id"), values.get("message"), values.get("channel", "generic"))
+        self._charge(len(recipients))
+        self.campaigns[campaign_id] = {"campaign_id": campaign_id, "phone_book": self.phonebooks[phonebook_id]["name"],
+            "sender": values.get("sender_id"), "camp_type": values.get("campaign_type"), "channel": values.get("channel"),
+            "total_recipients": len(recipients), "run_at": values.get("schedule_time"), "status": "Sent", "created_at": _now()}
+        return 200, {"message": "Your campaign has been scheduled", "campaignId": campaign_id, "status": "success"}
+
+    def _campaigns(self, values, body):
+        return 200, _page(list(self.campaigns.values()), values)
+
+    def _campaign_history(self, values, body, campaign_id):
+        if campaign_id not in self.campaigns:
+            return 404, {"message": "Campaign not found"}
+        return 200, _page([self.campaigns[campaign_id]], values)
+
+    def _new_pin(self, number, values, pin=None):
+        length = _int(values.get("pin_length"), 6)
+        pin = str(pin) if pin is not None else "".join(self._random.choice("0123456789") for _ in range(length))
+        pin_id = str(uuid.uuid4())
+        minutes = _int(values.get("pin_time_to_live"), 10)
+        self.pins[pin_id] = {"pin": pin, "number": number, "expires": time.monotonic() + minutes * 60,
+            "attempts": max(1, _int(values.get("pin_attempts"), 3))}
+        self._charge(1)
+        return pin_id, pin
+
+    def _send_token(self, values, body):
+        number = values.get("to")
+        if not number:
+            return 400, {"message": "The to field is required."}
+        pin_id, pin = self._new_pin(number, values)
+        text = values.get("message_text") or "Your pin is < 1234 >"
+        self._record(number, values.get("from"), text.replace(values.get("pin_placeholder") or "< 1234 >", pin), values.get("channel", "generic"))
+        return 200, {"pinId": pin_id, "to": number, "smsStatus": "Message Sent"}
+
+    def _send_voice_token(self, values, body):
+        number = values.get("phone_number")
+        if not number:
+            return 400, {"message": "The phone number field is required."}
+        if values.get("code") is not None:
+            self._new_pin(number, values, values["code"])
+            return 200, {"code": "ok", "message_id": self._record(number, None, "voice call", "voice"), "message": "Successfully Sent",
+                "balance": self.balance, "user": "Simulator"}
+        pin_id, _ = self._new_pin(number, values)
+        return 200, {"code": "ok", "message": "Successfully Sent", "pinId": pin_id, "phone_number": number, "balance": self.balance, "user": "Simulator"}
+
+    def _verify_token(self, values, body):
+        pin_id = values.get("pin_id")
+        entry = self.pins.get(pin_id)
+        if entry is None:
+            return 404, {"message": "Pin id not found"}
+        if entry["expires"] < time.monotonic():
+            return 200, {"pinId": pin_id, "verified": "Expired", "msisdn": entry["number"]}
+        if entry["attempts"] <= 0:
+            return 400, {"pinId": pin_id, "verified": False, "msisdn": entry["number"], "message": "Pin attempts exceeded"}
+        if str(values.get("pin")) != entry["pin"]:
+            entry["attempts"] -= 1
+            return 400, {"pinId": pin_id, "verified": False, "msisdn": entry["number"]}
+        del self.pins[pin_id]
+        return 200, {"pinId": pin_id, "verified": True, "msisdn": entry["number"]}
+
+    def _in_app_token(self, values, body):
+        number = values.get("phone_number")
+        if not number:
+            return 400, {"message": "The phone number field is required."}
+        pin_id, pin = self._new_pin(number, values)
+        return 200, {"status": "success", "data": {"pin_id": pin_id, "otp": pin, "phone_number": number, "phone_number_other": "Simulator"}}
+
+    def _balance(self, values, body):
+        return 200, {"user": "Simulator", "balance": self.balance, "currency": "NGN"}
+
+    def _check_dnd(self, values, body):
+        number = values.get("phone_number")
+        info = default_normaliser.info(number) if number else None
+        if info is None:
+            return 400, {"message": "The phone number is invalid."}
+        blacklisted = int(info.number[-1]) % 5 == 0
+        return 200, {"number": info.number, "status": "DND blacklisted" if blacklisted else "DND not active on phone number",
+            "network": info.network or "Unknown", "network_code": info.calling_code}
+
+    def _number_status(self, values, body):
+        number = values.get("phone_number")
+        # The country is given by its short alphabetic code. A number of an unknown country is read as international.
+        code = calling_code(values.get("country_code") or "")
+        if number and code is None:
+            number = f"+{str(number).lstrip('+')}"
+        info = default_normaliser.info(number, code) if number else None
+        if info is None:
+            return 400, {"message": "The phone number is invalid."}
+        return 200, {"result": [{
+            "routeDetail": {"number": info.number, "ported": int(info.number[-2]) % 10 == 0},
+            "countryDetail": {"countryCode": info.calling_code, "iso": info.country},
+            "operatorDetail": {"operatorName": info.network or "Unknown"},
+            "status": 200,
+        }]}
+
+    def _history(self, values, body):
+        # The latest messages come first and the whole history is answered whatever page is asked for, like in the API.
+        return 200, list(reversed(self.history))
+
+    def seed_history(self, count, sender="Termii", message="Your verification code is 123456"):
+        """
+        Adds count delivered messages to the message history, to simulate an account with traffic
+
+        Params:
+        count: int
+            The number of messages to add
+        sender: str
+            The sender ID of the messages
+        message: str
+            The text of the messages
+        """
+        with self._lock:
+            for index in range(count):
+                self._record(f"23480{index % 100000000:08d}", sender, message)
+
+    def reset_statistics(self):
+        """
+        Resets the request counter and the status counts
+        """
+        with self._lock:
+            self.requests = 0
+            self.statuses.clear()
+
+    def __repr__(self):
+        return f"TermiiSimulator(requests={self.requests}, statuses={dict(self.statuses)!r})"
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def _int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+def _page(items, values):
+    per_page = max(1, _int(values.get("per_page"), DEFAULT_PER_PAGE))
+    page = max(1, _int(values.get("page"), 1))
+    last_page = max(1, -(-len(items) // per_page))
+    start = (page - 1) * per_page
+    return {"current_page": page, "data": items[start:start + per_page], "last_page": last_page, "per_page": per_page,
+        "total": len(items), "next_page_url": f"?page={page + 1}" if page < last_page else None}
+
+def _read_body(data):
+    # Decodes JSON bodies, and consumes streamed and multipart bodies like a server would.
+    if data is None:
+        return None
+    if isinstance(data, dict):
+        return data
+    if hasattr(data, "read"):
+        content = bytearray()
+        for chunk in iter(lambda: data.read(64 * 1024), data.read(0)):
+            content += chunk.encode() if isinstance(chunk, str) else chunk
+        return bytes(content)
+    if not isinstance(data, (bytes, str)):
+        return b"".join(chunk.encode() if isinstance(chunk, str) else chunk for chunk in data)
+    try:
+        return json.loads(data)
+    except ValueError:
+        return data
+
+def _contact_rows(body):
+    # Returns the phone numbers of the contact_file part of a multipart upload, or None if it has none.
+    if isinstance(body, str):
+        body = body.encode()
+    if not isinstance(body, bytes) or not body.startswith(b"--"):
+        return None
+    boundary = body.split(b"\r\n", 1)[0]
+    for part in body.split(boundary):
+        head, _, content = part.partition(b"\r\n\r\n")
+        if b'name="contact_file"' not in head:
+            continue
+        rows = []
+        for line in content.rstrip(b"\r\n-").splitlines():
+            number = line.split(b",", 1)[0].strip().decode(errors="replace")
+            if number.isdigit():
+                rows.append(number)
+        return rows
+    return None
+
+class SimulatorTransport:
+    """
+    A transport answering the requests of a TermiiSession with a TermiiSimulator instead of
+    the termii API. Latency is simulated by sleeping, and failed connections and timeouts
+    raise the same requests exceptions a real transport would, so they go through the retry
+    policy of the session.
+
+    Attributes:
+    simulator: TermiiSimulator
+        The simulator answering the requests. A TermiiSimulator without faults is used if not passed
+    errors: tuple
+        The exceptions raised by send when a request could not be completed.
+    """
+
+    errors = (requests.ConnectionError, requests.Timeout)
+
+    def __init__(self, simulator=None):
+        self.simulator = simulator if simulator is not None else TermiiSimulator()
+
+    def send(self, method, url, **kwargs):
+        """
+        Answers one request and returns a requests.Response
+
+        Params:
+        method: str
+            The HTTP method of the request (Example: 'GET')
+        url: str
+            The url of the request
+        """
+        outcome = self.simulator.handle(method, url, kwargs.get("params"), kwargs.get("data"), kwargs.get("json"))
+        if outcome.delay:
+            time.sleep(outcome.delay)
+
+        if outcome.fault == CONNECT_ERROR:
+            raise requests.ConnectTimeout(f"Simulated connection failure to {url}")
+        if outcome.fault == READ_TIMEOUT:
+            raise requests.ReadTimeout(f"Simulated read timeout from {url}")
+
+        response = requests.Response()
+        response.status_code = outcome.status_code
+        response._content = json.dumps(outcome.body).encode()
+        response.headers = CaseInsensitiveDict(outcome.headers, **{"Content-Type": "application/json"})
+        response.encoding = "utf-8"
+        response.url = url
+        return response
+
+    def is_connect_error(self, error):
+        return isinstance(error, requests.ConnectTimeout)
+
+    def close(self):
+        pass
+
+class AsyncSimulatorTransport:
+    """
+    The asyncio version of SimulatorTransport, for the AsyncTermiiSession. Latency is
+    simulated with asyncio.sleep, so simulated requests overlap like real ones.
+    Requires httpx.
+
+    Attributes:
+    simulator: TermiiSimulator
+        The simulator answering the requests. A TermiiSimulator without faults is used if not passed
+    errors: tuple
+        The exceptions raised by send when a request could not be completed.
+    """
+
+    def __init__(self, simulator=None):
+        if httpx is None:
+            raise ImportError("httpx is required for the AsyncSimulatorTransport. Install it with 'pip install termii[async]'")
+
+        self.simulator = simulator if simulator is not None else TermiiSimulator()
+        self.errors = (httpx.TransportError,)
+
+    async def send(self, method, url, **kwargs):
+        """
+        Answers one request and returns an httpx.Response
+
+        Params:
+        method: str
+            The HTTP method of the request (Example: 'GET')
+        url: str
+            The url of the request
+        """
+        data = kwargs.get("content") if kwargs.get("content") is not None else kwargs.get("data")
+        if hasattr(data, "__aiter__"):
+            data = b"".join([chunk async for chunk in data])
+        if kwargs.get("files"):
+            # A multipart contact upload, only the uploaded files matter to the simulator.
+            data = b"".join(_read_body(file[1]) if isinstance(file, tuple) else _read_body(file) for file in kwargs["files"].values())
+        outcome = self.simulator.handle(method, url, kwargs.get("params"), data, kwargs.get("json"))
+        if outcome.delay:
+            await asyncio.sleep(outcome.delay)
+
+        request = httpx.Request(method, url, params=kwargs.get("params"))
+        if outcome.fault == CONNECT_ERROR:
+            raise httpx.ConnectError(f"Simulated connection failure to {url}", request=request)
+        if outcome.fault == READ_TIMEOUT:
+            raise httpx.ReadTimeout(f"Simulated read timeout from {url}", request=request)
+
+        return httpx.Response(outcome.status_code, content=json.dumps(outcome.body).encode(),
+            headers=dict(outcome.headers, **{"Content-Type": "application/json"}), request=request)
+
+    def is_connect_error(self, error):
+        return isinstance(error, httpx.ConnectError)
+
+    async def close(self):
+        pass
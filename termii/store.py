@@ -0,0 +1,300 @@
+import json
+import sqlite3
+import threading
+from collections import namedtuple
+
+# The fields of a message report, in the order of the columns of the store.
+REPORT_FIELDS = ("message_id", "receiver", "sender", "message", "status", "channel", "cost", "sent_at")
+
+MessageReport = namedtuple("MessageReport", REPORT_FIELDS)
+MessageReport.__doc__ = """
+The delivery status of one message, from a delivery report callback or the message history.
+A plain tuple, so a batch of reports is written to the store without any conversion.
+
+Attributes:
+message_id: str
+    The id of the message given by termii
+receiver: str
+    The phone number the message was sent to
+sender: str
+    The sender ID the message was sent from
+message: str
+    The text of the message. None if the report does not include it
+status: str
+    The delivery status of the message (Example: 'DELIVERED' )
+channel: str
+    The channel the message was sent with
+cost: str
+    The cost of the message. None if the report does not include it
+sent_at: str
+    The time the message was sent at, as given by termii (Example: '2024-03-01 10:15:00' )
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    message_id TEXT PRIMARY KEY,
+    receiver TEXT,
+    sender TEXT,
+    message TEXT,
+    status TEXT,
+    channel TEXT,
+    cost TEXT,
+    sent_at TEXT
+);
+CREATE INDEX IF NOT EXISTS messages_receiver ON messages (receiver, sent_at);
+CREATE INDEX IF NOT EXISTS messages_sent_at ON messages (sent_at);
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Later reports of a message update its status, and only fill in the fields earlier reports did not have.
+UPSERT = f"""
+INSERT INTO messages ({", ".join(REPORT_FIELDS)}) VALUES ({", ".join("?" for _ in REPORT_FIELDS)})
+ON CONFLICT (message_id) DO UPDATE SET
+    status = COALESCE(excluded.status, status),
+    {", ".join(f"{field} = COALESCE({field}, excluded.{field})" for field in REPORT_FIELDS if field not in ("message_id", "status"))}
+"""
+
+HISTORY_CURSOR = "history_cursor"
+
+SELECT = f"SELECT {', '.join(REPORT_FIELDS)} FROM messages"
+
+def parse_report(report):
+    """
+    Returns the MessageReport of one decoded delivery report or message history record, or None if it has no message id
+
+    Params:
+    report: dict
+        The decoded delivery report or history record
+    """
+    get = report.get
+    message_id = get("message_id") or get("id")
+    if message_id is None:
+        return None
+    cost = get("cost", get("amount"))
+    return MessageReport(str(message_id), get("receiver"), get("sender"), get("message"), get("status"),
+        get("channel"), str(cost) if cost is not None else None, get("sent_at") or get("created_at"))
+
+class MessageStore:
+    """
+    A local SQLite store of the delivery status of sent messages, indexed by message id,
+    receiver and send time. Delivery reports and the message history are upserted into it
+    in batches, so status lookups are indexed local queries instead of requests.
+    The store is callable with a batch of reports, so it can be passed as the sink of a
+    webhooks.DeliveryReportReceiver.
+
+    Attributes:
+    path: str
+        The path of the SQLite database. It is created if it does not exist
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __call__(self, reports):
+        self.upsert(reports)
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def upsert(self, reports):
+        """
+        Writes a batch of reports in one transaction. A report of a message already in the store updates its status
+
+        Params:
+        reports: iterable
+            MessageReport tuples, or any sequences of the REPORT_FIELDS in order
+        """
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(UPSERT, reports)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def get(self, message_id):
+        """
+        Returns the MessageReport of a message, or None if it is not in the store
+
+        Params:
+        message_id: str
+            The id of the message given by termii
+        """
+        with self._lock:
+            row = self._db.execute(f"{SELECT} WHERE message_id = ?", (message_id,)).fetchone()
+        return MessageReport._make(row) if row is not None else None
+
+    def status(self, message_id):
+        """
+        Returns the delivery status of a message, or None if it is not in the store
+
+        Params:
+        message_id: str
+            The id of the message given by termii
+        """
+        with self._lock:
+            row = self._db.execute("SELECT status FROM messages WHERE message_id = ?", (message_id,)).fetchone()
+        return row[0] if row is not None else None
+
+    def for_receiver(self, receiver, since=None, limit=None):
+        """
+        Returns the MessageReports of the messages sent to a phone number, the latest first
+
+        Params:
+        receiver: str
+            The phone number in international format
+        since: str| Optional
+            Only return messages sent at or after this time, in the format of sent_at
+        limit: int| Optional
+            The maximum number of reports returned
+        """
+        query = f"{SELECT} WHERE receiver = ?"
+        values = [receiver]
+        if since is not None:
+            query += " AND sent_at >= ?"
+            values.append(since)
+        query += " ORDER BY sent_at DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            values.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, values).fetchall()
+        return [MessageReport._make(row) for row in rows]
+
+    def between(self, start, end, status=None):
+        """
+        Returns the MessageReports of the messages sent between two times, the oldest first
+
+        Params:
+        start: str
+            The earliest send time, in the format of sent_at
+        end: str
+            The latest send time, in the format of sent_at
+        status: str| Optional
+            Only return messages with this delivery status
+        """
+        query = f"{SELECT} WHERE sent_at >= ? AND sent_at <= ?"
+        values = [start, end]
+        if status is not None:
+            query += " AND status = ?"
+            values.append(status)
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY sent_at", values).fetchall()
+        return [MessageReport._make(row) for row in rows]
+
+    def get_state(self, name, default=None):
+        """
+        Returns a value saved with set_state, such as the cursor of a history sync
+
+        Params:
+        name: str
+            The name of the value
+        default: str| Optional
+            Returned if no value was saved
+        """
+        with self._lock:
+            row = self._db.execute("SELECT value FROM sync_state WHERE name = ?", (name,)).fetchone()
+        return row[0] if row is not None else default
+
+    def set_state(self, name, value):
+        """
+        Saves a value in the store, such as the cursor of a history sync
+
+        Params:
+        name: str
+            The name of the value
+        value: str
+            The value
+        """
+        with self._lock:
+            self._db.execute("INSERT INTO sync_state (name, value) VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET value = excluded.value", (name, value))
+
+    def close(self):
+        """
+        Closes the database
+        """
+        with self._lock:
+            self._db.close()
+
+class HistoryCursor:
+    """
+    The position of an incremental sync of the message history into a MessageStore. The
+    history lists the latest messages first, so a sync reads pages until it reaches the
+    messages it already has: the cursor holds the latest send time synced and the ids of the
+    messages sent at that time, since several messages can share a send time. The cursor is
+    only saved once a sync has read every new message, so an interrupted sync is made again.
+
+    Attributes:
+    store: MessageStore
+        The store the cursor is saved in
+    sent_at: str
+        The latest send time synced. None before the first sync
+    message_ids: set
+        The ids of the synced messages sent at sent_at
+    """
+
+    def __init__(self, store, name=HISTORY_CURSOR):
+        self.store = store
+        self.name = name
+        saved = store.get_state(name)
+        saved = json.loads(saved) if saved is not None else {}
+        self.sent_at = saved.get("sent_at")
+        self.message_ids = set(saved.get("message_ids", ()))
+        self._latest = self.sent_at
+        self._latest_ids = set(self.message_ids)
+
+    def take(self, page):
+        """
+        Returns the (reports, done) of one page of the history: the MessageReports of the messages
+        newer than the cursor, and whether the page reached the messages synced before
+
+        Params:
+        page: list
+            The decoded records of one page of the history
+        """
+        reports = []
+        done = False
+        for report in map(parse_report, page):
+            if report is None:
+                continue
+            sent_at = report.sent_at
+            if sent_at is not None and self.sent_at is not None:
+                if sent_at < self.sent_at:
+                    done = True
+                    break
+                if sent_at == self.sent_at and report.message_id in self.message_ids:
+                    continue
+            reports.append(report)
+
+            if sent_at is None:
+                continue
+            if self._latest is None or sent_at > self._latest:
+                self._latest = sent_at
+                self._latest_ids = {report.message_id}
+            elif sent_at == self._latest:
+                self._latest_ids.add(report.message_id)
+        return reports, done
+
+    def save(self):
+        """
+        Saves the position reached, so the next sync starts from it
+        """
+        self.sent_at = self._latest
+        self.message_ids = set(self._latest_ids)
+        self.store.set_state(self.name, json.dumps({"sent_at": self.sent_at, "message_ids": sorted(self.message_ids)}))
@@ -0,0 +1,113 @@
+from operator import itemgetter
+from string import Formatter
+from .utilities import MissingField, InvalidPhoneNumber, WrongType
+
+DEFAULT_NUMBER_FIELD = "phone_number"
+
+class MessageTemplate:
+    """
+    A message with {field} placeholders, compiled once and rendered for any number of
+    records. The template is parsed a single time into a printf-style format and an
+    itemgetter over its fields, so rendering a record is one C-level lookup and one
+    formatting call. Literal braces are written {{ and }}.
+
+    Attributes:
+    template: str
+        The message with its placeholders (Example: 'Hi {first_name}, your order {order_id} has shipped' )
+    fields: tuple
+        The names of the fields used by the template, in order of first appearance
+    """
+
+    def __init__(self, template):
+        self.template = template
+        parts = []
+        fields = []
+        for literal, field, format_spec, conversion in Formatter().parse(template):
+            parts.append(literal.replace("%", "%%"))
+            if field is None:
+                continue
+            if not field or format_spec or conversion:
+                raise ValueError(f"Template placeholders must be plain field names like {{first_name}}, got {{{field}{'!' + conversion if conversion else ''}{':' + format_spec if format_spec else ''}}}")
+            parts.append("%s")
+            fields.append(field)
+
+        self.fields = tuple(dict.fromkeys(fields))
+        self._format = "".join(parts)
+        self._getter = itemgetter(*fields) if fields else None
+        self._single = len(fields) == 1
+
+    def render(self, record):
+        """
+        Returns the message rendered with the values of a record, raising MissingField if the record lacks one of the fields
+        and WrongType if it is not a mapping
+
+        Params:
+        record: dict
+            Any mapping holding the fields of the template, such as a row of csv.DictReader
+        """
+        if self._getter is None:
+            return self._format % ()
+        try:
+            values = self._getter(record)
+        except KeyError as error:
+            raise MissingField(error.args[0]) from None
+        except TypeError:
+            raise WrongType("mapping", "record") from None
+        return self._format % ((values,) if self._single else values)
+
+    def __repr__(self):
+        return f"MessageTemplate({self.template!r})"
+
+def group_by_text(template, records, chunk_size, number_field=DEFAULT_NUMBER_FIELD, normalise=None, skipped=None):
+    """
+    A generator that renders a template for a stream of records and groups the recipients
+    whose messages rendered to the same text. It yields (message, numbers) pairs ready for one
+    bulk request each: a group is yielded as soon as it holds chunk_size numbers, so large
+    groups go out while the stream is still being read, and the remaining groups are yielded
+    once the stream is exhausted.
+
+    Params:
+    template: MessageTemplate| str
+        The template of the messages
+    records: iterable
+        Any iterable of mappings holding the phone number and the fields of the template
+    chunk_size: int
+        The maximum number of numbers in a group
+    number_field: str
+        The key of the phone number in every record
+    normalise: callable| Optional
+        Returns the phone number of a record in international format, or None if it is invalid (Example: NumberNormaliser().normalise )
+    skipped: list| Optional
+        Collects an (index, error) pair for every record that is not a mapping, could not be rendered or has an invalid number
+    """
+    if not isinstance(template, MessageTemplate):
+        template = MessageTemplate(template)
+
+    groups = {}
+    for index, record in enumerate(records):
+        try:
+            message = template.render(record)
+            try:
+                number = record[number_field]
+            except KeyError:
+                raise MissingField(number_field) from None
+            except TypeError:
+                raise WrongType("mapping", "record") from None
+            if normalise is not None:
+                checked = normalise(number)
+                if checked is None:
+                    raise InvalidPhoneNumber([number])
+                number = checked
+        except (MissingField, WrongType, InvalidPhoneNumber) as error:
+            if skipped is not None:
+                skipped.append((index, error))
+            continue
+
+        numbers = groups.get(message)
+        if numbers is None:
+            numbers = groups[message] = []
+        numbers.append(number)
+        if len(numbers) >= chunk_size:
+            yield message, groups.pop(message)
+
+    yield from groups.items()
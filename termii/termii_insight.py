@@ -1,25 +1,30 @@
-import requests
-import json
+from .cache import MISSING
+from .pagination import iter_pages, DEFAULT_PAGE_SIZE
+from .session import get_session
+from .store import HistoryCursor
 
 BALANCE_URL = "https://api.ng.termii.com/api/get-balance"
 SEARCH_URL = "https://api.ng.termii.com/api/check/dnd"
 STATUS_URL = "https://api.ng.termii.com/api/insight/number/query"
 HISTORY_URL = "https://api.ng.termii.com/api/sms/inbox"
 
-def check_balance(api_key):
+def check_balance(api_key, session=None):
     """
     A function to check a client's termii balance
 
     Params: 
     api_key: str
         The termii api_key associated with the client
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
 
-    response = requests.get(url=f"{BALANCE_URL}?api_key={api_key}")
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.get(url=f"{BALANCE_URL}?api_key={api_key}")
+    response = session.codec.decode(response)
     return response
 
-def check_number(api_key, phone_number):
+def check_number(api_key, phone_number, session=None, cache=None, bypass_cache=False):
     """
     A function to verify phone numbers and automatically detect their status
 
@@ -28,13 +33,40 @@ def check_number(api_key, phone_number):
         The termii api_key associated with the client
     phone_number: str
         Represents the phone number to be verified. Phone number must be in the international format without the '+'
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
+    cache: TTLCache| Optional
+        A cache answering repeated lookups of the same number without a request
+    bypass_cache: bool| Optional
+        Always send the request if True. The fresh response still replaces the cached one
     """
 
-    response = requests.get(url=f"{SEARCH_URL}?api_key={api_key}&phone_number={phone_number}")
-    response = json.loads(response.content)
+    key = ("dnd", phone_number, None)
+    if cache is not None and not bypass_cache:
+        cached = cache.get(key)
+        if cached is not MISSING:
+            return cached
+
+    session = get_session(session)
+    response = session.get(url=f"{SEARCH_URL}?api_key={api_key}&phone_number={phone_number}")
+    status_code = response.status_code
+    response = session.codec.decode(response)
+
+    if cache is not None and status_code == 200:
+        cache.set(key, response)
     return response
 
-def get_number_status(api_key, phone_number, country_code):
+def number_status_payload(api_key, phone_number, country_code):
+    """
+    Returns the JSON body of a number status lookup. See get_number_status
+    """
+    return {
+        "api_key": api_key,
+        "phone_number": phone_number,
+        "country_code": country_code
+    }
+
+def get_number_status(api_key, phone_number, country_code, session=None, cache=None, bypass_cache=False):
     """
     A function to detect if a number is fake or has ported to a new network.
 
@@ -45,30 +77,111 @@ def get_number_status(api_key, phone_number, country_code):
         Represents the phone number to be verified. Phone number must be in the international format without the '+'
     country_code: str
         Represents short alphabetic codes developed to represent countries (Example: NG ).
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
+    cache: TTLCache| Optional
+        A cache answering repeated lookups of the same number and country code without a request
+    bypass_cache: bool| Optional
+        Always send the request if True. The fresh response still replaces the cached one
     """
 
-    payload = {
-        "api_key": api_key,
-        "phone_number": phone_number,
-        "country_code": country_code
-    }
+    key = ("status", phone_number, country_code)
+    if cache is not None and not bypass_cache:
+        cached = cache.get(key)
+        if cached is not MISSING:
+            return cached
+
+    payload = number_status_payload(api_key, phone_number, country_code)
 
     headers = {
     'Content-Type': 'application/json',
     }
 
-    response = requests.get(STATUS_URL, json=payload, headers=headers)
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.get(STATUS_URL, json=payload, headers=headers)
+    status_code = response.status_code
+    response = session.codec.decode(response)
+
+    if cache is not None and status_code == 200:
+        cache.set(key, response)
     return response
 
-def get_full_history(api_key):
+def get_full_history(api_key, session=None):
     """
     A function that returns reports for messages sent across the sms, voice & whatsapp channels.
 
     Params: 
     api_key: str
         The termii api_key associated with the client
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
+    """
+
+    session = get_session(session)
+    response = session.get(url=f"{HISTORY_URL}?api_key={api_key}")
+    return session.codec.decode(response)
+
+def iter_full_history(api_key, page_size=DEFAULT_PAGE_SIZE, prefetch=1, session=None):
+    """
+    A generator that yields the reports of messages sent across the sms, voice & whatsapp channels
+    one at a time. The history is fetched page by page, the next page being fetched while the
+    current one is processed, so only a couple of pages are held in memory however long the
+    history is. Stop iterating to stop fetching.
+
+    Params: 
+    api_key: str
+        The termii api_key associated with the client
+    page_size: int
+        The number of reports fetched per request
+    prefetch: int
+        The number of pages fetched ahead. 0 disables prefetching
+    session: TermiiSession| Optional
+        The pooled session the requests are sent with. The shared default session is used if not passed
+    """
+
+    session = get_session(session)
+    for page in iter_pages(session, HISTORY_URL, {"api_key": api_key}, page_size, prefetch):
+        yield from page
+
+def sync_history(api_key, store, page_size=DEFAULT_PAGE_SIZE, prefetch=1, full=False, session=None):
+    """
+    A function that copies the message reports sent since the last sync into a local store and returns
+    how many were written. The walk stops at the first message already synced, and the reports of every
+    page are upserted in one transaction, so only the new messages are written. The inbox endpoint answers
+    with the whole history whatever page is asked for, so every sync still downloads the full history once
+    and filters it locally; the saving is in the writes and in the lookups. The store then answers status
+    lookups by message id, phone number or date without a request.
+
+    Params: 
+    api_key: str
+        The termii api_key associated with the client
+    store: MessageStore
+        The store the reports are written to. It also holds the cursor of the sync
+    page_size: int
+        The number of reports fetched per request
+    prefetch: int
+        The number of pages fetched ahead. 0 disables prefetching
+    full: bool| Optional
+        Walk the whole history again, refreshing the status of messages synced before
+    session: TermiiSession| Optional
+        The pooled session the requests are sent with. The shared default session is used if not passed
     """
 
-    response = requests.get(url=f"{HISTORY_URL}?api_key={api_key}")
-    return json.loads(response.content)
\ No newline at end of file
+    session = get_session(session)
+    cursor = HistoryCursor(store)
+    if full:
+        cursor.sent_at = None
+    written = 0
+    pages = iter_pages(session, HISTORY_URL, {"api_key": api_key}, page_size, prefetch)
+    try:
+        for page in pages:
+            reports, done = cursor.take(page)
+            if reports:
+                store.upsert(reports)
+                written += len(reports)
+            if done:
+                break
+    finally:
+        pages.close()
+    cursor.save()
+    return written
@@ -1,6 +1,8 @@
-import requests
-import json
-from utilities import WrongMediaOptions, WrongType
+from .pagination import iter_pages, DEFAULT_PAGE_SIZE
+from .session import get_session
+from . import upload
+from . import validation
+from .utilities import APIError
 
 FETCH_SENDER_ID_URL = "https://api.ng.termii.com/api/sender-id"
 REQUEST_SENDER_ID_URL = "https://api.ng.termii.com/api/sender-id/request"
@@ -13,19 +15,33 @@ DELETE_CONTACT_URL = "https://api.ng.termii.com/api/phonebook/contact"
 SEND_CAMPAIGN_URL = "https://api.ng.termii.com/api/sms/campaigns/send"
 CAMPAIGNS_URL = "https://api.ng.termii.com/api/sms/campaigns"
 
-def get_sender_ids(api_key):
+def get_sender_ids(api_key, session=None):
     """
     Fetches sender ids associated with an API key from the termii API.
 
     Params:
     api_key: str
         The API key for a certain termii account
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
-    response = requests.get(f"{FETCH_SENDER_ID_URL}?api_key={api_key}")
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.get(f"{FETCH_SENDER_ID_URL}?api_key={api_key}")
+    response = session.codec.decode(response)
     return response
 
-def request_new_sender_id(api_key, sender_id, usecase, company):
+def sender_id_request_payload(api_key, sender_id, usecase, company):
+    """
+    Returns the JSON body of a sender ID request. See request_new_sender_id
+    """
+    return {
+         "api_key":api_key,
+         "sender_id": sender_id,
+         "usecase": usecase,
+         "company": company
+    }
+
+def request_new_sender_id(api_key, sender_id, usecase, company, session=None):
     """
     Simple function to request new termii sender ID.
 
@@ -38,23 +54,44 @@ def request_new_sender_id(api_key, sender_id, usecase, company):
         The usecase of the new sender_id
     company: str
         The name of the company associated with this sender_id
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
-    payload = {
-         "api_key":api_key,
-         "sender_id": sender_id,
-         "usecase": usecase,
-         "company": company
-    }
+    payload = sender_id_request_payload(api_key, sender_id, usecase, company)
 
     headers = {
     'Content-Type': 'application/json',
     }
 
-    response = requests.post(REQUEST_SENDER_ID_URL, json=payload, headers=headers)
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.post(REQUEST_SENDER_ID_URL, json=payload, headers=headers)
+    response = session.codec.decode(response)
     return response
 
-def post_message(api_key, number_to, sender_id, message, message_type, channel, media_dict):
+def message_payload(api_key, number_to, sender_id, message, message_type, channel, media_dict):
+    """
+    Validates the arguments of a message and returns the JSON body of its request. See post_message
+    """
+    validation.SEND_MESSAGE.validate({"sender_id": sender_id, "message": message, "message_type": message_type,
+        "channel": channel, "media_dict": media_dict})
+
+    payload = {
+            "to": number_to,
+            "from": sender_id,
+            "sms": message,
+            "type": message_type,
+            "channel": channel,
+            "api_key": api_key,
+    }
+
+    if len(media_dict.keys()) > 0:
+        payload["media"] = {
+                "url": media_dict["url"],
+                "caption": media_dict["caption"]
+            }
+    return payload
+
+def post_message(api_key, number_to, sender_id, message, message_type, channel, media_dict, session=None):
     """
     Function to send a message using the termii API.
 
@@ -73,46 +110,38 @@ def post_message(api_key, number_to, sender_id, message, message_type, channel,
         The channel this message should be sent with. Can be 'dnd', 'whatsapp' or 'generic'
     media_dict: dict
         A dictionary containing the options for media if applicable. Should contain 'url' and 'caption' keys. Pass an empty dictionary if not applicable
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
 
-    if type(media_dict) != dict:
-        raise WrongType("dict", "media_dict")
+    payload = message_payload(api_key, number_to, sender_id, message, message_type, channel, media_dict)
 
-    if len(media_dict.keys()) > 0:
-        if 'url' in media_dict.keys() and 'caption' in media_dict.keys():
-            payload = {
-                "to": number_to,
-                "from": sender_id,
-                "sms": message,
-                "type": message_type,
-                "channel": channel,
-                "api_key": api_key,
-                "media": {
-                        "url": media_dict["url"],
-                        "caption": media_dict["caption"]
-                    }   
-            }
-        else:
-            raise WrongMediaOptions()
-    else:
-        payload = {
-                "to": number_to,
-                "from": sender_id,
-                "sms": message,
-                "type": message_type,
-                "channel": channel,
-                "api_key": api_key,
-        }
-    
     headers = {
     'Content-Type': 'application/json',
     }
 
-    response = requests.post(SEND_MESSAGE_URL, json=payload, headers=headers)
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.post(SEND_MESSAGE_URL, json=payload, headers=headers)
+    response = session.codec.decode(response)
     return response
 
-def post_message_bulk(api_key, numbers_to, sender_id, message, message_type, channel):
+def bulk_message_payload(api_key, numbers_to, sender_id, message, message_type, channel):
+    """
+    Validates the arguments of a bulk message and returns the JSON body of its request. See post_message_bulk
+    """
+    validation.SEND_BULK_SMS.validate({"numbers_to": numbers_to, "sender_id": sender_id, "message": message,
+        "message_type": message_type, "channel": channel})
+
+    return {
+          "to": numbers_to,
+           "from": sender_id,
+           "sms": message,
+           "type": message_type,
+           "channel": channel,
+           "api_key": api_key,
+    }
+
+def post_message_bulk(api_key, numbers_to, sender_id, message, message_type, channel, session=None):
     """
     Function to send a bulk message using the termii API.
 
@@ -129,29 +158,32 @@ def post_message_bulk(api_key, numbers_to, sender_id, message, message_type, cha
         The type of message to be sent. Should be 'plain'
     channel: str
         The channel this message should be sent with. Can be 'dnd', 'whatsapp' or 'generic'
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
 
-    if type(numbers_to) != list:
-        raise WrongType("list", "numbers_to")
-
-    payload = {
-          "to": numbers_to,
-           "from": sender_id,
-           "sms": message,
-           "type": message_type,
-           "channel": channel,
-           "api_key": api_key,
-    }
+    payload = bulk_message_payload(api_key, numbers_to, sender_id, message, message_type, channel)
 
     headers = {
     'Content-Type': 'application/json',
     }
 
-    response = requests.post(BULK_MESSAGE_URL, json=payload, headers=headers)
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.post(BULK_MESSAGE_URL, json=payload, headers=headers)
+    response = session.codec.decode(response)
     return response
 
-def number_message_send(api_key, number_to, message):
+def number_message_payload(api_key, number_to, message):
+    """
+    Returns the JSON body of a message sent with an auto-generated number. See number_message_send
+    """
+    return {
+           "to": number_to,
+           "sms": message,
+           "api_key": api_key
+    }
+
+def number_message_send(api_key, number_to, message, session=None):
     """
     Function to send messages to customers using Termii's auto-generated messaging numbers that adapt to customers location.
 
@@ -162,22 +194,35 @@ def number_message_send(api_key, number_to, message):
         The phone number the message should be sent to in international format. '+' should be excluded
     message: str
         The message to be sent.
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
-    payload = {
-           "to": number_to,
-           "sms": message,
-           "api_key": api_key
-    }
+    payload = number_message_payload(api_key, number_to, message)
 
     headers = {
     'Content-Type': 'application/json'
     }
 
-    response = requests.post(NUMBER_MESSAGE_SEND_URL, json=payload, headers=headers)
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.post(NUMBER_MESSAGE_SEND_URL, json=payload, headers=headers)
+    response = session.codec.decode(response)
     return response
 
-def template_setter(api_key, phone_number, device_id, template_id, data):
+def device_template_payload(api_key, phone_number, device_id, template_id, data):
+    """
+    Validates the arguments of a device template and returns the JSON body of its request. See template_setter
+    """
+    validation.SEND_TEMPLATE.validate({"data": data})
+
+    return {
+        "phone_number": phone_number,
+        "device_id": device_id,
+        "template_id": template_id,
+        "api_key": api_key,
+        "data":data
+    }
+
+def template_setter(api_key, phone_number, device_id, template_id, data, session=None):
     """
     A function to set a device template for the one-time-passwords (pins) sent to their customers via whatsapp or sms.
 
@@ -192,41 +237,48 @@ def template_setter(api_key, phone_number, device_id, template_id, data):
         The ID of the template used
     data: dict
         Represents an object of key: value pair. The keys for the data object can be found on the device subscription page on your dashboard.
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
 
-    if type(data) != dict:
-        raise WrongType("dict", "data")
-    
-    payload = {
-        "phone_number": phone_number,
-        "device_id": device_id,
-        "template_id": template_id,
-        "api_key": api_key,
-        "data":data
-    }
+    payload = device_template_payload(api_key, phone_number, device_id, template_id, data)
 
     headers = {
     'Content-Type': 'application/json',
     }
 
-    response = requests.post(DEVICE_TEMPLATE_URL, headers=headers, json=payload)
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.post(DEVICE_TEMPLATE_URL, headers=headers, json=payload)
+    response = session.codec.decode(response)
     return response
 
-def get_phonebooks(api_key):
+def get_phonebooks(api_key, session=None):
     """
     A function to get all the phonebooks associated to a termii client
 
     Params:
     api_key: str
         The API key for a certain termii account
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
 
-    response = requests.get(f"{PHONEBOOKS_URL}?api_key={api_key}")
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.get(f"{PHONEBOOKS_URL}?api_key={api_key}")
+    response = session.codec.decode(response)
     return response
 
-def make_phonebook(api_key, description, phonebook_name):
+def phonebook_payload(api_key, phonebook_name, description):
+    """
+    Returns the JSON body of a phonebook creation or update. See make_phonebook
+    """
+    return {
+        "api_key": api_key,
+        "phonebook_name": phonebook_name,
+        "description": description
+    }
+
+def make_phonebook(api_key, description, phonebook_name, session=None):
     """
     Function to create a phonebook using the termii API
 
@@ -237,23 +289,22 @@ def make_phonebook(api_key, description, phonebook_name):
         A description of the contacts stored in the phonebook
     phonebook_name: str
         The name of the phonebook
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
 
-    payload = {
-        "api_key": api_key,
-        "phonebook_name": phonebook_name,
-        "description": description
-    }
+    payload = phonebook_payload(api_key, phonebook_name, description)
 
     headers = {
     'Content-Type': 'application/json',
     }
 
-    response = requests.post(PHONEBOOKS_URL, json=payload, headers=headers)
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.post(PHONEBOOKS_URL, json=payload, headers=headers)
+    response = session.codec.decode(response)
     return response
 
-def patch_phonebook(api_key, phonebook_id, phonebook_name, phonebook_description):
+def patch_phonebook(api_key, phonebook_id, phonebook_name, phonebook_description, session=None):
     """
     Function to create a phonebook using the termii API
 
@@ -266,22 +317,21 @@ def patch_phonebook(api_key, phonebook_id, phonebook_name, phonebook_description
         The name of the phonebook
     phonebook_description: str
         The description of the phonebbok
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
-    payload = {
-        "api_key": api_key,
-        "phonebook_name": phonebook_name,
-        "description": phonebook_description
-    }
+    payload = phonebook_payload(api_key, phonebook_name, phonebook_description)
 
     headers = {
     'Content-Type': 'application/json',
     }
 
-    response = requests.patch(url=f"{PHONEBOOKS_URL}/{phonebook_id}", json=payload, headers=headers)
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.patch(url=f"{PHONEBOOKS_URL}/{phonebook_id}", json=payload, headers=headers)
+    response = session.codec.decode(response)
     return response
 
-def remove_phonebook(api_key, phonebook_id):
+def remove_phonebook(api_key, phonebook_id, session=None):
     """
     Function to delete a phonebook using the termii API
 
@@ -290,13 +340,16 @@ def remove_phonebook(api_key, phonebook_id):
         The API key for a certain termii account
     phonebook_id: str
         The id of the phonebook to be updated
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
 
-    response = requests.delete(url=f"{PHONEBOOKS_URL}/{phonebook_id}?api_key={api_key}")
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.delete(url=f"{PHONEBOOKS_URL}/{phonebook_id}?api_key={api_key}")
+    response = session.codec.decode(response)
     return response
 
-def get_contacts_from_phonebook(api_key, phonebook_id):
+def get_contacts_from_phonebook(api_key, phonebook_id, session=None):
     """
     A function to get all the contacts associated to a termii phonebook
 
@@ -305,85 +358,153 @@ def get_contacts_from_phonebook(api_key, phonebook_id):
         The API key for a certain termii account
     phonebook_id: str
         The id of the phonebook
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
-    response = requests.get(url=f"{PHONEBOOKS_URL}/{phonebook_id}/contacts?api_key={api_key}")
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.get(url=f"{PHONEBOOKS_URL}/{phonebook_id}/contacts?api_key={api_key}")
+    response = session.codec.decode(response)
     return response
 
-def add_contact(api_key, phone_number, phonebook_id, country_code, options):
+def iter_contacts_from_phonebook(api_key, phonebook_id, page_size=DEFAULT_PAGE_SIZE, prefetch=0, session=None):
     """
-    A function to add a single contact to a phonebook using the termii API
+    A generator that yields the contacts of a termii phonebook one at a time. The contacts
+    are fetched page by page, so only the current page (and the prefetched ones) are held
+    in memory however large the phonebook is. Stop iterating to stop fetching.
 
     Params:
     api_key: str
         The API key for a certain termii account
-    phone_number: str
-        Phone number of the contact without international format.
     phonebook_id: str
         The id of the phonebook
-    country_code: str
-        The country code of the number to be added
-    options: dict
-        A dictionary containing certain options such as 'email_address', 'first_name', 'last_name' and 'company' which are all strings. An empty dictionary should be passed if there are no options.
+    page_size: int
+        The number of contacts fetched per request
+    prefetch: int
+        The number of pages fetched concurrently ahead of the caller. 0 disables prefetching
+    session: TermiiSession| Optional
+        The pooled session the requests are sent with. The shared default session is used if not passed
     """
 
-    if type(options) != dict:
-        raise WrongType("dict", "options")
-    
+    session = get_session(session)
+    for page in iter_pages(session, f"{PHONEBOOKS_URL}/{phonebook_id}/contacts", {"api_key": api_key}, page_size, prefetch):
+        yield from page
+
+def contact_payload(api_key, phone_number, country_code, options):
+    """
+    Validates the options of a contact and returns the JSON body of its request. See add_contact
+    """
+    validation.ADD_CONTACT.validate({"options": options})
+
     payload = {
         "api_key": api_key,
         "phone_number": phone_number,
         "country_code": country_code
     }
 
-    option_list = []
+    for option in ("country_code", "email_address", "first_name", "last_name", "company"):
+        if option in options:
+            payload[option] = options[option]
+    return payload
+
+def add_contact(api_key, phone_number, phonebook_id, country_code, options, session=None):
+    """
+    A function to add a single contact to a phonebook using the termii API
 
-    for option in options.keys():
-        if option == "country_code" or option == "email_address" or option == "first_name" or option == "last_name" or option == "company":
-           option_list.append(option)
+    Params:
+    api_key: str
+        The API key for a certain termii account
+    phone_number: str
+        Phone number of the contact without international format.
+    phonebook_id: str
+        The id of the phonebook
+    country_code: str
+        The country code of the number to be added
+    options: dict
+        A dictionary containing certain options such as 'email_address', 'first_name', 'last_name' and 'company' which are all strings. An empty dictionary should be passed if there are no options.
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
+    """
+
+    payload = contact_payload(api_key, phone_number, country_code, options)
 
-    for option in option_list:
-        payload[option] = options[option]
-        
     headers = {
     'Content-Type': 'application/json',
     }
 
-    response = requests.post(url=f"{PHONEBOOKS_URL}/{phonebook_id}/contacts", json=payload, headers=headers)
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.post(url=f"{PHONEBOOKS_URL}/{phonebook_id}/contacts", json=payload, headers=headers)
+    response = session.codec.decode(response)
     return response
 
-def add_many_contacts(api_key, contact_file, country_code, extension, phonebook_id):
+def add_many_contacts(api_key, contact_file, country_code, extension, phonebook_id, session=None):
     """
-    A function to add contacts to a phonebook using the termii API
+    A function to add contacts to a phonebook using the termii API. The file is streamed
+    while it is uploaded, it is never read into memory.
 
     Params:
     api_key: str
         The API key for a certain termii account
-    contact_file: str
+    contact_file: str| file| iterable
         File containing the list of contacts you want to add to your phonebook. Supported files include : 'txt', 'xlsx', and 'csv'.
+        Can be a path, a file object, or an iterable of bytes or str such as a generator of lines.
     country_code: str
         Represents short numeric geographical codes developed to represent countries (Example: 234 ).
     extension: str
         The extension of the contact file: (Example: 'text/csv')
     phonebook_id: str
         The id of the phonebook
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
 
-    payload={'country_code': country_code}
-
-    # files= [(country_code, (contact_file, 'rb'), extension)]
-    files= [(contact_file,(contact_file,'rb','text/csv'))]
+    stream = upload.contact_stream(contact_file, country_code, extension)
 
     headers = {
-    'Content-Type': 'application/json',
+    'Content-Type': stream.content_type,
     }
 
-    response = requests.post(url=f"{PHONEBOOKS_URL}/{phonebook_id}/contacts?api_key={api_key}", json=payload, files=files, headers=headers)
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.post(url=f"{PHONEBOOKS_URL}/{phonebook_id}/contacts?api_key={api_key}", data=stream, headers=headers)
+    response = session.codec.decode(response)
+    return response
+
+def upload_many_contacts(api_key, contact_file, country_code, extension, phonebook_id,
+        split_size=upload.DEFAULT_SPLIT_SIZE, max_workers=upload.DEFAULT_UPLOAD_WORKERS, header=False, session=None):
+    """
+    A function to add the contacts of a file of any size to a phonebook using the termii API.
+    The file is streamed, and csv or txt files larger than split_size are split on line
+    boundaries into several uploads sent concurrently. A file given by path is streamed
+    part by part, while the parts of file objects and iterables are read into memory
+    before they are sent, at most max_workers + 1 parts at a time. Returns a BulkResult
+    reporting every upload, where the size of each chunk is the number of bytes it carried.
+
+    Params:
+    api_key: str
+        The API key for a certain termii account
+    contact_file: str| file| iterable
+        A path, a file object, or an iterable of bytes or str such as a generator of lines
+    country_code: str
+        Represents short numeric geographical codes developed to represent countries (Example: 234 ).
+    extension: str
+        The extension of the contact file: (Example: 'text/csv')
+    phonebook_id: str
+        The id of the phonebook
+    split_size: int
+        The maximum number of bytes of the file carried by a single upload, a repeated header included. A line longer than split_size is sent in an upload of its own. None disables splitting
+    max_workers: int
+        The maximum number of uploads sent at the same time
+    header: bool
+        Repeat the first line of the file at the top of every upload, for csv files with a header row
+    session: TermiiSession| Optional
+        The pooled session the requests are sent with. The shared default session is used if not passed
+    """
+
+    session = get_session(session)
+    response = upload.upload_contacts(session, f"{PHONEBOOKS_URL}/{phonebook_id}/contacts?api_key={api_key}",
+        contact_file, country_code, extension, split_size=split_size, max_workers=max_workers, header=header)
     return response
     
-def delete_one_contact(api_key, contact_id):
+def delete_one_contact(api_key, contact_id, session=None):
     """
     A function to delete contacts from a phonebook using the termii API
 
@@ -392,13 +513,41 @@ def delete_one_contact(api_key, contact_id):
         The API key for a certain termii account
     contact_id: str
         The id of the contact to be deleted
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
 
-    response = requests.delete(url=f"{DELETE_CONTACT_URL}/{contact_id}?api_key={api_key}")
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.delete(url=f"{DELETE_CONTACT_URL}/{contact_id}?api_key={api_key}")
+    response = session.codec.decode(response)
     return response
 
-def make_campaign(api_key, country_code, sender_id, message, channel, message_type, phonebook_id, campaign_type, **schedule):
+def campaign_payload(api_key, country_code, sender_id, message, channel, message_type, phonebook_id, campaign_type, **schedule):
+    """
+    Validates the arguments of a campaign and returns the JSON body of its request. See make_campaign
+    """
+    validation.SEND_CAMPAIGN.validate({"sender_id": sender_id, "message": message, "channel": channel,
+        "message_type": message_type, "campaign_type": campaign_type})
+
+    payload = {
+        "api_key": api_key,
+        "country_code": country_code,
+        "sender_id" : sender_id,
+        "message": message, 
+        "channel": channel,
+        "message_type": message_type, 
+        "phonebook_id": phonebook_id,
+        "delimiter":",",
+        "remove_duplicate":"yes",
+        "campaign_type": campaign_type,
+    }
+
+    if "schedule_sms_status" in schedule and "schedule_time" in schedule:
+        payload["schedule_sms_status"] = schedule["schedule_sms_status"]
+        payload["schedule_time"] = schedule["schedule_time"]
+    return payload
+
+def make_campaign(api_key, country_code, sender_id, message, channel, message_type, phonebook_id, campaign_type, session=None, **schedule):
     """
     A function to send campaigns using the termii API
 
@@ -423,47 +572,38 @@ def make_campaign(api_key, country_code, sender_id, message, channel, message_ty
         To send a scheduled campaign, pass 'scheduled' as the value
     schedule_time: str| Optional
         The time to send scheduled campaign. This is required if scheduled_sm_status is 'scheduled'. In the format '30-06-2021 6:00'
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
 
-    payload = {
-        "api_key": api_key,
-        "country_code": country_code,
-        "sender_id" : sender_id,
-        "message": message, 
-        "channel": channel,
-        "message_type": message_type, 
-        "phonebook_id": phonebook_id,
-        "delimiter":",",
-        "remove_duplicate":"yes",
-        "campaign_type": campaign_type,
-    }
-
-    for item in schedule:
-        if "schedule_sms_status" in item and "schedule_time" in item:
-            payload[item[0]] = item[1]
+    payload = campaign_payload(api_key, country_code, sender_id, message, channel, message_type, phonebook_id, campaign_type, **schedule)
 
     headers = {
     'Content-Type': 'application/json',
     }
 
-    response = requests.post(SEND_CAMPAIGN_URL, headers=headers, json=payload)
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.post(SEND_CAMPAIGN_URL, headers=headers, json=payload)
+    response = session.codec.decode(response)
     return response
 
-def get_campaigns(api_key):
+def get_campaigns(api_key, session=None):
     """
     Function to get the all campaigns associated with a client
 
     Params:
     api_key: str
         The API key for a certain termii account
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
 
-    response = requests.get(url=f"{CAMPAIGNS_URL}?api_key={api_key}")
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.get(url=f"{CAMPAIGNS_URL}?api_key={api_key}")
+    response = session.codec.decode(response)
     return response
 
-def get_campaign_history(api_key, campaign_id):
+def get_campaign_history(api_key, campaign_id, session=None):
     """
     Function to get the history of a certain campaign
 
@@ -472,12 +612,27 @@ def get_campaign_history(api_key, campaign_id):
         The API key for a certain termii account
     campaign_id: str
         The ID of the campaign history to be fetched
+    session: TermiiSession| Optional
+        The pooled session the request is sent with. The shared default session is used if not passed
     """
 
-    response = requests.get(url=f"{CAMPAIGNS_URL}/{campaign_id}?api_key={api_key}")
+    session = get_session(session)
+    response = session.get(url=f"{CAMPAIGNS_URL}/{campaign_id}?api_key={api_key}")
+    return campaign_history_body(session.codec, response)
 
-    if response.status_code == 504:
-        return "TIME OUT!"
-   
-    response = json.loads(response.content)
-    return response
\ No newline at end of file
+def campaign_history_body(codec, response):
+    """
+    Returns the decoded response of get_campaign_history. The history of a large campaign can
+    outlast the gateway, so a server error that outlasted the retries raises APIError, like a
+    body that is not JSON
+
+    Params:
+    codec: JSONCodec
+        The codec of the session
+    response: requests.Response| httpx.Response
+        The response of the campaign history request
+    """
+    body = codec.decode(response)
+    if response.status_code >= 500:
+        raise APIError(response.status_code, body)
+    return body
\ No newline at end of file
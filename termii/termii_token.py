@@ -1,5 +1,5 @@
-import requests
-import json
+from .session import get_session
+from . import validation
 
 SEND_TOKEN_URL = 'https://api.ng.termii.com/api/sms/otp/send'
 SEND_TOKEN_VOICE_URL = "https://api.ng.termii.com/api/sms/otp/send/voice"
@@ -7,9 +7,32 @@ SEND_TOKEN_VOICECALL_URL = "https://api.ng.termii.com/api/sms/otp/send/voice"
 SEND_TOKEN_VERIFYTOKEN_URL = "https://api.ng.termii.com/api/sms/otp/verify"
 SEND_TOKEN_IN_APP = "https://api.ng.termii.com/api/sms/otp/generate"
 
+def token_payload(api_key, message_type, phone_number, sender_id, channel, pin_attempts, pin_time_to_live,
+        pin_length, pin_placeholder, message_text):
+    """
+    Validates the arguments of a token and returns the JSON body of its request. See send_new_token
+    """
+    validation.SEND_TOKEN.validate({"message_type": message_type, "sender_id": sender_id, "channel": channel,
+        "pin_attempts": pin_attempts, "pin_time_to_live": pin_time_to_live, "pin_length": pin_length,
+        "pin_placeholder": pin_placeholder, "message_text": message_text})
+
+    return {
+        'api_key' : api_key,
+        'message_type' : message_type,
+        'to' : phone_number,
+        'from' : sender_id,
+        'channel' : channel,
+        'pin_attempts' : pin_attempts,
+        'pin_time_to_live' : pin_time_to_live,
+        'pin_length' : pin_length,
+        'pin_placeholder' : pin_placeholder,
+        'message_text' : message_text,
+        'pin_type' : message_type,
+    }
+
 def send_new_token(api_key, message_type, phone_number, 
         sender_id, channel, pin_attempts, pin_time_to_live,
-        pin_length, pin_placeholder, message_text):
+        pin_length, pin_placeholder, message_text, session=None):
     """
     This function allows businesses generate a one-time-passwords(OTP).
     It happens across every channel on Termii.
@@ -41,31 +64,39 @@ def send_new_token(api_key, message_type, phone_number,
         generic pin code.
     message_text : string
         Message text that would be sent to destination phone number.
+    session : TermiiSession, optional
+        The pooled session the request is sent with. The shared default
+        session is used if not passed.
     """
-    payload = {
-        'api_key' : api_key,
-        'message_type' : 'NUMERIC',
-        'to' : phone_number,
-        'from' : sender_id,
-        'channel' : 'generic',
-        'pin_attempts' : 10,
-        'pin_time_to_live' : 5,
-        'pin_length' : 6,
-        'pin_placeholder' : '< 1234 >',
-        'message_text' : 'Your pin is < 1234 >',
-        'pin_type' : 'NUMERIC',
-    }
+    payload = token_payload(api_key, message_type, phone_number, sender_id, channel, pin_attempts, pin_time_to_live,
+        pin_length, pin_placeholder, message_text)
     
     headers = {
         'Content-Type' : 'application/json',
     }
 
-    response = requests.post(SEND_TOKEN_URL, headers=headers, json=payload)
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.post(SEND_TOKEN_URL, headers=headers, json=payload)
+    response = session.codec.decode(response)
     return response
 
 
-def send_voice_token(api_key, phone_number, pin_attempts, pin_time_to_live, pin_length):
+def voice_token_payload(api_key, phone_number, pin_attempts, pin_time_to_live, pin_length):
+    """
+    Validates the arguments of a voice token and returns the JSON body of its request. See send_voice_token
+    """
+    validation.VOICE_TOKEN.validate({"pin_attempts": pin_attempts, "pin_time_to_live": pin_time_to_live,
+        "pin_length": pin_length})
+
+    return {
+        'api_key' : api_key,
+        'phone_number' : phone_number,
+        'pin_attempts' : pin_attempts,
+        'pin_time_to_live' : pin_time_to_live,
+        'pin_length' : pin_length,
+    }
+
+def send_voice_token(api_key, phone_number, pin_attempts, pin_time_to_live, pin_length, session=None):
     """
     This function enables you to generate and trigger one-time-passwords
     via a voice channel to a phone number. OTPs are generated and sent to
@@ -85,25 +116,39 @@ def send_voice_token(api_key, phone_number, pin_attempts, pin_time_to_live, pin_
         Time is in minutes and has a minimum of 0 and maximum of 60.
     pin_length : integer
         Length of PIN code. Has a minimum of 4 and maximum of 8.
+    session : TermiiSession, optional
+        The pooled session the request is sent with. The shared default
+        session is used if not passed.
     """
-    payload = {
-        'api_key' : api_key,
-        'phone_number' : phone_number,
-        'pin_attempts' : 10,
-        'pin_time_to_live' : 5,
-        'pin_length' : 6,  
-    }
+    payload = voice_token_payload(api_key, phone_number, pin_attempts, pin_time_to_live, pin_length)
     
     headers = {
         'Content-Type' : 'application/json',
     }
     
-    response = requests.post(SEND_TOKEN_VOICE_URL, headers=headers, json=payload)
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.post(SEND_TOKEN_VOICE_URL, headers=headers, json=payload)
+    response = session.codec.decode(response)
     return response
 
 
-def make_voice_call(api_key, phone_number, code, pin_attempts, pin_time_to_live, pin_length):
+def voice_call_payload(api_key, phone_number, code, pin_attempts, pin_time_to_live, pin_length):
+    """
+    Validates the arguments of a voice call and returns the JSON body of its request. See make_voice_call
+    """
+    validation.VOICE_CALL.validate({"code": code, "pin_attempts": pin_attempts, "pin_time_to_live": pin_time_to_live,
+        "pin_length": pin_length})
+
+    return {
+        'api_key' : api_key,
+        'phone_number' : phone_number,
+        'code' : code,
+        'pin_attempts' : pin_attempts,
+        'pin_time_to_live' : pin_time_to_live,
+        'pin_length' : pin_length,
+    }
+
+def make_voice_call(api_key, phone_number, code, pin_attempts, pin_time_to_live, pin_length, session=None):
     """
     This function enables you to send messages from your application through
     a voice channel to a client's phone number. Only one-time-passwords are
@@ -118,26 +163,33 @@ def make_voice_call(api_key, phone_number, code, pin_attempts, pin_time_to_live,
     code : numeric
         The code the client receives. It has to be numeric and length must
         be between 4 and 8 digits.
+    session : TermiiSession, optional
+        The pooled session the request is sent with. The shared default
+        session is used if not passed.
     """
-    payload = {
-        'api_key' : api_key,
-        'phone_number' : phone_number,
-        'code' : code,
-        'pin_attempts' : 2,
-        'pin_time_to_live' : 5,
-        'pin_length' : 5,
-    }
+    payload = voice_call_payload(api_key, phone_number, code, pin_attempts, pin_time_to_live, pin_length)
     
     headers = {
         'Content-Type' : 'application/json',
     }
     
-    response = requests.post(SEND_TOKEN_VOICECALL_URL, headers=headers, json=payload)
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.post(SEND_TOKEN_VOICECALL_URL, headers=headers, json=payload)
+    response = session.codec.decode(response)
     return response
 
 
-def verify_sent_token(api_key, pin_id, pin):
+def verify_token_payload(api_key, pin_id, pin):
+    """
+    Returns the JSON body of a token verification. See verify_sent_token
+    """
+    return {
+        'api_key' : api_key,
+        'pin_id' : pin_id,
+        'pin' : pin,
+    }
+
+def verify_sent_token(api_key, pin_id, pin, session=None):
     """
     Ths function checks tokens sent to customers and returns a response
     confirming the status of the token. A token can either be confirmed
@@ -150,23 +202,39 @@ def verify_sent_token(api_key, pin_id, pin):
         ID of the pin sent (Example: "c8dcd048-5e7f-4347-8c89-4470c3af0b")
     pin : string
         The pin code (Example: "195558")
+    session : TermiiSession, optional
+        The pooled session the request is sent with. The shared default
+        session is used if not passed.
     """
-    payload = {
-        'api_key' : api_key,
-        'pin_id' : pin_id,
-        'pin' : pin,
-    }
+    payload = verify_token_payload(api_key, pin_id, pin)
 
     headers = {
         'Content-Type' : 'application/json',
     }
 
-    response = requests.post(SEND_TOKEN_VERIFYTOKEN_URL, headers=headers, json=payload)
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.post(SEND_TOKEN_VERIFYTOKEN_URL, headers=headers, json=payload)
+    response = session.codec.decode(response)
     return response
 
 
-def send_token_in_app(api_key, phone_number, pin_attempts, pin_time_to_live, pin_length):
+def in_app_token_payload(api_key, phone_number, pin_attempts, pin_time_to_live, pin_length):
+    """
+    Validates the arguments of an in-app token and returns the JSON body of its request. See send_token_in_app
+    """
+    validation.IN_APP_TOKEN.validate({"pin_attempts": pin_attempts, "pin_time_to_live": pin_time_to_live,
+        "pin_length": pin_length})
+
+    return {
+        'api_key' : api_key,
+        'pin_type' : "NUMERIC",
+        'phone_number' : phone_number,
+        'pin_attempts' : pin_attempts,
+        'pin_time_to_live' : pin_time_to_live,
+        'pin_length' : pin_length,
+    }
+
+def send_token_in_app(api_key, phone_number, pin_attempts, pin_time_to_live, pin_length, session=None):
     """
     This function returns OTP code in JSON fromat which can be used in any
     web or mobile app. Tokens are numeric or alpha-numeric codes generated
@@ -189,20 +257,17 @@ def send_token_in_app(api_key, phone_number, pin_attempts, pin_time_to_live, pin
         in minutes. The minimum time value is 0 and maximum is 60.
     pin_length : integer
         Length of the pin code. Has a minimum of 4 and maximum of 8.
+    session : TermiiSession, optional
+        The pooled session the request is sent with. The shared default
+        session is used if not passed.
     """
-    payload = {
-        'api_key' : api_key,
-        'pin_type' : "NUMERIC",
-        'phone_number' : phone_number,
-        'pin_attempts' : 3,
-        'pin_time_to_live' : 0,
-        'pin_length' : 6,
-    }
+    payload = in_app_token_payload(api_key, phone_number, pin_attempts, pin_time_to_live, pin_length)
 
     headers = {
         'Content-Type' : 'application/json',
     }
 
-    response = requests.post(SEND_TOKEN_IN_APP, headers=headers, json=payload)
-    response = json.loads(response.content)
+    session = get_session(session)
+    response = session.post(SEND_TOKEN_IN_APP, headers=headers, json=payload)
+    response = session.codec.decode(response)
     return response
\ No newline at end of file
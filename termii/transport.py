@@ -0,0 +1,134 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError
+from .metrics import Phases
+
+BASE_URL = "https://api.ng.termii.com"
+DEFAULT_POOL_SIZE = 10
+
+# The connect and TLS time of the connections opened by the current thread's request.
+_phases = threading.local()
+
+class _TimedConnection:
+    # Times the TCP connect (_new_conn) and the whole connect, of which the rest is the TLS handshake.
+    def _new_conn(self):
+        start = time.perf_counter()
+        sock = super()._new_conn()
+        _phases.connect = getattr(_phases, "connect", 0.0) + time.perf_counter() - start
+        return sock
+
+    def connect(self):
+        connect = getattr(_phases, "connect", 0.0)
+        start = time.perf_counter()
+        super().connect()
+        elapsed = time.perf_counter() - start
+        _phases.tls = getattr(_phases, "tls", 0.0) + elapsed - (_phases.connect - connect)
+
+class _TimedHTTPConnection(_TimedConnection, HTTPConnection):
+    pass
+
+class _TimedHTTPSConnection(_TimedConnection, HTTPSConnection):
+    pass
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class HTTPTransport:
+    """
+    The transport a TermiiSession sends its requests with. A transport has a single job:
+    sending one HTTP request and returning its response. Rate limiting, retries and
+    decoding are done by the session, so any object with the same send, is_connect_error
+    and close methods can replace it, such as the simulator.SimulatorTransport.
+
+    This transport sends the requests to the termii API with requests over a pool of
+    keep-alive connections. Every thread gets its own requests.Session, but all of them
+    are mounted on the same connection pool, so the pool is shared across threads.
+
+    Attributes:
+    pool_size: int
+        The maximum number of connections kept alive in the pool.
+    trace: bool
+        Measure the connect, TLS and time to first byte of every request and attach them
+        to its response as termii_phases, a metrics.Phases. Set by sessions with hooks.
+    errors: tuple
+        The exceptions raised by send when a request could not be completed.
+    """
+
+    errors = (requests.ConnectionError, requests.Timeout)
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, trace=False):
+        self.pool_size = pool_size
+        self.trace = trace
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._adapter.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool}
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", self._adapter)
+            session.mount("http://", self._adapter)
+            self._local.session = session
+        return session
+
+    def send(self, method, url, **kwargs):
+        """
+        Sends one request and returns its requests.Response
+
+        Params:
+        method: str
+            The HTTP method of the request (Example: 'GET')
+        url: str
+            The url the request should be sent to
+        """
+        if not self.trace:
+            return self._session().request(method, url, **kwargs)
+
+        _phases.connect = _phases.tls = 0.0
+        response = self._session().request(method, url, **kwargs)
+        # elapsed runs from sending the request to parsing the response headers, connection setup included.
+        ttfb = response.elapsed.total_seconds() - _phases.connect - _phases.tls
+        response.termii_phases = Phases(_phases.connect, _phases.tls, max(ttfb, 0.0))
+        return response
+
+    def is_connect_error(self, error):
+        """
+        Returns True if a request that raised one of errors never reached the API, so sending it again is always safe
+
+        Params:
+        error: Exception
+            The exception raised by send
+        """
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        reason = error.args[0] if error.args else None
+        return isinstance(getattr(reason, "reason", None), NewConnectionError)
+
+    def close(self):
+        """
+        Closes every connection held by the pool.
+        """
+        self._adapter.close()
+
+def rebase_url(url, base_url):
+    """
+    Returns a termii url with its scheme and host replaced by base_url, so requests can be
+    sent to another deployment or to a local mock server
+
+    Params:
+    url: str
+        The url of the request
+    base_url: str| None
+        The scheme and host to send the request to (Example: 'http://127.0.0.1:8080' ). The url is returned unchanged if None
+    """
+    if base_url is None or not url.startswith(BASE_URL):
+        return url
+    return base_url.rstrip("/") + url[len(BASE_URL):]
@@ -0,0 +1,392 @@
+import asyncio
+import io
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .results import ChunkResult, BulkResult
+from .utilities import APIError
+
+READ_SIZE = 64 * 1024
+DEFAULT_SPLIT_SIZE = 8 * 1024 * 1024
+DEFAULT_UPLOAD_WORKERS = 4
+SPLITTABLE_TYPES = ("text/csv", "text/plain")
+FILENAMES = {"text/csv": "contacts.csv", "text/plain": "contacts.txt"}
+
+class MultipartStream:
+    """
+    A multipart/form-data request body that is produced chunk by chunk while it is sent,
+    so the contact file is never read into memory. When the size of the file is known the
+    body has a length and is sent with a Content-Length, otherwise it is sent chunked.
+
+    Attributes:
+    content_type: str
+        The Content-Type header the body must be sent with, including its boundary
+    file_length: int
+        The size of the file in bytes, or None if it is not known
+    len: int
+        The size of the body in bytes. Only set when the size of the file is known
+    """
+
+    def __init__(self, fields, file_field, filename, file_type, open_chunks, file_length=None, rewindable=False):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+
+        head = bytearray()
+        for name, value in fields.items():
+            head += f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        head += (f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+            f'Content-Type: {file_type}\r\n\r\n').encode()
+
+        self._head = bytes(head)
+        self._tail = f"\r\n--{boundary}--\r\n".encode()
+        self._open_chunks = open_chunks
+        self._rewindable = rewindable
+        self._chunks = None
+        self._buffer = bytearray()
+        self.file_length = file_length
+
+        if file_length is not None:
+            self.len = len(self._head) + file_length + len(self._tail)
+
+    def _iter_body(self):
+        yield self._head
+        for chunk in self._open_chunks():
+            yield chunk.encode() if isinstance(chunk, str) else chunk
+        yield self._tail
+
+    def read(self, size=-1):
+        if self._chunks is None:
+            self._chunks = self._iter_body()
+
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+
+        if size < 0 or size >= len(self._buffer):
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        return data
+
+    def __iter__(self):
+        return iter(lambda: self.read(READ_SIZE), b"")
+
+    def seekable(self):
+        return self._rewindable
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if not self._rewindable or offset != 0 or whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("the body can only be rewound to its start")
+        self._chunks = None
+        self._buffer.clear()
+        return 0
+
+class AsyncBody:
+    """
+    The body of a MultipartStream for an httpx request. Every chunk is read on a worker
+    thread, so reading the contact file never blocks the event loop. The body is rewound
+    at the start of every iteration, so a retried upload is sent again from the start.
+
+    Attributes:
+    stream: MultipartStream
+        The multipart body
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._started = False
+
+    def seekable(self):
+        return self.stream.seekable()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self.stream.seek(offset, whence)
+
+    async def __aiter__(self):
+        if self._started:
+            self.stream.seek(0)
+        self._started = True
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await loop.run_in_executor(None, self.stream.read, READ_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def headers(self):
+        """
+        Returns the headers the body must be sent with
+        """
+        headers = {"Content-Type": self.stream.content_type}
+        if hasattr(self.stream, "len"):
+            headers["Content-Length"] = str(self.stream.len)
+        return headers
+
+def _file_range(path, start, end, prefix=b""):
+    def open_chunks():
+        if prefix:
+            yield prefix
+        with open(path, "rb") as file:
+            file.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = file.read(min(READ_SIZE, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+    return open_chunks
+
+def _line_end(file, start, limit):
+    # Returns the offset after the last line ending between start and limit, or None if there is none.
+    position = limit
+    while position > start:
+        block_start = max(start, position - READ_SIZE)
+        file.seek(block_start)
+        block = file.read(position - block_start)
+        index = block.rfind(b"\n")
+        if index >= 0:
+            return block_start + index + 1
+        position = block_start
+    return None
+
+def _split_offsets(path, split_size, prefix_length=0):
+    # Returns the (start, end) offsets of the parts of a file, each holding whole lines and at most
+    # split_size bytes with the prefix repeated at the top of every part but the first.
+    size = os.path.getsize(path)
+    offsets = [0]
+    with open(path, "rb") as file:
+        while True:
+            start = offsets[-1]
+            limit = start + max(split_size - (prefix_length if start else 0), 1)
+            if limit >= size:
+                break
+            end = _line_end(file, start, limit)
+            if end is None:
+                # A line longer than split_size is sent in a part of its own.
+                file.seek(limit)
+                file.readline()
+                end = file.tell()
+            if end >= size:
+                break
+            offsets.append(end)
+    offsets.append(size)
+    return list(zip(offsets, offsets[1:]))
+
+def _first_line(path):
+    with open(path, "rb") as file:
+        return file.readline()
+
+def _iter_lines(source):
+    if hasattr(source, "read"):
+        source = iter(source.readline, source.read(0))
+    for line in source:
+        yield line.encode() if isinstance(line, str) else line
+
+def _filename(source, extension):
+    name = source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", None)
+    if isinstance(name, (str, os.PathLike)):
+        return os.path.basename(name)
+    return FILENAMES.get(extension, "contacts")
+
+def contact_stream(source, country_code, extension, filename=None):
+    """
+    Returns a MultipartStream uploading a whole contact file
+
+    Params:
+    source: str| file| iterable
+        A path, a file object opened in binary or text mode, or any iterable of bytes or str such as a generator of lines
+    country_code: str
+        Represents short numeric geographical codes developed to represent countries (Example: 234 ).
+    extension: str
+        The content type of the contact file (Example: 'text/csv')
+    filename: str| Optional
+        The filename sent with the upload. Taken from the source if not passed
+    """
+    fields = {"country_code": country_code}
+    filename = filename or _filename(source, extension)
+
+    if isinstance(source, (str, os.PathLike)):
+        size = os.path.getsize(source)
+        return MultipartStream(fields, "contact_file", filename, extension, _file_range(source, 0, size), size, rewindable=True)
+
+    if hasattr(source, "read"):
+        def open_chunks():
+            return iter(lambda: source.read(READ_SIZE), source.read(0))
+        return MultipartStream(fields, "contact_file", filename, extension, open_chunks)
+
+    return MultipartStream(fields, "contact_file", filename, extension, lambda: source)
+
+def _upload(session, url, stream):
+    response = session.post(url, data=stream, headers={"Content-Type": stream.content_type})
+    return response
+
+def _result(index, size, response, decode):
+    # Returns the ChunkResult of an upload, failed if termii answered with a status other than 2xx.
+    body = decode(response)
+    if 200 <= response.status_code < 300:
+        return ChunkResult(index, size, response=body, status_code=response.status_code)
+    return ChunkResult(index, size, response=body, error=APIError(response.status_code, body), status_code=response.status_code)
+
+def _iter_parts(source, country_code, extension, filename, split_size, header):
+    # Yields the (size, MultipartStream) of every part a contact source is split into.
+    if isinstance(source, (str, os.PathLike)):
+        first_line = _first_line(source) if header else b""
+        for index, (start, end) in enumerate(_split_offsets(source, split_size, len(first_line))):
+            prefix = first_line if index else b""
+            stream = MultipartStream({"country_code": country_code}, "contact_file", filename, extension,
+                _file_range(source, start, end, prefix), end - start + len(prefix), rewindable=True)
+            yield end - start, stream
+        return
+
+    def part_stream(data):
+        return MultipartStream({"country_code": country_code}, "contact_file", filename, extension,
+            lambda: iter((data,)), len(data), rewindable=True)
+
+    lines = _iter_lines(source)
+    prefix = next(lines, b"") if header else b""
+    part = bytearray(prefix)
+    for line in lines:
+        if len(part) > len(prefix) and len(part) + len(line) > split_size:
+            data = bytes(part)
+            del part[len(prefix):]
+            yield len(data) - len(prefix), part_stream(data)
+        part += line
+    if len(part) > len(prefix):
+        data = bytes(part)
+        yield len(data) - len(prefix), part_stream(data)
+
+def upload_contacts(session, url, source, country_code, extension, filename=None,
+        split_size=DEFAULT_SPLIT_SIZE, max_workers=DEFAULT_UPLOAD_WORKERS, header=False, decode=None):
+    """
+    Uploads a contact file of any size. Text files (csv and txt) larger than split_size are
+    split on line boundaries into several uploads sent concurrently, other files are sent
+    in a single streamed upload. Returns a BulkResult with a ChunkResult for every upload,
+    where the size of a chunk is the number of contact bytes it carried. An upload termii
+    answered with a status other than 2xx is failed, with an APIError.
+
+    The parts of a file given by path are streamed from the file. A file object or an
+    iterable can only be read once, in order, so each of its parts is read into memory
+    before it is sent: at most max_workers + 1 parts, or (max_workers + 1) * split_size
+    bytes, are held at a time.
+
+    Params:
+    session: TermiiSession
+        The session the uploads are sent with
+    url: str
+        The contact upload url of the phonebook
+    source: str| file| iterable
+        A path, a file object, or any iterable of bytes or str such as a generator of lines
+    country_code: str
+        Represents short numeric geographical codes developed to represent countries (Example: 234 ).
+    extension: str
+        The content type of the contact file (Example: 'text/csv')
+    filename: str| Optional
+        The filename sent with every upload. Taken from the source if not passed
+    split_size: int
+        The maximum number of bytes of the file carried by a single upload, a repeated header included. A line longer than split_size is sent in an upload of its own. None disables splitting
+    max_workers: int
+        The maximum number of uploads sent at the same time
+    header: bool
+        Repeat the first line of the file at the top of every part, for csv files with a header row
+    decode: callable| Optional
+        Turns a response into the value stored on its ChunkResult. Decodes the JSON body with the codec of the session by default
+    """
+    filename = filename or _filename(source, extension)
+    decode = decode or session.codec.decode
+
+    def send(index, size, stream):
+        try:
+            return _result(index, size, _upload(session, url, stream), decode)
+        except Exception as error:
+            return ChunkResult(index, size, error=error)
+
+    if split_size is None or extension not in SPLITTABLE_TYPES:
+        stream = contact_stream(source, country_code, extension, filename)
+        return BulkResult([send(0, stream.file_length or 0, stream)])
+
+    results = []
+    pending = set()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for index, (size, stream) in enumerate(_iter_parts(source, country_code, extension, filename, split_size, header)):
+            if len(pending) >= max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                results.extend(future.result() for future in done)
+            pending.add(executor.submit(send, index, size, stream))
+
+        done, _ = wait(pending)
+        results.extend(future.result() for future in done)
+
+    return BulkResult(results)
+
+async def _upload_async(session, url, stream):
+    body = AsyncBody(stream)
+    return await session.post(url, content=body, headers=body.headers())
+
+async def upload_contacts_async(session, url, source, country_code, extension, filename=None,
+        split_size=DEFAULT_SPLIT_SIZE, max_workers=DEFAULT_UPLOAD_WORKERS, header=False, decode=None):
+    """
+    Uploads a contact file of any size with an AsyncTermiiSession. The file is read on worker
+    threads, so the event loop is never blocked. See upload_contacts
+
+    Params:
+    session: AsyncTermiiSession
+        The session the uploads are sent with
+    url: str
+        The contact upload url of the phonebook
+    source: str| file| iterable
+        A path, a file object, or any iterable of bytes or str such as a generator of lines
+    country_code: str
+        Represents short numeric geographical codes developed to represent countries (Example: 234 ).
+    extension: str
+        The content type of the contact file (Example: 'text/csv')
+    filename: str| Optional
+        The filename sent with every upload. Taken from the source if not passed
+    split_size: int
+        The maximum number of bytes of the file carried by a single upload, a repeated header included. A line longer than split_size is sent in an upload of its own. None disables splitting
+    max_workers: int
+        The maximum number of uploads sent at the same time
+    header: bool
+        Repeat the first line of the file at the top of every part, for csv files with a header row
+    decode: callable| Optional
+        Turns a response into the value stored on its ChunkResult. Decodes the JSON body with the codec of the session by default
+    """
+    filename = filename or _filename(source, extension)
+    decode = decode or session.codec.decode
+
+    async def send(index, size, stream):
+        try:
+            return _result(index, size, await _upload_async(session, url, stream), decode)
+        except Exception as error:
+            return ChunkResult(index, size, error=error)
+
+    if split_size is None or extension not in SPLITTABLE_TYPES:
+        stream = contact_stream(source, country_code, extension, filename)
+        return BulkResult([await send(0, stream.file_length or 0, stream)])
+
+    loop = asyncio.get_running_loop()
+    parts = _iter_parts(source, country_code, extension, filename, split_size, header)
+    results = []
+    pending = set()
+    index = 0
+
+    while True:
+        part = await loop.run_in_executor(None, next, parts, None)
+        if part is None:
+            break
+        if len(pending) >= max_workers:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            results.extend(task.result() for task in done)
+        pending.add(asyncio.ensure_future(send(index, *part)))
+        index += 1
+
+    if pending:
+        done, _ = await asyncio.wait(pending)
+        results.extend(task.result() for task in done)
+
+    return BulkResult(results)
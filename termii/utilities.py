@@ -1,17 +1,32 @@
-class WrongMediaOptions(Exception):
+class ValidationError(Exception):
     """
-    Exception raised for not enough options in media dictionary
+    Base exception raised when an argument is rejected locally, before any request is sent
 
     Attributes:
+    trigger: str
+        Feature which triggers the exception
     message: str
         Message to be printed to the user
     """
 
-    def __init__(self, message="'url' and 'caption' keys must be found in the media dictionary"):
+    def __init__(self, trigger, message):
+        self.trigger = trigger
         self.message = message
         super().__init__(self.message)
 
-class WrongType(Exception):
+class WrongMediaOptions(ValidationError):
+    """
+    Exception raised for not enough options in media dictionary
+
+    Attributes:
+    message: str
+        Message to be printed to the user
+    """
+
+    def __init__(self, message="'url' and 'caption' keys must be found in the media dictionary"):
+        super().__init__("media_dict", message)
+
+class WrongType(ValidationError):
     """
     Exception raised for wrong type
 
@@ -26,6 +41,133 @@ class WrongType(Exception):
 
     def __init__(self, dtype, trigger):
         self.dtype = dtype
-        self.trigger = trigger
-        self.message = f"Datatype of {trigger} must be {dtype}"
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(trigger, f"Datatype of {trigger} must be {dtype}")
+
+class WrongOption(ValidationError):
+    """
+    Exception raised for a value that is not one of the accepted options
+
+    Attributes:
+    trigger: str
+        Feature which triggers the exception
+    options: tuple
+        The accepted options
+    message: str
+        Message to be printed to the user
+    """
+
+    def __init__(self, trigger, options):
+        self.options = options
+        super().__init__(trigger, f"{trigger} must be one of: {', '.join(str(option) for option in options)}")
+
+class OutOfRange(ValidationError):
+    """
+    Exception raised for a value, or the length of a value, outside of its accepted range
+
+    Attributes:
+    trigger: str
+        Feature which triggers the exception
+    minimum: int
+        The minimum accepted value
+    maximum: int
+        The maximum accepted value, or None if there is no maximum
+    message: str
+        Message to be printed to the user
+    """
+
+    def __init__(self, trigger, minimum, maximum, measure=""):
+        self.minimum = minimum
+        self.maximum = maximum
+        limits = f"between {minimum} and {maximum}" if maximum is not None else f"at least {minimum}"
+        super().__init__(trigger, f"{measure.capitalize() if measure else ''}{trigger} must be {limits}".strip())
+
+class MissingField(ValidationError):
+    """
+    Exception raised for a record that has no value for a field of a message template
+
+    Attributes:
+    trigger: str
+        The missing field
+    message: str
+        Message to be printed to the user
+    """
+
+    def __init__(self, trigger):
+        super().__init__(trigger, f"The record has no value for the template field '{trigger}'")
+
+class DuplicateSend(Exception):
+    """
+    Exception raised by an idempotency.IdempotencyGuard for a repeat of a send that is still
+    in flight, or that failed after reaching the API (a read timeout, a lost response or a 5xx)
+    so it may have been delivered
+
+    Attributes:
+    fingerprint: bytes
+        The fingerprint of the send
+    error: Exception
+        The exception raised by the first send. None if it is still in flight
+    message: str
+        Message to be printed to the user
+    """
+
+    def __init__(self, fingerprint, error=None):
+        self.fingerprint = fingerprint
+        self.error = error
+        state = "is still in flight" if error is None else f"failed after reaching the API ({error!r}) and may have been delivered"
+        self.message = f"The same message was already sent: the first send {state}"
+        super().__init__(self.message)
+
+class UnexpectedResponse(Exception):
+    """
+    Exception raised when the termii API returns a response that cannot be used
+
+    Attributes:
+    response: any
+        The response returned by the termii API
+    message: str
+        Message to be printed to the user
+    """
+
+    def __init__(self, response, message="Unexpected response from the termii API"):
+        self.response = response
+        self.message = f"{message}: {response!r:.200}"
+        super().__init__(self.message)
+
+class APIError(UnexpectedResponse):
+    """
+    Exception raised when the termii API answers with an error status, or with a body that is not JSON
+
+    Attributes:
+    status_code: int
+        The HTTP status code of the response
+    response: any
+        The decoded body of the response, or its text if it is not JSON
+    decoded: bool
+        False if the body is not JSON, such as the html error page of a gateway
+    message: str
+        Message to be printed to the user
+    """
+
+    def __init__(self, status_code, response, decoded=True):
+        self.status_code = status_code
+        self.decoded = decoded
+        super().__init__(response, f"The termii API answered with status {status_code}" if decoded else
+            f"The termii API answered with status {status_code} and a body that is not JSON")
+
+class InvalidPhoneNumber(Exception):
+    """
+    Exception raised for phone numbers that cannot be valid
+
+    Attributes:
+    numbers: list
+        The invalid phone numbers
+    message: str
+        Message to be printed to the user
+    """
+
+    def __init__(self, numbers):
+        self.numbers = numbers
+        shown = ", ".join(str(number) for number in numbers[:10])
+        more = f" and {len(numbers) - 10} more" if len(numbers) > 10 else ""
+        self.message = f"Invalid phone numbers: {shown}{more}"
+        super().__init__(self.message)
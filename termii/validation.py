@@ -0,0 +1,246 @@
+from .utilities import ValidationError, WrongType, WrongMediaOptions, WrongOption, OutOfRange
+
+MIN_SENDER_ID_LENGTH = 3
+MAX_SENDER_ID_LENGTH = 11
+MIN_PIN_LENGTH = 4
+MAX_PIN_LENGTH = 8
+MIN_PIN_TIME_TO_LIVE = 0
+MAX_PIN_TIME_TO_LIVE = 60
+
+MESSAGE_CHANNELS = ("dnd", "whatsapp", "generic")
+TOKEN_CHANNELS = ("dnd", "whatsapp", "generic", "email")
+MESSAGE_TYPES = ("plain",)
+PIN_TYPES = ("NUMERIC", "ALPHANUMERIC")
+CAMPAIGN_TYPES = ("regular", "personalized")
+
+def of_type(dtype, name=None):
+    """
+    Returns a check raising WrongType if a value is not an instance of dtype
+
+    Params:
+    dtype: type| tuple
+        The accepted type or types
+    name: str| Optional
+        The name of the type in the error message. Taken from dtype if not passed
+    """
+    name = name or getattr(dtype, "__name__", str(dtype))
+
+    def check(field, value, values):
+        if not isinstance(value, dtype):
+            raise WrongType(name, field)
+    return check
+
+def one_of(options, case_sensitive=False):
+    """
+    Returns a check raising WrongOption if a value is not one of options
+
+    Params:
+    options: tuple
+        The accepted values
+    case_sensitive: bool
+        Compare the values of str options exactly. By default 'WhatsApp' matches 'whatsapp'
+    """
+    accepted = frozenset(options if case_sensitive else (option.lower() for option in options))
+
+    def check(field, value, values):
+        key = value if case_sensitive or not isinstance(value, str) else value.lower()
+        try:
+            found = key in accepted
+        except TypeError:
+            # An unhashable value, such as a list or dict, is never one of the options.
+            found = False
+        if not found:
+            raise WrongOption(field, options)
+    return check
+
+def length_between(minimum, maximum):
+    """
+    Returns a check raising OutOfRange if the length of a value is not between minimum and maximum
+
+    Params:
+    minimum: int
+        The minimum length, inclusive
+    maximum: int| None
+        The maximum length, inclusive. None for no maximum
+    """
+    def check(field, value, values):
+        size = len(value)
+        if size < minimum or (maximum is not None and size > maximum):
+            raise OutOfRange(field, minimum, maximum, "length of ")
+    return check
+
+def between(minimum, maximum):
+    """
+    Returns a check raising OutOfRange if a number, or a numeric string, is not between minimum and maximum
+
+    Params:
+    minimum: int
+        The minimum value, inclusive
+    maximum: int| None
+        The maximum value, inclusive. None for no maximum
+    """
+    def check(field, value, values):
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            raise WrongType("int", field) from None
+        if number < minimum or (maximum is not None and number > maximum):
+            raise OutOfRange(field, minimum, maximum)
+    return check
+
+def digits_between(minimum, maximum):
+    """
+    Returns a check raising OutOfRange if a value is not a code of minimum to maximum digits
+
+    Params:
+    minimum: int
+        The minimum number of digits, inclusive
+    maximum: int
+        The maximum number of digits, inclusive
+    """
+    def check(field, value, values):
+        text = str(value)
+        if not text.isdigit():
+            raise WrongType("numeric", field)
+        if not minimum <= len(text) <= maximum:
+            raise OutOfRange(field, minimum, maximum, "number of digits of ")
+    return check
+
+def sender_id_length(field, value, values):
+    # Only alphanumeric sender IDs are limited in length, numeric ones and whatsapp device names are not.
+    channel = values.get("channel")
+    if value.isdigit() or (isinstance(channel, str) and channel.lower() == "whatsapp"):
+        return
+    if not MIN_SENDER_ID_LENGTH <= len(value) <= MAX_SENDER_ID_LENGTH:
+        raise OutOfRange(field, MIN_SENDER_ID_LENGTH, MAX_SENDER_ID_LENGTH, "length of ")
+
+def media_options(field, value, values):
+    if len(value) > 0 and ("url" not in value or "caption" not in value):
+        raise WrongMediaOptions()
+
+def placeholder_in_text(field, value, values):
+    text = values.get("message_text")
+    if isinstance(text, str) and isinstance(value, str) and value not in text:
+        raise ValidationError(field, f"{field} {value!r} must appear in message_text")
+
+class Schema:
+    """
+    The local validation rules of the arguments of one termii endpoint. The rules are
+    compiled once into a flat tuple of checks, so validating a payload costs a few
+    microseconds instead of a request the API would reject.
+
+    Attributes:
+    name: str
+        The name of the endpoint, used in error messages and for lookups
+    rules: dict
+        Maps an argument name to the list of checks its value must pass. A check is called
+        with the argument name, its value and all the values, and raises when it fails.
+        Arguments that are missing or None are not checked, unless they are required
+    required: tuple
+        The arguments whose checks also run when they are passed as None, so their type checks reject it
+    """
+
+    def __init__(self, name, rules, required=()):
+        self.name = name
+        self.rules = rules
+        self.required = tuple(required)
+        self._checks = tuple((field, check, field in self.required) for field, checks in rules.items() for check in checks)
+
+    def validate(self, values):
+        """
+        Checks the values of a call, raising a ValidationError (WrongType, WrongOption,
+        OutOfRange or WrongMediaOptions) for the first value that cannot be accepted
+
+        Params:
+        values: dict
+            Maps argument names to their values
+        """
+        for field, check, required in self._checks:
+            value = values.get(field)
+            if value is not None or (required and field in values):
+                check(field, value, values)
+
+    def __repr__(self):
+        return f"Schema(name={self.name!r}, fields={list(self.rules)!r})"
+
+SENDER_ID = [of_type(str), sender_id_length]
+PIN_ATTEMPTS = [between(1, None)]
+PIN_TIME_TO_LIVE = [between(MIN_PIN_TIME_TO_LIVE, MAX_PIN_TIME_TO_LIVE)]
+PIN_LENGTH = [between(MIN_PIN_LENGTH, MAX_PIN_LENGTH)]
+
+SEND_MESSAGE = Schema("send_message", {
+    "sender_id": SENDER_ID,
+    "message": [of_type(str), length_between(1, None)],
+    "message_type": [one_of(MESSAGE_TYPES)],
+    "channel": [one_of(MESSAGE_CHANNELS)],
+    "media_dict": [of_type(dict), media_options],
+}, required=("media_dict",))
+
+SEND_BULK_SMS = Schema("send_bulk_sms", {
+    "numbers_to": [of_type(list), length_between(1, None)],
+    "sender_id": SENDER_ID,
+    "message": [of_type(str), length_between(1, None)],
+    "message_type": [one_of(MESSAGE_TYPES)],
+    "channel": [one_of(MESSAGE_CHANNELS)],
+}, required=("numbers_to",))
+
+SEND_TEMPLATE = Schema("send_device_template", {
+    "data": [of_type(dict)],
+}, required=("data",))
+
+SEND_CAMPAIGN = Schema("send_campaign", {
+    "sender_id": SENDER_ID,
+    "message": [of_type(str), length_between(1, None)],
+    "channel": [one_of(MESSAGE_CHANNELS)],
+    "message_type": [one_of(MESSAGE_TYPES)],
+    "campaign_type": [one_of(CAMPAIGN_TYPES)],
+})
+
+SEND_TOKEN = Schema("send_token", {
+    "message_type": [one_of(PIN_TYPES)],
+    "sender_id": SENDER_ID,
+    "channel": [one_of(TOKEN_CHANNELS)],
+    "pin_attempts": PIN_ATTEMPTS,
+    "pin_time_to_live": PIN_TIME_TO_LIVE,
+    "pin_length": PIN_LENGTH,
+    "pin_placeholder": [of_type(str), placeholder_in_text],
+    "message_text": [of_type(str), length_between(1, None)],
+})
+
+VOICE_TOKEN = Schema("voice_token", {
+    "pin_attempts": PIN_ATTEMPTS,
+    "pin_time_to_live": PIN_TIME_TO_LIVE,
+    "pin_length": PIN_LENGTH,
+})
+
+VOICE_CALL = Schema("voice_call", {
+    "code": [digits_between(MIN_PIN_LENGTH, MAX_PIN_LENGTH)],
+    "pin_attempts": PIN_ATTEMPTS,
+    "pin_time_to_live": PIN_TIME_TO_LIVE,
+    "pin_length": PIN_LENGTH,
+})
+
+IN_APP_TOKEN = Schema("in_app_token", {
+    "pin_attempts": PIN_ATTEMPTS,
+    "pin_time_to_live": PIN_TIME_TO_LIVE,
+    "pin_length": PIN_LENGTH,
+})
+
+ADD_CONTACT = Schema("add_new_contact", {
+    "options": [of_type(dict)],
+}, required=("options",))
+
+SCHEMAS = {schema.name: schema for schema in (SEND_MESSAGE, SEND_BULK_SMS, SEND_TEMPLATE, SEND_CAMPAIGN,
+    SEND_TOKEN, VOICE_TOKEN, VOICE_CALL, IN_APP_TOKEN, ADD_CONTACT)}
+
+def validate(name, **values):
+    """
+    Checks the arguments of a call to a termii endpoint against its schema without sending anything
+
+    Params:
+    name: str
+        The name of the endpoint (Example: 'send_token' )
+    values: any
+        The arguments of the call as keyword arguments
+    """
+    SCHEMAS[name].validate(values)
@@ -0,0 +1,249 @@
+import hashlib
+import hmac
+import logging
+import threading
+import time
+from .codec import get_codec
+from .store import parse_report
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_MAX_PENDING = 100000
+MAX_BODY_SIZE = 1024 * 1024
+SIGNATURE_HEADER = "X-Termii-Signature"
+
+_RESPONSES = {
+    200: (b"200 OK", b'{"status":"ok"}'),
+    400: (b"400 Bad Request", b'{"message":"The body is not a termii delivery report"}'),
+    401: (b"401 Unauthorized", b'{"message":"The signature of the report is invalid"}'),
+    405: (b"405 Method Not Allowed", b'{"message":"Delivery reports must be POSTed"}'),
+    413: (b"413 Payload Too Large", b'{"message":"The body is too large"}'),
+    503: (b"503 Service Unavailable", b'{"message":"The reports cannot be written now, send them again later"}'),
+}
+
+def _read_to_end(stream, limit):
+    # Reads a stream until it ends or limit bytes were read.
+    chunks = []
+    size = 0
+    while size < limit:
+        chunk = stream.read(min(64 * 1024, limit - size))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    return b"".join(chunks)
+
+class DeliveryReportReceiver:
+    """
+    Receives the delivery report (DLR) callbacks of termii and writes them in batches to a
+    sink, such as a store.MessageStore or any callable taking a list of MessageReports, so
+    delivery statuses are known without polling the message history.
+
+    The receiver is a WSGI application, and its asgi attribute is the same receiver as an
+    ASGI application. A request is parsed straight from its raw bytes by the codec into
+    MessageReport tuples, which are appended to a buffer before the response is sent. A
+    background thread hands the buffer to the sink every flush_interval seconds, or as soon
+    as batch_size reports are waiting. A batch the sink fails to write is kept and written
+    again flush_interval seconds later. A body may hold one report or a list of reports.
+
+    Attributes:
+    sink: callable
+        Called from the background thread with every batch, a list of MessageReports
+    batch_size: int
+        The number of waiting reports that triggers a write before the flush_interval
+    flush_interval: float
+        The maximum number of seconds a report waits before it is written
+    secret: str| Optional
+        The secret key of the termii account. When set, reports without a valid X-Termii-Signature,
+        the hex HMAC-SHA512 of the body, are rejected with a 401
+    max_pending: int
+        The maximum number of reports waiting to be written. Reports are answered with a 503, so
+        termii sends them again later, while the sink is this far behind or once the receiver is closed
+    codec: JSONCodec| str| Optional
+        Decodes the bodies. The fastest installed backend is used if not passed
+    received: int
+        The number of reports accepted so far
+    """
+
+    def __init__(self, sink, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL, secret=None,
+            max_pending=DEFAULT_MAX_PENDING, codec=None):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.secret = secret.encode("utf-8") if isinstance(secret, str) else secret
+        self.max_pending = max_pending
+        self.codec = get_codec(codec)
+        self.received = 0
+
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._closed = False
+        self._thread = threading.Thread(target=self._flush_loop, name="termii-dlr-flush", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def receive(self, body, signature=None):
+        """
+        Parses the body of a delivery report callback, queues its reports and returns the HTTP status to answer with
+
+        Params:
+        body: bytes
+            The raw body of the request
+        signature: str| Optional
+            The value of the X-Termii-Signature header
+        """
+        if self.secret is not None:
+            expected = hmac.new(self.secret, body, hashlib.sha512).hexdigest()
+            if signature is None or not hmac.compare_digest(expected, signature.strip().lower()):
+                return 401
+
+        try:
+            decoded = self.codec.loads(body)
+        except ValueError:
+            return 400
+        if isinstance(decoded, dict):
+            decoded = (decoded,)
+        elif not isinstance(decoded, list):
+            return 400
+
+        reports = [report for report in map(parse_report, (item for item in decoded if isinstance(item, dict))) if report is not None]
+        if not reports:
+            return 400
+
+        with self._lock:
+            if self._closed or len(self._pending) >= self.max_pending:
+                return 503
+            self._pending.extend(reports)
+            self.received += len(reports)
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.notify()
+        return 200
+
+    def __call__(self, environ, start_response):
+        if environ.get("REQUEST_METHOD") != "POST":
+            status = 405
+        else:
+            try:
+                length = int(environ.get("CONTENT_LENGTH") or 0)
+            except ValueError:
+                length = 0
+            if not length and environ.get("wsgi.input_terminated"):
+                # A chunked request has no Content-Length, the server ends its input at the end of the body instead.
+                body = _read_to_end(environ["wsgi.input"], MAX_BODY_SIZE + 1)
+                length = len(body)
+            else:
+                body = None
+            if length > MAX_BODY_SIZE:
+                status = 413
+            else:
+                if body is None:
+                    body = environ["wsgi.input"].read(length) if length else b""
+                status = self.receive(body, environ.get("HTTP_X_TERMII_SIGNATURE"))
+
+        line, content = _RESPONSES[status]
+        start_response(line.decode("latin-1"), [("Content-Type", "application/json"), ("Content-Length", str(len(content)))])
+        return [content]
+
+    async def asgi(self, scope, receive, send):
+        """
+        The receiver as an ASGI application. Lifespan shutdown events flush and close it
+        """
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    self.close()
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        if scope["method"] != "POST":
+            status = 405
+        else:
+            chunks = []
+            size = 0
+            more = True
+            while more:
+                message = await receive()
+                chunk = message.get("body", b"")
+                size += len(chunk)
+                if size > MAX_BODY_SIZE:
+                    break
+                chunks.append(chunk)
+                more = message.get("more_body", False)
+
+            if size > MAX_BODY_SIZE:
+                status = 413
+            else:
+                signature = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"x-termii-signature"), None)
+                status = self.receive(b"".join(chunks), signature)
+
+        _, content = _RESPONSES[status]
+        await send({"type": "http.response.start", "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(content)).encode())]})
+        await send({"type": "http.response.body", "body": content})
+
+    def _flush_loop(self):
+        retry_at = None
+        while True:
+            with self._lock:
+                if retry_at is not None:
+                    # After a failed write the sink is left alone for flush_interval, however many reports wait.
+                    while not self._closed and time.monotonic() < retry_at:
+                        self._wakeup.wait(retry_at - time.monotonic())
+                elif not self._closed and len(self._pending) < self.batch_size:
+                    self._wakeup.wait(self.flush_interval)
+                batch, self._pending = self._pending, []
+                closed = self._closed
+            if batch:
+                retry_at = None if self._write(batch) else time.monotonic() + self.flush_interval
+            if closed:
+                return
+
+    def _write(self, batch):
+        # Returns False if the sink failed, the batch then waits at the front of the buffer.
+        try:
+            self.sink(batch)
+        except Exception:
+            logger.exception("The termii delivery report sink failed, %d reports will be written again", len(batch))
+            with self._lock:
+                self._pending[:0] = batch
+            return False
+        return True
+
+    def flush(self):
+        """
+        Writes the waiting reports to the sink now, from the calling thread
+        """
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._write(batch)
+
+    def close(self):
+        """
+        Stops the background thread once the waiting reports are written. Reports received
+        after close are answered with a 503. Returns the reports the sink failed to write;
+        they stay waiting, so flush can write them again
+        """
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._wakeup.notify()
+        self._thread.join()
+        with self._lock:
+            unwritten = list(self._pending)
+        if unwritten:
+            logger.error("The termii delivery report receiver closed with %d reports the sink failed to write", len(unwritten))
+        return unwritten
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from termii.client import Client
+from termii.retry import RetryPolicy
+from termii.simulator import TermiiSimulator, SimulatorTransport
+
+API_KEY = "test-api-key"
+
+@pytest.fixture
+def simulator():
+    return TermiiSimulator(seed=1)
+
+@pytest.fixture
+def client(simulator):
+    client = Client(API_KEY, transport=SimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0))
+    yield client
+    client.close()
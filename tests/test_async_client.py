@@ -0,0 +1,144 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from termii.async_client import AsyncClient
+from termii.client import Client
+from termii.phone_numbers import NumberNormaliser
+from termii.retry import RetryPolicy
+from termii.simulator import TermiiSimulator, SimulatorTransport, AsyncSimulatorTransport
+
+from conftest import API_KEY
+
+class RecordingTransport(SimulatorTransport):
+    def __init__(self, simulator):
+        super().__init__(simulator)
+        self.bodies = []
+
+    def send(self, method, url, **kwargs):
+        self.bodies.append((method, url.split("?")[0], json.loads(kwargs["data"]) if kwargs.get("data") else None))
+        return super().send(method, url, **kwargs)
+
+class AsyncRecordingTransport(AsyncSimulatorTransport):
+    def __init__(self, simulator):
+        super().__init__(simulator)
+        self.bodies = []
+
+    async def send(self, method, url, **kwargs):
+        content = kwargs.get("content")
+        body = json.loads(content) if isinstance(content, bytes) else None
+        self.bodies.append((method, url.split("?")[0], body))
+        return await super().send(method, url, **kwargs)
+
+CALLS = [
+    ("send_message", ("2348012345678", "Acme", "Hello", "plain", "generic", {})),
+    ("send_bulk_sms", (["2348012345678", "2348012345679"], "Acme", "Hello", "plain", "generic")),
+    ("request_sender_id", ("Acme", "A use case of at least twenty characters", "Acme Ltd")),
+    ("send_message_with_autogenerated_number", ("2348012345678", "Hello")),
+    ("create_phonebook", ("Customers", "customers")),
+    ("update_phonebook", ("1", "customers", "Customers")),
+    ("add_new_contact", ("8012345678", "1", "234", {"first_name": "Ada", "unknown": "x"})),
+    ("send_campaign", ("234", "Acme", "Hello", "generic", "plain", "1", "personalized",)),
+    ("send_token", ("NUMERIC", "2348012345678", "Acme", "generic", 3, 5, 6, "< 1234 >", "Your pin is < 1234 >")),
+    ("voice_token", ("2348012345678", 3, 5, 6)),
+    ("voice_call", ("2348012345678", 12345, 3, 5, 5)),
+    ("in_app_token", ("2348012345678", 3, 5, 6)),
+    ("verify_token", ("pin-id", "123456")),
+    ("search_number_status", ("2348012345678", "NG")),
+]
+
+@pytest.mark.parametrize("name, args", CALLS)
+def test_sync_and_async_send_the_same_body(name, args):
+    sync_transport = RecordingTransport(TermiiSimulator(seed=1))
+    with Client(API_KEY, transport=sync_transport) as client:
+        getattr(client, name)(*args)
+
+    async_transport = AsyncRecordingTransport(TermiiSimulator(seed=1))
+
+    async def run():
+        async with AsyncClient(API_KEY, transport=async_transport) as client:
+            await getattr(client, name)(*args)
+
+    asyncio.run(run())
+    assert sync_transport.bodies == async_transport.bodies
+    assert sync_transport.bodies[0][2]["api_key"] == API_KEY
+
+def test_campaign_schedule_is_sent():
+    transport = RecordingTransport(TermiiSimulator(seed=1))
+    with Client(API_KEY, transport=transport) as client:
+        client.send_campaign("234", "Acme", "Hello", "generic", "plain", "1", "personalized",
+            schedule_sms_status="scheduled", schedule_time="30-06-2021 6:00")
+    assert transport.bodies[0][2]["schedule_time"] == "30-06-2021 6:00"
+
+def _upload_client(simulator):
+    return AsyncClient(API_KEY, transport=AsyncSimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0))
+
+@pytest.mark.parametrize("source", ["path", "file", "lines"])
+def test_add_contacts_streams_the_contact_file_field(tmp_path, source):
+    simulator = TermiiSimulator(seed=1)
+    path = tmp_path / "contacts.csv"
+    path.write_text("2348012345678\n2348012345679\n")
+
+    async def run():
+        async with _upload_client(simulator) as client:
+            await client.create_phonebook("Customers", "customers")
+            phonebook_id = next(iter(simulator.phonebooks))
+            if source == "path":
+                contact_file = str(path)
+            elif source == "file":
+                contact_file = open(path, "rb")
+            else:
+                contact_file = (line for line in ["2348012345678\n", "2348012345679\n"])
+            return await client.add_contacts(contact_file, "234", "text/csv", phonebook_id), phonebook_id
+
+    response, phonebook_id = asyncio.run(run())
+    assert response == {"message": "Your list is being uploaded in the background."}
+    numbers = sorted(contact["phone_number"] for contact in simulator.contacts.values() if contact["pid"] == phonebook_id)
+    assert numbers == ["2348012345678", "2348012345679"]
+
+def test_upload_contacts_splits_and_reports_every_part(tmp_path):
+    simulator = TermiiSimulator(seed=1)
+    path = tmp_path / "contacts.csv"
+    path.write_text("".join(f"23480{index:08d}\n" for index in range(1000)))
+
+    async def run():
+        async with _upload_client(simulator) as client:
+            await client.create_phonebook("Customers", "customers")
+            phonebook_id = next(iter(simulator.phonebooks))
+            return await client.upload_contacts(str(path), "234", "text/csv", phonebook_id, split_size=2000, max_workers=3), phonebook_id
+
+    result, phonebook_id = asyncio.run(run())
+    assert result.ok and len(result.chunks) > 1
+    assert sum(1 for contact in simulator.contacts.values() if contact["pid"] == phonebook_id) == 1000
+
+def test_normaliser_checks_numbers_before_sending():
+    simulator = TermiiSimulator(seed=1)
+
+    async def run():
+        async with AsyncClient(API_KEY, transport=AsyncSimulatorTransport(simulator), normaliser=NumberNormaliser("234")) as client:
+            await client.send_message("08012345678", "Acme", "Hello", "plain", "generic", {})
+
+    asyncio.run(run())
+    assert simulator.history[-1]["receiver"] == "2348012345678"
+
+def test_templated_send_reports_an_empty_text_as_a_failed_group(client):
+    simulator = TermiiSimulator(seed=1)
+    records = [{"name": "Ada", "phone_number": "2348012345678"}, {"name": "", "phone_number": "2348012345679"}]
+
+    async def run():
+        async with AsyncClient(API_KEY, transport=AsyncSimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0)) as async_client:
+            return await async_client.send_templated("{name}", records, "Acme", "plain", "generic")
+
+    result = asyncio.run(run())
+    expected = client.send_templated("{name}", records, "Acme", "plain", "generic")
+    outcomes = sorted((chunk.message, chunk.ok) for chunk in result.chunks)
+    assert outcomes == [("", False), ("Ada", True)]
+    assert outcomes == sorted((chunk.message, chunk.ok) for chunk in expected.chunks)
+
+def test_async_client_has_every_client_method_but_outbox():
+    sync_methods = {name for name in dir(Client) if not name.startswith("_")}
+    async_methods = {name for name in dir(AsyncClient) if not name.startswith("_")}
+    assert sync_methods - async_methods == {"outbox"}
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from termii.client import Client
+from termii.phone_numbers import NumberNormaliser
+from termii.retry import RetryPolicy
+from termii.simulator import TermiiSimulator, SimulatorTransport
+from termii.utilities import APIError, InvalidPhoneNumber
+
+from conftest import API_KEY
+
+NUMBERS = [f"23480{index:08d}" for index in range(25)]
+
+def test_chunks_are_sent_with_their_status_code(client):
+    result = client.send_bulk_sms_chunked(NUMBERS, "Termii", "Hello", "plain", "generic", chunk_size=10)
+    assert result.ok and result.sent == 25
+    assert [chunk.status_code for chunk in result.chunks] == [200, 200, 200]
+
+def test_rejected_chunks_are_failed(simulator):
+    with Client("", transport=SimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0)) as client:
+        result = client.send_bulk_sms_chunked(NUMBERS, "Termii", "Hello", "plain", "generic", chunk_size=10)
+    assert not result.ok and result.sent == 0
+    chunk = result.chunks[0]
+    assert chunk.status_code == 401
+    assert isinstance(chunk.error, APIError)
+    assert chunk.response == {"message": "Unauthenticated."}
+
+def test_throttled_chunks_are_failed():
+    simulator = TermiiSimulator(seed=1, throttle_rate=1)
+    with Client("test-api-key", transport=SimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0)) as client:
+        result = client.send_bulk_sms_chunked(NUMBERS, "Termii", "Hello", "plain", "generic", chunk_size=10)
+    assert [chunk.status_code for chunk in result.failed] == [429, 429, 429]
+
+def test_send_many_fails_rejected_messages(simulator):
+    messages = [{"number_to": number, "sender_id": "Termii", "message": "Hello"} for number in NUMBERS[:3]]
+    with Client("", transport=SimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0)) as client:
+        results = list(client.send_many(messages, ordered=True))
+    assert [result.ok for result in results] == [False, False, False]
+    assert results[0].status_code == 401 and results[0].response == {"message": "Unauthenticated."}
+
+def test_send_many_records_the_status_of_sent_messages(client):
+    messages = [{"number_to": number, "sender_id": "Termii", "message": "Hello"} for number in NUMBERS[:3]]
+    results = list(client.send_many(messages, ordered=True))
+    assert [(result.ok, result.status_code) for result in results] == [(True, 200)] * 3
+
+def test_send_many_ordered_yields_in_input_order():
+    simulator = TermiiSimulator(seed=1, latency=0.002, jitter=0.004)
+    messages = [{"number_to": number, "sender_id": "Termii", "message": f"Hello {number}"} for number in NUMBERS]
+    messages[7] = "not a message"
+    with Client(API_KEY, transport=SimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0)) as client:
+        results = list(client.send_many(iter(messages), max_workers=4, ordered=True))
+    assert [result.index for result in results] == list(range(len(NUMBERS)))
+    assert [result.message for result in results] == messages
+    assert [index for index, result in enumerate(results) if not result.ok] == [7]
+    assert simulator.requests == len(NUMBERS) - 1
+
+def test_rejected_uploads_are_failed(simulator, tmp_path):
+    path = tmp_path / "contacts.csv"
+    path.write_text("2348012345678\n")
+    with Client("test-api-key", transport=SimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0)) as client:
+        result = client.upload_contacts(str(path), "234", "text/csv", "missing-phonebook")
+    assert not result.ok
+    assert result.chunks[0].status_code == 404
+
+def test_async_chunks_are_failed_on_error_status():
+    pytest.importorskip("httpx")
+    from termii.async_client import AsyncClient
+    from termii.simulator import AsyncSimulatorTransport
+
+    async def run():
+        async with AsyncClient("", transport=AsyncSimulatorTransport(TermiiSimulator(seed=1)), retry_policy=RetryPolicy(max_retries=0)) as client:
+            return await client.send_bulk_sms_chunked(NUMBERS, "Termii", "Hello", "plain", "generic", chunk_size=10)
+
+    result = asyncio.run(run())
+    assert not result.ok
+    assert {chunk.status_code for chunk in result.chunks} == {401}
+
+def _broken_stream():
+    yield from NUMBERS[:15]
+    raise OSError("stream lost")
+
+def test_failing_recipient_stream_keeps_the_chunks_read(client, simulator):
+    result = client.send_bulk_sms_chunked(_broken_stream(), "Termii", "Hello", "plain", "generic", chunk_size=10)
+    assert result.sent == 10 and simulator.requests == 1
+    assert [(chunk.index, chunk.size) for chunk in result.chunks] == [(0, 10), (1, 0)]
+    assert isinstance(result.chunks[-1].error, OSError)
+
+def test_invalid_number_from_the_normaliser_keeps_the_chunks_read(simulator):
+    with Client(API_KEY, transport=SimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0), normaliser=NumberNormaliser()) as client:
+        result = client.send_bulk_sms_chunked(NUMBERS[:3] + ["12"], "Termii", "Hello", "plain", "generic", chunk_size=1)
+    assert not result.ok
+    assert isinstance(result.failed[0].error, InvalidPhoneNumber)
+
+def test_async_failing_recipient_stream_keeps_the_chunks_read(simulator):
+    pytest.importorskip("httpx")
+    from termii.async_client import AsyncClient
+    from termii.simulator import AsyncSimulatorTransport
+
+    async def run():
+        async with AsyncClient(API_KEY, transport=AsyncSimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0)) as client:
+            return await client.send_bulk_sms_chunked(_broken_stream(), "Termii", "Hello", "plain", "generic", chunk_size=10)
+
+    result = asyncio.run(run())
+    assert result.sent == 10
+    assert [(chunk.index, chunk.size) for chunk in result.chunks] == [(0, 10), (1, 0)]
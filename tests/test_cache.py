@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import pytest
+
+from termii.cache import MISSING, TTLCache
+from termii.client import Client
+from termii.retry import RetryPolicy
+from termii.pagination import DEFAULT_PAGE_SIZE
+from termii.simulator import TermiiSimulator, SimulatorTransport
+
+from conftest import API_KEY
+
+COUNT = DEFAULT_PAGE_SIZE * 2 + 5
+
+def _seed(simulator):
+    for index in range(COUNT):
+        simulator.sender_ids[f"Sender{index}"] = {"sender_id": f"Sender{index}", "status": "active"}
+        simulator.phonebooks[f"book{index}"] = {"id": f"book{index}", "name": f"Book {index}"}
+
+def test_lookups_index_every_page(simulator):
+    _seed(simulator)
+    with Client(API_KEY, transport=SimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0), listing_ttl=60) as client:
+        assert client.has_sender_id(f"Sender{COUNT - 1}")
+        assert client.has_phonebook(f"book{COUNT - 1}")
+        assert not client.has_phonebook("missing")
+        requests = simulator.requests
+        assert client.has_sender_id("Sender0")
+        assert len(client.fetch_sender_ids()["data"]) == COUNT + 1
+    assert simulator.requests == requests
+
+def test_lookups_without_a_cache_index_every_page(client, simulator):
+    _seed(simulator)
+    assert client.has_sender_id(f"Sender{COUNT - 1}")
+
+def test_failed_listing_is_not_cached(simulator):
+    with Client("", transport=SimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0), listing_ttl=60) as client:
+        assert client.fetch_phonebooks() == {"message": "Unauthenticated."}
+        assert not client.has_phonebook("book0")
+    assert simulator.requests == 2
+
+def test_async_lookups_index_every_page():
+    pytest.importorskip("httpx")
+    from termii.async_client import AsyncClient
+    from termii.simulator import AsyncSimulatorTransport
+
+    simulator = TermiiSimulator(seed=1)
+    _seed(simulator)
+
+    async def run():
+        async with AsyncClient(API_KEY, transport=AsyncSimulatorTransport(simulator), listing_ttl=60) as client:
+            return await client.has_sender_id(f"Sender{COUNT - 1}"), await client.has_phonebook(f"book{COUNT - 1}")
+
+    assert asyncio.run(run()) == (True, True)
+
+def test_ttl_cache_evicts_the_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is MISSING
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert (cache.hits, cache.misses, len(cache)) == (3, 1, 2)
+
+def test_ttl_cache_entries_expire():
+    cache = TTLCache(ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a", None) is None
+    assert len(cache) == 0 and cache.misses == 1
+
+def test_number_lookups_are_cached_unless_bypassed(simulator):
+    cache = TTLCache()
+    with Client(API_KEY, transport=SimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0), lookup_cache=cache) as client:
+        first = client.search_number("2348012345678")
+        assert client.search_number("2348012345678") == first
+        assert simulator.requests == 1 and cache.hits == 1
+        client.search_number("2348012345678", bypass_cache=True)
+        assert simulator.requests == 2
+        client.search_number_status("2348012345678", "NG")
+        client.search_number_status("2348012345678", "NG")
+    assert simulator.requests == 3
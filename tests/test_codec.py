@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from termii import codec
+from termii.codec import JSONCodec, get_codec, set_default_codec
+from termii.metrics import MetricsRecorder
+from termii.session import TermiiSession, get_session
+from termii.simulator import SimulatorTransport
+
+@pytest.fixture
+def custom_codec():
+    previous = codec.default_codec
+    custom = JSONCodec("custom", lambda obj: json.dumps(obj).encode(), json.loads)
+    yield custom
+    set_default_codec(previous)
+
+def test_default_session_follows_set_default_codec(custom_codec):
+    session = get_session()
+    set_default_codec(custom_codec)
+    assert get_session() is session
+    assert session.codec is custom_codec
+
+def test_session_with_hooks_follows_set_default_codec(custom_codec):
+    session = TermiiSession(transport=SimulatorTransport(), hooks=[MetricsRecorder()])
+    set_default_codec(custom_codec)
+    assert session.codec.wrapped is custom_codec
+    assert session.codec is session.codec
+    assert "balance" in session.codec.decode(session.get("https://api.ng.termii.com/api/get-balance", params={"api_key": "key"}))
+
+def test_session_codec_passed_explicitly_is_kept(custom_codec):
+    session = TermiiSession(codec="json", transport=SimulatorTransport())
+    set_default_codec(custom_codec)
+    assert session.codec.name == "json"
+    assert get_codec() is custom_codec
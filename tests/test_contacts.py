@@ -0,0 +1,59 @@
+from itertools import islice
+
+import pytest
+
+from termii.client import Client
+from termii.contacts import ContactImport, parse_contacts
+from termii.phone_numbers import NumberNormaliser
+from termii.retry import RetryPolicy
+from termii.simulator import SimulatorTransport
+
+from conftest import API_KEY
+
+LINES = ["name,phone\n", "Ada,08012345678\n", "Bola,+234 801 234 5678\n", "Chi,12\n", "Dayo,08012345679\n"]
+
+def test_parse_contacts_skips_blank_rows():
+    assert list(parse_contacts(["a,1\n", "\n", " , \n", "b,2\n"])) == [["a", "1"], ["b", "2"]]
+
+def test_import_cleans_the_file(tmp_path):
+    path = tmp_path / "contacts.csv"
+    path.write_text("".join(LINES))
+    contacts = ContactImport(str(path), "234", phone_column=1, header=True)
+    assert list(contacts) == ["name,phone\n", "Ada,2348012345678\n", "Dayo,2348012345679\n"]
+    assert (contacts.rows, contacts.unique, contacts.invalid, contacts.duplicates) == (4, 2, 1, 1)
+
+def test_iterating_again_starts_from_scratch(tmp_path):
+    path = tmp_path / "contacts.csv"
+    path.write_text("".join(LINES))
+    contacts = ContactImport(str(path), "234", phone_column=1, header=True)
+    first = list(contacts)
+    assert list(contacts) == first
+    assert (contacts.rows, contacts.unique, contacts.invalid, contacts.duplicates) == (4, 2, 1, 1)
+
+def test_client_uploads_an_import_as_it_is(simulator):
+    # The import keeps its own normalise, which the normaliser of the client would reject.
+    simulator.phonebooks["book"] = {"id": "book", "name": "Book"}
+    contacts = ContactImport(["1001\n", "1002\n", "1001\n"], "234", normalise=lambda number, country_code: number)
+    with Client(API_KEY, transport=SimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0), normaliser=NumberNormaliser()) as client:
+        client.upload_contacts(contacts, "234", "text/csv", "book")
+    assert sorted(contact["phone_number"] for contact in simulator.contacts.values()) == ["1001", "1002"]
+    assert (contacts.rows, contacts.unique, contacts.duplicates) == (3, 2, 1)
+
+def _phonebook(simulator, count):
+    simulator.phonebooks["book"] = {"id": "book", "name": "Book"}
+    for index in range(count):
+        simulator.contacts[index] = {"id": index, "pid": "book", "phone_number": f"23480{index:08d}"}
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_iter_contacts_walks_every_page(client, simulator, prefetch):
+    _phonebook(simulator, 45)
+    contacts = list(client.iter_contacts("book", page_size=10, prefetch=prefetch))
+    assert [contact["id"] for contact in contacts] == list(range(45))
+    assert simulator.requests == 5
+
+def test_iter_contacts_stops_fetching_when_closed(client, simulator):
+    _phonebook(simulator, 45)
+    contacts = client.iter_contacts("book", page_size=10)
+    assert [contact["id"] for contact in islice(contacts, 12)] == list(range(12))
+    contacts.close()
+    assert simulator.requests == 2
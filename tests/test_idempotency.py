@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+import requests
+
+from termii.client import Client
+from termii.idempotency import IdempotencyGuard, fingerprint
+from termii.retry import RetryPolicy
+from termii.simulator import TermiiSimulator, SimulatorTransport
+from termii.utilities import APIError, DuplicateSend, WrongType
+
+KEY = fingerprint("2348012345678", "Termii", "Hello", "generic")
+
+def _client(simulator, guard):
+    return Client("test-api-key", transport=SimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0), idempotency_guard=guard)
+
+def test_repeat_of_an_accepted_send_is_suppressed(simulator):
+    guard = IdempotencyGuard()
+    with _client(simulator, guard) as client:
+        first = client.send_message("2348012345678", "Termii", "Hello", "plain", "generic", {})
+        second = client.send_message("2348012345678", "Termii", "Hello", "plain", "generic", {})
+    assert first == second
+    assert simulator.requests == 1 and guard.suppressed == 1
+
+def test_throttled_send_is_not_remembered():
+    simulator = TermiiSimulator(seed=1, throttle_rate=1)
+    guard = IdempotencyGuard()
+    with _client(simulator, guard) as client:
+        response = client.send_message("2348012345678", "Termii", "Hello", "plain", "generic", {})
+        assert response == {"message": "Too Many Attempts."}
+        assert len(guard) == 0
+        simulator.throttle_rate = 0
+        response = client.send_message("2348012345678", "Termii", "Hello", "plain", "generic", {})
+    assert "message_id" in response
+    assert simulator.requests == 2
+
+def test_server_error_is_uncertain():
+    simulator = TermiiSimulator(seed=1, error_rate=1)
+    guard = IdempotencyGuard()
+    with _client(simulator, guard) as client:
+        first = client.send_bulk_sms_chunked(["2348012345678"], "Termii", "Hello", "plain", "generic")
+        second = client.send_bulk_sms_chunked(["2348012345678"], "Termii", "Hello", "plain", "generic")
+    assert first.chunks[0].status_code == 500
+    assert isinstance(second.chunks[0].error, DuplicateSend)
+    assert simulator.requests == 1
+
+def test_read_timeout_is_uncertain():
+    simulator = TermiiSimulator(seed=1, timeout_rate=1)
+    guard = IdempotencyGuard()
+    with _client(simulator, guard) as client:
+        with pytest.raises(requests.ReadTimeout):
+            client.send_message("2348012345678", "Termii", "Hello", "plain", "generic", {})
+        simulator.timeout_rate = 0
+        with pytest.raises(DuplicateSend):
+            client.send_message("2348012345678", "Termii", "Hello", "plain", "generic", {})
+    assert simulator.requests == 1 and guard.suppressed == 1
+
+def test_connect_error_releases_the_key():
+    simulator = TermiiSimulator(seed=1, connect_error_rate=1)
+    guard = IdempotencyGuard()
+    with _client(simulator, guard) as client:
+        with pytest.raises(requests.ConnectTimeout):
+            client.send_message("2348012345678", "Termii", "Hello", "plain", "generic", {})
+        simulator.connect_error_rate = 0
+        response = client.send_message("2348012345678", "Termii", "Hello", "plain", "generic", {})
+    assert "message_id" in response
+
+def test_rejected_and_invalid_sends_release_the_key():
+    guard = IdempotencyGuard()
+
+    def rejected():
+        raise APIError(400, {"message": "Invalid sender id"})
+
+    def invalid():
+        raise WrongType("str", "sender_id")
+
+    with pytest.raises(APIError):
+        guard.run(KEY, rejected)
+    with pytest.raises(WrongType):
+        guard.run(KEY, invalid)
+    assert len(guard) == 0
+
+def test_error_without_transport_is_uncertain():
+    guard = IdempotencyGuard()
+
+    def send():
+        raise ConnectionError("reset")
+
+    with pytest.raises(ConnectionError):
+        guard.run(KEY, send)
+    with pytest.raises(DuplicateSend) as raised:
+        guard.run(KEY, lambda: {"message": "ok"})
+    assert isinstance(raised.value.error, ConnectionError)
+
+def test_send_in_flight_raises_duplicate():
+    guard = IdempotencyGuard()
+
+    def send():
+        with pytest.raises(DuplicateSend):
+            guard.run(KEY, lambda: {"message": "second"})
+        return {"message": "first"}
+
+    assert guard.run(KEY, send) == {"message": "first"}
+
+def test_cancelled_async_send_releases_the_key():
+    guard = IdempotencyGuard()
+
+    async def run():
+        async def send():
+            await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(guard.run_async(KEY, send))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert len(guard) == 0
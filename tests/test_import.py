@@ -0,0 +1,21 @@
+import importlib.util
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# The test shares the budget and the measurement of the import benchmark.
+_spec = importlib.util.spec_from_file_location("bench_import", os.path.join(ROOT, "benchmarks", "bench_import.py"))
+bench_import = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(bench_import)
+
+def test_import_is_fast_and_loads_no_http_stack():
+    milliseconds, heavy = bench_import.measure("import termii", 3)
+    assert heavy == ""
+    assert milliseconds < bench_import.DEFAULT_BUDGET_MS
+
+def test_client_is_loaded_on_first_use():
+    script = "import sys, termii; print(termii.Client.__module__, 'termii.client' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert output.split() == ["termii.client", "True"]
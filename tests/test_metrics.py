@@ -0,0 +1,32 @@
+from termii.client import Client
+from termii.metrics import MetricsRecorder, endpoint_name
+from termii.retry import RetryPolicy
+from termii.simulator import TermiiSimulator, SimulatorTransport
+
+from conftest import API_KEY
+
+def test_endpoint_name_groups_ids():
+    assert endpoint_name("https://api.ng.termii.com/api/phonebooks/12/contacts") == "phonebooks/{id}/contacts"
+    assert endpoint_name("https://api.ng.termii.com/api/sms/send") == "sms/send"
+
+def test_recorder_counts_statuses_and_retries():
+    simulator = TermiiSimulator(seed=1, error_rate=1)
+    recorder = MetricsRecorder()
+    policy = RetryPolicy(max_retries=2, backoff_factor=0.001, retry_non_idempotent=True)
+    with Client(API_KEY, transport=SimulatorTransport(simulator), retry_policy=policy, hooks=[recorder]) as client:
+        client.send_message("2348012345678", "Termii", "Hello", "plain", "generic", {})
+    series = recorder.snapshot()[("sms/send", "POST")]
+    assert series["count"] == 1 and series["retries"] == 2
+    assert series["statuses"] == {"500": 1}
+    assert series["bytes_out"] > 0 and series["bytes_in"] > 0
+
+def test_prometheus_exposition():
+    simulator = TermiiSimulator(seed=1)
+    recorder = MetricsRecorder(buckets=(0.1, 1))
+    with Client(API_KEY, transport=SimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0), hooks=[recorder]) as client:
+        client.get_balance()
+    text = recorder.to_prometheus()
+    assert 'termii_client_request_duration_seconds_bucket{endpoint="get-balance",method="GET",le="+Inf"} 1' in text
+    assert 'termii_client_responses_total{endpoint="get-balance",method="GET",status="200"} 1' in text
+    recorder.reset()
+    assert recorder.snapshot() == {}
@@ -0,0 +1,77 @@
+import threading
+import time
+
+from termii.client import Client
+from termii.outbox import PENDING
+from termii.retry import RetryPolicy
+from termii.simulator import TermiiSimulator, SimulatorTransport
+from termii.utilities import APIError
+
+def _client(simulator, api_key="test-api-key"):
+    return Client(api_key, transport=SimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0))
+
+def test_queued_messages_are_sent(simulator, tmp_path):
+    results = []
+    with _client(simulator) as client:
+        with client.outbox(str(tmp_path / "outbox.db"), workers=2, on_result=lambda *result: results.append(result)) as outbox:
+            for index in range(5):
+                outbox.enqueue_message(f"23480{index:08d}", "Termii", "Hello")
+    assert len(results) == 5
+    assert all(error is None and "message_id" in response for _, _, response, error in results)
+
+def test_close_without_flush_leaves_the_queue(tmp_path):
+    simulator = TermiiSimulator(seed=1, latency=0.05)
+    with _client(simulator) as client:
+        outbox = client.outbox(str(tmp_path / "outbox.db"), workers=1)
+        for index in range(20):
+            outbox.enqueue_message(f"23480{index:08d}", "Termii", "Hello")
+        outbox.close(flush=False)
+        assert simulator.requests < 5
+
+        outbox = client.outbox(str(tmp_path / "outbox.db"), workers=0)
+        counts = outbox.counts()
+        outbox.close()
+    assert counts == {PENDING: 20 - simulator.requests}
+
+def test_rejected_send_fails_at_once(simulator, tmp_path):
+    results = []
+    with _client(simulator, api_key="") as client:
+        with client.outbox(str(tmp_path / "outbox.db"), workers=1, on_result=lambda *result: results.append(result)) as outbox:
+            outbox.enqueue_message("2348012345678", "Termii", "Hello")
+        assert simulator.requests == 1
+
+    (_, _, response, error), = results
+    assert isinstance(error, APIError) and error.status_code == 401
+    assert response == {"message": "Unauthenticated."}
+
+def test_throttled_send_is_retried(tmp_path):
+    simulator = TermiiSimulator(seed=1, throttle_rate=1)
+    done = threading.Event()
+    with _client(simulator) as client:
+        outbox = client.outbox(str(tmp_path / "outbox.db"), workers=1, retry_delay=0.01, max_attempts=3, on_result=lambda *result: done.set())
+        outbox.enqueue_message("2348012345678", "Termii", "Hello")
+        assert done.wait(5)
+        failed = outbox.failed()
+        outbox.close()
+    assert simulator.requests == 3
+    assert failed[0][3].startswith("APIError")
+
+def test_server_error_is_retried_until_sent(tmp_path):
+    simulator = TermiiSimulator(seed=1, error_rate=1)
+    results = []
+    done = threading.Event()
+
+    def on_result(*result):
+        results.append(result)
+        done.set()
+
+    with _client(simulator) as client:
+        outbox = client.outbox(str(tmp_path / "outbox.db"), workers=1, retry_delay=0.05, on_result=on_result)
+        outbox.enqueue_message("2348012345678", "Termii", "Hello")
+        while simulator.requests < 1:
+            time.sleep(0.001)
+        simulator.error_rate = 0
+        assert done.wait(5)
+        outbox.close()
+    (_, _, response, error), = results
+    assert error is None and "message_id" in response
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from termii.pagination import page_items, iter_pages, aiter_pages
+from termii.termii_insight import HISTORY_URL
+from termii.termii_switch import PHONEBOOKS_URL
+from termii.session import TermiiSession
+from termii.simulator import TermiiSimulator, SimulatorTransport
+
+from conftest import API_KEY
+
+class CountingTransport(SimulatorTransport):
+    def __init__(self, simulator):
+        super().__init__(simulator)
+        self.pages = []
+
+    def send(self, method, url, **kwargs):
+        self.pages.append((kwargs.get("params") or {}).get("page"))
+        return super().send(method, url, **kwargs)
+
+def test_plain_list_longer_than_the_page_is_the_last():
+    assert page_items(list(range(30)), 10) == (list(range(30)), False, None)
+
+def test_repeated_plain_list_ends_the_listing():
+    assert page_items(list(range(10)), 10) == (list(range(10)), True, None)
+    assert page_items(list(range(10)), 10, previous=list(range(10))) == ([], False, None)
+
+def test_history_that_ignores_pages_is_walked_once(client, simulator):
+    simulator.seed_history(20)
+    reports = list(client.iter_history(page_size=20, prefetch=0))
+    assert len(reports) == 20
+    assert simulator.requests == 2
+
+@pytest.mark.parametrize("count", [0, 7, 15, 45])
+def test_prefetch_never_fetches_past_the_last_page(simulator, count):
+    simulator.phonebooks["book"] = {"id": "book", "name": "Book"}
+    for index in range(count):
+        simulator.contacts[index] = {"id": index, "pid": "book", "phone_number": f"23480{index:08d}"}
+    transport = CountingTransport(simulator)
+    session = TermiiSession(transport=transport)
+    pages = list(iter_pages(session, f"{PHONEBOOKS_URL}/book/contacts", {"api_key": API_KEY}, page_size=15, prefetch=4))
+    session.close()
+    assert sum(len(page) for page in pages) == count
+    assert sorted(transport.pages) == list(range(1, max(1, -(-count // 15)) + 1))
+
+def test_async_pages_stop_on_a_repeated_list():
+    pytest.importorskip("httpx")
+    from termii.async_session import AsyncTermiiSession
+    from termii.simulator import AsyncSimulatorTransport
+
+    simulator = TermiiSimulator(seed=1)
+    simulator.seed_history(10)
+
+    async def run():
+        session = AsyncTermiiSession(transport=AsyncSimulatorTransport(simulator))
+        try:
+            return [page async for page in aiter_pages(session, HISTORY_URL, {"api_key": API_KEY}, page_size=10, prefetch=3)]
+        finally:
+            await session.close()
+
+    pages = asyncio.run(run())
+    assert [len(page) for page in pages] == [10]
+    assert simulator.requests == 2
+
+class AheadTransport(SimulatorTransport):
+    # Notes the most pages requested ahead of the pages the caller has been given.
+    def __init__(self, simulator):
+        super().__init__(simulator)
+        self.lock = threading.Lock()
+        self.started = 0
+        self.consumed = 0
+        self.most_ahead = 0
+
+    def send(self, method, url, **kwargs):
+        with self.lock:
+            self.started += 1
+            self.most_ahead = max(self.most_ahead, self.started - self.consumed - 1)
+        return super().send(method, url, **kwargs)
+
+def test_prefetch_requests_at_most_prefetch_pages_ahead(simulator):
+    simulator.phonebooks["book"] = {"id": "book", "name": "Book"}
+    for index in range(100):
+        simulator.contacts[index] = {"id": index, "pid": "book", "phone_number": f"23480{index:08d}"}
+    transport = AheadTransport(simulator)
+    session = TermiiSession(transport=transport, pool_size=8)
+    count = 0
+    for page in iter_pages(session, f"{PHONEBOOKS_URL}/book/contacts", {"api_key": API_KEY}, page_size=10, prefetch=2):
+        with transport.lock:
+            transport.consumed += 1
+        time.sleep(0.01)
+        count += len(page)
+    session.close()
+    assert count == 100
+    assert 1 <= transport.most_ahead <= 2
+
+def test_plain_list_is_not_prefetched(simulator):
+    simulator.seed_history(30)
+    transport = CountingTransport(simulator)
+    session = TermiiSession(transport=transport)
+    pages = list(iter_pages(session, HISTORY_URL, {"api_key": API_KEY}, page_size=10, prefetch=4))
+    session.close()
+    assert [len(page) for page in pages] == [30]
+    assert transport.pages == [1]
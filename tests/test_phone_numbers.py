@@ -0,0 +1,28 @@
+import pytest
+
+from termii.phone_numbers import NumberNormaliser, calling_code
+from termii.utilities import InvalidPhoneNumber
+
+def test_national_and_international_formats_agree():
+    normaliser = NumberNormaliser("234")
+    assert normaliser.normalise("0803 123 4567") == "2348031234567"
+    assert normaliser.normalise("+234-803-123-4567") == "2348031234567"
+    assert normaliser.normalise("not a number") is None
+    with pytest.raises(InvalidPhoneNumber):
+        normaliser.check_many(["2348031234567", "123"])
+
+def test_calling_code_of_a_country():
+    assert calling_code("NG") == "234"
+    assert calling_code("gh") == "233"
+    assert calling_code("XX") is None
+
+@pytest.mark.parametrize("number, country, expected", [
+    ("2348012345678", "NG", "2348012345678"),
+    ("08012345678", "NG", "2348012345678"),
+    ("233241234567", "GH", "233241234567"),
+    ("2348012345678", "XX", "2348012345678"),
+])
+def test_number_status_reads_alphabetic_country_codes(client, number, country, expected):
+    response = client.search_number_status(number, country)
+    detail = response["result"][0]
+    assert detail["routeDetail"]["number"] == expected
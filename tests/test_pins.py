@@ -0,0 +1,60 @@
+import time
+
+from termii.client import Client
+from termii.pins import PinLedger, pin_id_of
+from termii.retry import RetryPolicy
+from termii.simulator import SimulatorTransport
+
+from conftest import API_KEY
+
+def _client(simulator, ledger):
+    return Client(API_KEY, transport=SimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=0), pin_ledger=ledger)
+
+def _send(client, pin_attempts=1):
+    return client.send_token("NUMERIC", "2348012345678", "Termii", "generic", pin_attempts, 5, 6, "< 1234 >", "Your pin is < 1234 >")
+
+def test_pin_id_of_reads_every_response_shape():
+    assert pin_id_of({"pinId": "a"}) == "a"
+    assert pin_id_of({"data": {"pin_id": 7}}) == "7"
+    assert pin_id_of({"message": "Insufficient balance"}) is None
+    assert pin_id_of(None) is None
+
+def test_verify_without_attempts_left_is_answered_locally(simulator):
+    ledger = PinLedger()
+    with _client(simulator, ledger) as client:
+        pin_id = _send(client)["pinId"]
+        assert client.verify_token(pin_id, "000000")["verified"] is False
+        requests = simulator.requests
+        response = client.verify_token(pin_id, "000000")
+    assert response["message"] == "Pin attempts exceeded"
+    assert simulator.requests == requests and ledger.answered == 1
+
+def test_verified_pin_is_answered_locally(simulator):
+    ledger = PinLedger()
+    with _client(simulator, ledger) as client:
+        pin_id = _send(client, pin_attempts=3)["pinId"]
+        assert client.verify_token(pin_id, simulator.pins[pin_id]["pin"])["verified"] is True
+        response = client.verify_token(pin_id, "000000")
+    assert response["message"] == "Pin already verified"
+    assert ledger.answered == 1
+
+def test_expired_pin_is_answered_locally():
+    ledger = PinLedger(grace=0)
+    ledger.record("a", 1, 3, "2348012345678", started=time.monotonic() - 61)
+    assert ledger.check("a")["verified"] == "Expired"
+    assert ledger.check("unknown") is None
+
+def test_unknown_answer_leaves_the_pin_to_termii():
+    ledger = PinLedger()
+    ledger.record("a", 5, 3)
+    ledger.settle("a", {"status": 404, "message": "Pin not found"})
+    assert len(ledger) == 0
+
+def test_full_ledger_records_nothing():
+    ledger = PinLedger(max_entries=1)
+    ledger.record("a", 5, 3)
+    ledger.record("b", 5, 3)
+    assert len(ledger) == 1
+    ledger.record("c", 90, 3)
+    ledger.clear()
+    assert len(ledger) == 0
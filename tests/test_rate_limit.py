@@ -0,0 +1,34 @@
+import asyncio
+import time
+
+import pytest
+
+from termii.rate_limit import RateLimiter, TokenBucket, endpoint_group
+
+@pytest.mark.parametrize("url, group", [
+    ("https://api.ng.termii.com/api/sms/send/bulk", "bulk"),
+    ("https://api.ng.termii.com/api/sms/otp/verify", "token"),
+    ("https://api.ng.termii.com/api/insight/number/query", "insight"),
+    ("https://api.ng.termii.com/api/sms/send", "switch"),
+])
+def test_endpoint_group(url, group):
+    assert endpoint_group(url) == group
+
+def test_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(20, 3)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.09
+
+def test_limiter_leaves_other_groups_alone():
+    limiter = RateLimiter({"token": (1, 1)})
+    start = time.monotonic()
+    for _ in range(20):
+        limiter.acquire("https://api.ng.termii.com/api/sms/send")
+    asyncio.run(limiter.acquire_async("https://api.ng.termii.com/api/sms/otp/send"))
+    assert time.monotonic() - start < 0.5
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
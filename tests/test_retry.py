@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+import requests
+
+from termii.client import Client
+from termii.retry import RetryPolicy
+from termii.simulator import TermiiSimulator, SimulatorTransport
+from termii.utilities import APIError
+
+from conftest import API_KEY
+
+POLICY = RetryPolicy(max_retries=2, backoff_factor=0.001)
+
+class GatewayTimeoutTransport(SimulatorTransport):
+    # Answers every request with the html page of a gateway timeout.
+    def send(self, method, url, **kwargs):
+        self.simulator.requests += 1
+        response = requests.Response()
+        response.status_code = 504
+        response._content = b"<html><body>504 Gateway Time-out</body></html>"
+        response.url = url
+        return response
+
+def test_transient_server_errors_are_retried():
+    simulator = TermiiSimulator(seed=1, error_rate=0.5)
+    with Client(API_KEY, transport=SimulatorTransport(simulator), retry_policy=RetryPolicy(max_retries=10, backoff_factor=0.001)) as client:
+        response = client.get_balance()
+    assert "balance" in response
+    assert simulator.statuses[500] > 0
+
+def test_campaign_history_raises_once_retries_run_out():
+    simulator = TermiiSimulator(seed=1, error_rate=1)
+    with Client(API_KEY, transport=SimulatorTransport(simulator), retry_policy=POLICY) as client:
+        with pytest.raises(APIError) as raised:
+            client.fetch_campaign_history("campaign")
+    assert raised.value.status_code == 500 and raised.value.decoded
+    assert simulator.requests == 3
+
+def test_html_error_page_raises_a_typed_error():
+    simulator = TermiiSimulator(seed=1)
+    with Client(API_KEY, transport=GatewayTimeoutTransport(simulator), retry_policy=POLICY) as client:
+        with pytest.raises(APIError) as raised:
+            client.fetch_campaign_history("campaign")
+        assert raised.value.status_code == 504 and not raised.value.decoded
+        with pytest.raises(APIError):
+            client.get_balance()
+
+def test_async_campaign_history_raises_once_retries_run_out():
+    pytest.importorskip("httpx")
+    from termii.async_client import AsyncClient
+    from termii.simulator import AsyncSimulatorTransport
+
+    async def run():
+        async with AsyncClient(API_KEY, transport=AsyncSimulatorTransport(TermiiSimulator(seed=1, error_rate=1)), retry_policy=POLICY) as client:
+            await client.fetch_campaign_history("campaign")
+
+    with pytest.raises(APIError):
+        asyncio.run(run())
@@ -0,0 +1,56 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from termii import termii_insight
+from termii.client import Client
+from termii.session import TermiiSession, get_session
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        content = json.dumps({"user": "Test", "balance": 10, "currency": "NGN"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+class _CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    connections = 0
+
+    def get_request(self):
+        self.connections += 1
+        return super().get_request()
+
+@pytest.fixture
+def server():
+    server = _CountingServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_default_session_is_shared():
+    assert get_session() is get_session()
+    session = TermiiSession()
+    assert get_session(session) is session
+
+def test_requests_reuse_one_connection(server):
+    with Client("key", base_url=f"http://127.0.0.1:{server.server_address[1]}") as client:
+        for _ in range(5):
+            assert client.get_balance()["balance"] == 10
+    assert server.connections == 1
+
+def test_endpoint_functions_use_the_passed_session(client, simulator):
+    termii_insight.check_balance(client.api_key, session=client.session)
+    assert simulator.requests == 1
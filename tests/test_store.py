@@ -0,0 +1,34 @@
+from termii.store import HistoryCursor, MessageStore
+
+def _record(message_id, sent_at, status="DELIVERED"):
+    return {"message_id": message_id, "receiver": "2348012345678", "sender": "Termii", "message": "Hello",
+        "status": status, "channel": "generic", "amount": 1, "created_at": sent_at}
+
+def test_cursor_takes_only_new_messages(tmp_path):
+    with MessageStore(str(tmp_path / "messages.db")) as store:
+        cursor = HistoryCursor(store)
+        reports, done = cursor.take([_record("2", "2024-01-01 10:00:01"), _record("1", "2024-01-01 10:00:00")])
+        assert [report.message_id for report in reports] == ["2", "1"] and not done
+        cursor.save()
+
+        cursor = HistoryCursor(store)
+        page = [_record("4", "2024-01-01 10:00:02"), _record("3", "2024-01-01 10:00:01"), _record("2", "2024-01-01 10:00:01"), _record("1", "2024-01-01 10:00:00")]
+        reports, done = cursor.take(page)
+        assert [report.message_id for report in reports] == ["4", "3"] and done
+
+def test_unsaved_cursor_is_not_moved(tmp_path):
+    with MessageStore(str(tmp_path / "messages.db")) as store:
+        HistoryCursor(store).take([_record("1", "2024-01-01 10:00:00")])
+        assert HistoryCursor(store).sent_at is None
+
+def test_sync_history_writes_new_messages_only(client, simulator, tmp_path):
+    simulator.seed_history(30)
+    with MessageStore(str(tmp_path / "messages.db")) as store:
+        assert client.sync_history(store, page_size=10) == 30
+        assert client.sync_history(store, page_size=10) == 0
+        simulator.seed_history(2)
+        assert client.sync_history(store, page_size=10) == 2
+        assert len(store) == 32
+        assert client.sync_history(store, page_size=10, full=True) == 32
+        message_id = simulator.history[-1]["message_id"]
+        assert store.status(message_id) == "DELIVERED"
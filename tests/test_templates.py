@@ -0,0 +1,33 @@
+import pytest
+
+from termii.templates import MessageTemplate, group_by_text
+from termii.utilities import MissingField, WrongType
+
+def test_render_fills_the_fields():
+    template = MessageTemplate("Hi {name}, 100% off order {order}")
+    assert template.fields == ("name", "order")
+    assert template.render({"name": "Ada", "order": 7}) == "Hi Ada, 100% off order 7"
+
+def test_render_rejects_records_that_are_not_mappings():
+    with pytest.raises(WrongType):
+        MessageTemplate("Hi {name}").render(["Ada"])
+    with pytest.raises(MissingField):
+        MessageTemplate("Hi {name}").render({})
+
+def test_group_by_text_reports_bad_records_and_goes_on():
+    records = [
+        {"name": "Ada", "phone_number": "2348012345678"},
+        None,
+        {"name": "Bola"},
+        "Chi,2348012345679",
+        {"name": "Ada", "phone_number": "2348012345679"},
+    ]
+    skipped = []
+    groups = list(group_by_text("Hi {name}", records, 10, skipped=skipped))
+    assert groups == [("Hi Ada", ["2348012345678", "2348012345679"])]
+    assert [(index, type(error)) for index, error in skipped] == [(1, WrongType), (2, MissingField), (3, WrongType)]
+
+def test_group_by_text_reports_bad_records_without_fields():
+    skipped = []
+    assert list(group_by_text("Hello", [7, {"phone_number": "1"}], 10, skipped=skipped)) == [("Hello", ["1"])]
+    assert [(index, type(error)) for index, error in skipped] == [(0, WrongType)]
@@ -0,0 +1,46 @@
+import io
+
+import pytest
+
+HEADER = "phone_number,first_name\n"
+LINES = [f"23480{index:08d},Name{index}\n" for index in range(500)]
+SPLIT_SIZE = 1000
+
+def _phonebook(simulator):
+    simulator.phonebooks["book"] = {"id": "book", "name": "Book"}
+    return "book"
+
+def _sources(tmp_path):
+    path = tmp_path / "contacts.csv"
+    path.write_text(HEADER + "".join(LINES))
+    return {
+        "path": lambda: str(path),
+        "file": lambda: open(path, "rb"),
+        "lines": lambda: iter([HEADER] + LINES),
+        "bytes": lambda: io.BytesIO((HEADER + "".join(LINES)).encode()),
+    }
+
+@pytest.mark.parametrize("kind", ["path", "file", "lines", "bytes"])
+def test_parts_never_exceed_split_size(client, simulator, tmp_path, kind):
+    phonebook_id = _phonebook(simulator)
+    source = _sources(tmp_path)[kind]()
+    result = client.upload_contacts(source, "234", "text/csv", phonebook_id, split_size=SPLIT_SIZE, max_workers=3, header=True)
+    assert result.ok and len(result.chunks) > 1
+    # The header counts towards the first part of a path, which carries it as the first line of the file.
+    header_sizes = [0 if kind == "path" and chunk.index == 0 else len(HEADER) for chunk in result.chunks]
+    assert all(chunk.size + header <= SPLIT_SIZE for chunk, header in zip(result.chunks, header_sizes))
+    assert result.total == len(HEADER) + sum(map(len, LINES)) - (0 if kind == "path" else len(HEADER))
+    numbers = sorted(contact["phone_number"] for contact in simulator.contacts.values())
+    assert numbers == sorted(line.split(",")[0] for line in LINES)
+
+def test_line_longer_than_split_size_is_sent_alone(client, simulator, tmp_path):
+    phonebook_id = _phonebook(simulator)
+    long_line = "2348012345678," + "x" * 300 + "\n"
+    lines = ["2348000000001\n", long_line, "2348000000002\n"]
+    result = client.upload_contacts(iter(lines), "234", "text/csv", phonebook_id, split_size=100)
+    assert [chunk.size for chunk in result.chunks] == [len(lines[0]), len(long_line), len(lines[2])]
+
+    path = tmp_path / "long.csv"
+    path.write_text("".join(lines))
+    result = client.upload_contacts(str(path), "234", "text/csv", phonebook_id, split_size=100)
+    assert [chunk.size for chunk in result.chunks] == [len(lines[0]), len(long_line), len(lines[2])]
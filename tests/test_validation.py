@@ -0,0 +1,30 @@
+import pytest
+
+from termii import termii_switch
+from termii.utilities import WrongOption, WrongType
+from termii.validation import one_of, validate
+
+def test_one_of_ignores_case_by_default():
+    check = one_of(("dnd", "whatsapp"))
+    check("channel", "WhatsApp", {})
+    with pytest.raises(WrongOption):
+        one_of(("dnd", "whatsapp"), case_sensitive=True)("channel", "WhatsApp", {})
+
+@pytest.mark.parametrize("value", [["dnd"], {"channel": "dnd"}, {"dnd"}])
+def test_one_of_rejects_unhashable_values(value):
+    with pytest.raises(WrongOption):
+        validate("send_message", sender_id="Termii", message="Hello", channel=value)
+
+def test_validate_checks_types():
+    with pytest.raises(WrongType):
+        validate("send_message", sender_id=12345, message="Hello", channel="dnd")
+    validate("send_message", sender_id="Termii", message="Hello", channel="generic")
+
+def test_required_arguments_reject_none():
+    with pytest.raises(WrongType):
+        termii_switch.message_payload("key", "2348012345678", "Termii", "Hello", "plain", "generic", None)
+    with pytest.raises(WrongType):
+        termii_switch.bulk_message_payload("key", None, "Termii", "Hello", "plain", "generic")
+    with pytest.raises(WrongType):
+        validate("add_new_contact", options=None)
+    validate("send_bulk_sms", sender_id="Termii", message="Hello")
@@ -0,0 +1,74 @@
+import io
+import json
+import time
+
+from termii.store import MessageStore
+from termii.webhooks import DeliveryReportReceiver
+
+REPORT = {"message_id": "3017544054459658", "receiver": "2348012345678", "sender": "Termii", "status": "DELIVERED",
+    "channel": "generic", "cost": 1, "sent_at": "2024-01-01 10:00:00"}
+
+def _call(receiver, body, environ=None):
+    statuses = []
+    environ = dict({"REQUEST_METHOD": "POST", "CONTENT_LENGTH": str(len(body)), "wsgi.input": io.BytesIO(body)}, **(environ or {}))
+    receiver(environ, lambda status, headers: statuses.append(status))
+    return statuses[0]
+
+def test_reports_are_written_to_the_store(tmp_path):
+    store = MessageStore(str(tmp_path / "messages.db"))
+    with DeliveryReportReceiver(store, flush_interval=0.01) as receiver:
+        assert _call(receiver, json.dumps([REPORT]).encode()) == "200 OK"
+        assert _call(receiver, b"<html>") == "400 Bad Request"
+    assert store.status(REPORT["message_id"]) == "DELIVERED"
+    store.close()
+
+def test_reports_after_close_are_refused():
+    batches = []
+    receiver = DeliveryReportReceiver(batches.append)
+    receiver.close()
+    assert _call(receiver, json.dumps(REPORT).encode()) == "503 Service Unavailable"
+    assert batches == [] and receiver.received == 0
+
+def test_close_keeps_the_reports_a_failing_sink_did_not_write():
+    written = []
+    failing = True
+
+    def sink(batch):
+        if failing:
+            raise OSError("disk full")
+        written.extend(batch)
+
+    receiver = DeliveryReportReceiver(sink, flush_interval=60)
+    assert receiver.receive(json.dumps(REPORT).encode()) == 200
+    unwritten = receiver.close()
+    assert [report.message_id for report in unwritten] == [REPORT["message_id"]]
+
+    failing = False
+    receiver.flush()
+    assert [report.message_id for report in written] == [REPORT["message_id"]]
+
+def test_failing_sink_is_retried_after_the_interval():
+    calls = []
+
+    def sink(batch):
+        calls.append(len(batch))
+        raise OSError("disk full")
+
+    receiver = DeliveryReportReceiver(sink, batch_size=1, flush_interval=0.1)
+    assert receiver.receive(json.dumps(REPORT).encode()) == 200
+    time.sleep(0.35)
+    assert 1 <= len(calls) <= 4
+    assert len(receiver.close()) == 1
+
+def test_chunked_request_is_read_to_the_end():
+    batches = []
+    body = json.dumps([REPORT]).encode()
+    with DeliveryReportReceiver(batches.append) as receiver:
+        status = _call(receiver, body, {"CONTENT_LENGTH": "", "wsgi.input_terminated": True})
+    assert status == "200 OK"
+    assert sum(len(batch) for batch in batches) == 1
+
+def test_chunked_request_over_the_limit_is_refused():
+    with DeliveryReportReceiver(lambda batch: None) as receiver:
+        status = _call(receiver, b" " * (1024 * 1024 + 1), {"CONTENT_LENGTH": "", "wsgi.input_terminated": True})
+    assert status == "413 Payload Too Large"